@@ -1,37 +1,78 @@
+import asyncio
+import aiohttp
+from functools import partial
 from typing import Union
 from litestar.response import Template
 from litestar.openapi import OpenAPIConfig
-from litestar import Litestar, Response, get
-from litestar.exceptions import NotFoundException
+from litestar import Litestar, Request, Response, get, post
+from litestar.exceptions import HTTPException, NotFoundException
 from litestar.template.config import TemplateConfig
 from litestar.contrib.jinja import JinjaTemplateEngine
 from hubble.services.kinopoisk import (
     get_search,
     get_info,
+    get_info_batch,
     get_similars,
     get_person,
     get_trivias,
     get_media_posts,
+    get_title_card,
+    stream_info_batch,
+    stream_similars,
+    stream_trivias,
+    stream_media_posts,
 )
-from hubble.services.toramp import get_series_dates
+from hubble.services.toramp import (
+    get_series_dates,
+    get_series_dates_batch,
+    stream_series_dates_batch,
+)
+from hubble.services.rutor import get_torrents
+from hubble.services.kinopoisk.service_utils import INFO_DB_CACHE_ENABLED
+from hubble.services.kinopoisk.models import model_stats
+from hubble.http_client import open_http_sessions, close_http_sessions
 
 from database._init_db import init_db
-from database.requests.setters import set_data_to_db_items
+from database.requests.setters import DB_WRITE_QUEUE
 
 from app_utils import (
     ID,
     CONTENT_TYPE,
     SEARCH_QUERY,
+    TORRENTS_PAGES,
+    TORRENTS_MIN_SEEDS,
+    TORRENTS_SIZE,
+    TORRENTS_TITLE,
     TEMPLATES_DIRECTORY,
+    DB_WRITES_ENABLED,
+    CACHE_CONTROL_MAX_AGE,
+    NDJSON_MEDIA_TYPE,
+    InfoBatchRequest,
+    SeriesDatesBatchRequest,
+    is_ndjson_accepted,
     validate_content_type,
+    validate_info_batch_size,
+    validate_series_dates_batch,
+    parse_size_param,
+    enqueue_db_write,
+    enqueue_trivias_db_write,
+    enqueue_db_write_after_stream,
+    render_json_response,
+    render_ndjson_stream,
     render_main_debug_page,
     render_viewer_debug_page,
 )
 
 
 async def startup():
-    pass
-    # await init_db()
+    await open_http_sessions()
+    if INFO_DB_CACHE_ENABLED or DB_WRITES_ENABLED:
+        await init_db()
+
+
+async def shutdown():
+    await DB_WRITE_QUEUE.close()
+    await close_http_sessions()
 
 
 @get("/")
@@ -41,6 +82,7 @@ async def index_handler() -> str:
 
 @get("/search")
 async def search_handler(
+    request: Request,
     search_query: str = SEARCH_QUERY,
 ) -> Union[Template, dict]:
 
@@ -48,7 +90,7 @@ async def search_handler(
 
     if app.debug:
         original_json, processed_json = search_result
-        # await set_data_to_db_items(processed_json)
+        enqueue_db_write(processed_json)
         return render_viewer_debug_page(
             original_json, processed_json if processed_json else {"error": "404"}
         )
@@ -57,13 +99,13 @@ async def search_handler(
         print("wtf")
         raise NotFoundException(extra={"search_query": search_query})
 
-    # await set_data_to_db_items(search_result)
-    return Response(content=search_result, media_type="application/json")
+    enqueue_db_write(search_result)
+    return render_json_response(request, search_result, CACHE_CONTROL_MAX_AGE["search"])
 
 
 @get("/info")
 async def info_handler(
-    content_type: str = CONTENT_TYPE, id: int = ID
+    request: Request, content_type: str = CONTENT_TYPE, id: int = ID
 ) -> Union[Template, dict]:
 
     validate_content_type(content_type)
@@ -72,39 +114,67 @@ async def info_handler(
     if app.debug:
         original_json = founded_info[0]
         processed_json = founded_info[1] if founded_info[1] else {"error": "404"}
-        # await set_data_to_db_items(processed_json)
         return render_viewer_debug_page(original_json, processed_json)
 
     if not founded_info:
         raise NotFoundException(extra={"content_type": content_type, "id": id})
 
-    # await set_data_to_db_items(founded_info)
-    return Response(content=founded_info, media_type="application/json")
+    return render_json_response(request, founded_info, CACHE_CONTROL_MAX_AGE["info"])
+
+
+@post("/info/batch", status_code=200)
+async def info_batch_handler(
+    request: Request, data: InfoBatchRequest
+) -> Union[Template, dict]:
+    validate_info_batch_size(data.items)
+    items = [(item.content_type, item.id) for item in data.items]
+
+    # RESULTS ARE STREAMED AS SOON AS EACH ITEM IS READY
+    if is_ndjson_accepted(request) and not app.debug:
+        return await render_ndjson_stream(stream_info_batch(items))
+
+    batch_result = await get_info_batch(items)
+
+    if app.debug:
+        return render_viewer_debug_page(
+            {"note": "html pages is not supported yet"}, batch_result
+        )
+
+    return {"items": batch_result}
 
 
 @get("/similars")
 async def similars_handler(
-    content_type: str = CONTENT_TYPE, id: int = ID
+    request: Request, content_type: str = CONTENT_TYPE, id: int = ID
 ) -> Union[Template, dict]:
 
     validate_content_type(content_type)
+
+    if is_ndjson_accepted(request) and not app.debug:
+        stream = await render_ndjson_stream(
+            enqueue_db_write_after_stream(stream_similars(content_type, id))
+        )
+        if stream is None:
+            raise NotFoundException(extra={"content_type": content_type, "id": id})
+        return stream
+
     similars = await get_similars(content_type, id, debug=app.debug)
 
     if app.debug:
         original_json = similars[0]
         processed_json = similars[1] if similars[1] else {"error": "404"}
-        # await set_data_to_db_items(processed_json)
+        enqueue_db_write(processed_json)
         return render_viewer_debug_page(original_json, processed_json)
 
     if not similars:
         raise NotFoundException(extra={"content_type": content_type, "id": id})
 
-    # await set_data_to_db_items(similars)
-    return Response(content=similars, media_type="application/json")
+    enqueue_db_write(similars)
+    return render_json_response(request, similars, CACHE_CONTROL_MAX_AGE["similars"])
 
 
 @get("/person")
-async def person_handler(id: int = ID) -> Union[Template, dict]:
+async def person_handler(request: Request, id: int = ID) -> Union[Template, dict]:
     person_info = await get_person(id, app.debug)
 
     import pprint
@@ -114,66 +184,176 @@ async def person_handler(id: int = ID) -> Union[Template, dict]:
     if app.debug:
         original_json = person_info[0]
         processed_json = person_info[1] if person_info[1] else {"error": "404"}
-        # await set_data_to_db_items(processed_json)
+        enqueue_db_write(processed_json)
         return render_viewer_debug_page(original_json, processed_json)
 
     if not person_info:
         raise NotFoundException(extra={"id": id})
 
-    # await set_data_to_db_items(person_info)
-    return Response(content=person_info, media_type="application/json")
+    enqueue_db_write(person_info)
+    return render_json_response(request, person_info, CACHE_CONTROL_MAX_AGE["person"])
 
 
 @get("/trivias")
 async def trivias_handler(
-    content_type: str = CONTENT_TYPE, id: int = ID
+    request: Request, content_type: str = CONTENT_TYPE, id: int = ID
 ) -> Union[Template, dict]:
 
     validate_content_type(content_type)
+
+    if is_ndjson_accepted(request) and not app.debug:
+        stream = await render_ndjson_stream(
+            enqueue_db_write_after_stream(
+                stream_trivias(content_type, id),
+                partial(enqueue_trivias_db_write, content_type, id),
+            )
+        )
+        if stream is None:
+            raise NotFoundException(extra={"content_type": content_type, "id": id})
+        return stream
+
     trivias = await get_trivias(content_type, id, app.debug)
 
     if app.debug:
         original_json = trivias[0]
         processed_json = trivias[1]
-        # await set_data_to_db_items(processed_json)
+        enqueue_trivias_db_write(content_type, id, processed_json)
         return render_viewer_debug_page(original_json, processed_json)
 
     if not trivias:
         raise NotFoundException(extra={"content_type": content_type, "id": id})
 
-    # await set_data_to_db_items(trivias)
-    return Response(content=trivias, media_type="application/json")
+    enqueue_trivias_db_write(content_type, id, trivias)
+    return render_json_response(request, trivias, CACHE_CONTROL_MAX_AGE["trivias"])
 
 
 @get("/media_posts")
 async def media_posts_handler(
-    content_type: str = CONTENT_TYPE, id: int = ID
+    request: Request, content_type: str = CONTENT_TYPE, id: int = ID
 ) -> Union[Template, dict]:
 
     validate_content_type(content_type)
+
+    if is_ndjson_accepted(request) and not app.debug:
+        stream = await render_ndjson_stream(stream_media_posts(content_type, id))
+        return stream or Response(content=b"", media_type=NDJSON_MEDIA_TYPE)
+
     media_posts = await get_media_posts(content_type, id, app.debug)
 
     if app.debug:
         original_json = media_posts[0]
         processed_json = media_posts[1]
         # TODO: ADD MEDIA POSTS SUPPORT IN DATABASE
-        # # await set_data_to_db_items(processed_json)
+        # # enqueue_db_write(processed_json)
         return render_viewer_debug_page(original_json, processed_json)
 
     # TODO: ADD MEDIA POSTS SUPPORT IN DATABASE
-    # await set_data_to_db_items(media_posts)
-    return Response(content=media_posts, media_type="application/json")
+    # enqueue_db_write(media_posts)
+    return render_json_response(
+        request, media_posts, CACHE_CONTROL_MAX_AGE["media_posts"]
+    )
+
+
+@get("/card")
+async def card_handler(
+    request: Request, content_type: str = CONTENT_TYPE, id: int = ID
+) -> Union[Template, dict]:
+
+    validate_content_type(content_type)
+    card = await get_title_card(content_type, id)
+
+    if app.debug:
+        return render_viewer_debug_page(
+            {"note": "html pages is not supported yet"}, card
+        )
+
+    if not card["info"] and "info" not in card["degraded"]:
+        raise NotFoundException(extra={"content_type": content_type, "id": id})
+
+    # DEGRADED CARD SHOULD NOT BE CACHED BY CLIENTS
+    max_age = 0 if card["degraded"] else CACHE_CONTROL_MAX_AGE["card"]
+    return render_json_response(request, card, max_age)
 
 
 @get("/series_dates")
-async def series_dates_handler(title: str = SEARCH_QUERY) -> dict:
+async def series_dates_handler(request: Request, title: str = SEARCH_QUERY) -> dict:
 
-    series_dates = await get_series_dates(title)
+    try:
+        series_dates = await get_series_dates(title)
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        # TORAMP IS UNREACHABLE: REPORTED LIKE A FAILED BATCH ITEM
+        raise HTTPException(status_code=502, detail="Upstream request failed") from e
     if app.debug:
         return render_viewer_debug_page(
             {"note": "html pages is not supported yet"}, series_dates
         )
-    return Response(content=series_dates, media_type="application/json")
+    return render_json_response(
+        request, series_dates, CACHE_CONTROL_MAX_AGE["series_dates"]
+    )
+
+
+@post("/series_dates/batch", status_code=200)
+async def series_dates_batch_handler(
+    request: Request, data: SeriesDatesBatchRequest
+) -> Union[Template, dict]:
+    validate_series_dates_batch(data)
+
+    # RESULTS ARE STREAMED AS SOON AS EACH ITEM IS READY
+    if is_ndjson_accepted(request) and not app.debug:
+        return await render_ndjson_stream(
+            stream_series_dates_batch(data.titles, data.ids)
+        )
+
+    batch_result = await get_series_dates_batch(data.titles, data.ids)
+
+    if app.debug:
+        return render_viewer_debug_page(
+            {"note": "html pages is not supported yet"}, batch_result
+        )
+
+    return {"items": batch_result}
+
+
+@get("/torrents")
+async def torrents_handler(
+    request: Request,
+    search_query: str = SEARCH_QUERY,
+    category: str | None = None,
+    pages: int = TORRENTS_PAGES,
+    sort: str | None = None,
+    min_seeds: int | None = TORRENTS_MIN_SEEDS,
+    min_size: str | None = TORRENTS_SIZE,
+    max_size: str | None = TORRENTS_SIZE,
+    title: str | None = TORRENTS_TITLE,
+) -> Union[Template, dict]:
+
+    torrents = await get_torrents(
+        search_query,
+        category=category,
+        pages=pages,
+        sort=sort,
+        min_seeds=min_seeds,
+        min_size=parse_size_param("min_size", min_size),
+        max_size=parse_size_param("max_size", max_size),
+        title=title,
+    )
+    if app.debug:
+        return render_viewer_debug_page(
+            {"note": "html pages is not supported yet"}, torrents
+        )
+    return render_json_response(request, torrents, CACHE_CONTROL_MAX_AGE["torrents"])
+
+
+@get("/stats/db_writes")
+async def db_writes_stats_handler() -> dict:
+    # QUEUE DEPTH, LAG (SECONDS) AND COUNTERS OF THE WRITE-BEHIND QUEUE
+    return DB_WRITE_QUEUE.stats()
+
+
+@get("/stats/models")
+async def models_stats_handler() -> dict:
+    # PROCESSED DICTS THAT DID NOT MATCH THEIR MODEL (SEE to_model)
+    return model_stats()
 
 
 # START: uvicorn app:app --host 127.0.0.1 --port 8080 --reload
@@ -182,15 +362,22 @@ app = Litestar(
         index_handler,
         search_handler,
         info_handler,
+        info_batch_handler,
         similars_handler,
         person_handler,
         trivias_handler,
         media_posts_handler,
+        card_handler,
         series_dates_handler,
+        series_dates_batch_handler,
+        torrents_handler,
+        db_writes_stats_handler,
+        models_stats_handler,
     ],
     template_config=TemplateConfig(
         directory=TEMPLATES_DIRECTORY, engine=JinjaTemplateEngine
     ),
     openapi_config=OpenAPIConfig(title="Hubble API", version="1.0.0", path="/openapi"),
     on_startup=[startup],
+    on_shutdown=[shutdown],
 )
@@ -1,9 +1,20 @@
 import json
+import hashlib
+import msgspec
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Callable
+from litestar import Request, Response
 from litestar.params import Parameter
-from litestar.response import Template
+from litestar.response import Stream, Template
 from litestar.exceptions import HTTPException
+from litestar.serialization import encode_json
 
+from hubble.services.kinopoisk.service_utils import INFO_BATCH_MAX_SIZE
 from hubble.services.kinopoisk.service_utils import is_media_content_type_valid
+from hubble.services.toramp.service_utils import SERIES_DATES_BATCH_MAX_SIZE
+from hubble.services.rutor.service_utils import SEARCH_MAX_PAGES, SIZE_PATTERN
+from hubble.services.rutor.service_utils import parse_result_size
+from database.requests.setters import DB_WRITE_QUEUE
 
 
 # TEMPLATES FOR DEBUGGING
@@ -12,6 +23,28 @@ DEBUG_MAIN_PAGE = "main_page.jinja2"
 DEBUG_TEMPLATE = "viewer_page.jinja2"
 
 
+# SAVING PROCESSED RESPONSES TO DATABASE IN BACKGROUND (WRITE-BEHIND QUEUE)
+DB_WRITES_ENABLED = True
+
+
+def enqueue_db_write(data) -> None:
+    if DB_WRITES_ENABLED and data:
+        DB_WRITE_QUEUE.put(data)
+
+
+def enqueue_trivias_db_write(content_type: str, id: int, trivias) -> None:
+    # TRIVIAS ARE LINKED TO THEIR MOVIE, SO THEY ARE WRITTEN TOGETHER WITH ITS ID
+    if trivias:
+        enqueue_db_write(
+            {
+                "content_type": content_type,
+                "id": id,
+                "trivias": msgspec.to_builtins(trivias),
+                "typename": "movie_trivias",
+            }
+        )
+
+
 # CONTENT TYPE KINOPOISK API VALIDATION
 def validate_content_type(content_type: str) -> None:
     if not is_media_content_type_valid(content_type):
@@ -26,17 +59,189 @@ CONTENT_TYPE = Parameter(str, min_length=1, max_length=30)
 SEARCH_QUERY = Parameter(str, min_length=1, max_length=100)
 
 
+# TORRENTS SEARCH PARAMETERS
+TORRENTS_PAGES = Parameter(int, ge=1, le=SEARCH_MAX_PAGES, default=1)
+TORRENTS_MIN_SEEDS = Parameter(int, ge=0)
+# SIZE WITH UNIT AS ON RUTOR, E.G. "700 MB" OR "1.5GB"
+TORRENTS_SIZE = Parameter(str, min_length=1, max_length=20)
+TORRENTS_TITLE = Parameter(str, min_length=1, max_length=100)
+
+
+def parse_size_param(name: str, value: str | None) -> float | None:
+    if value is None:
+        return None
+    if not SIZE_PATTERN.fullmatch(value.strip()):
+        raise HTTPException(
+            status_code=400, detail=f"Invalid {name}: '{value}' (expected e.g. 1.5GB)"
+        )
+    return parse_result_size(value)
+
+
+# BATCH REQUEST BODY
+@dataclass
+class InfoBatchItem:
+    content_type: str
+    id: int
+
+
+@dataclass
+class InfoBatchRequest:
+    items: list[InfoBatchItem]
+
+
+def validate_info_batch_size(items: list) -> None:
+    if not items or len(items) > INFO_BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Batch must contain from 1 to {INFO_BATCH_MAX_SIZE} items",
+        )
+
+
+@dataclass
+class SeriesDatesBatchRequest:
+    titles: list[str] = field(default_factory=list)
+    ids: list[int] = field(default_factory=list)
+
+
+def validate_series_dates_batch(data: SeriesDatesBatchRequest) -> None:
+    size = len(data.titles) + len(data.ids)
+    if not size or size > SERIES_DATES_BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=400,
+            detail=(
+                "Batch must contain from 1 to "
+                f"{SERIES_DATES_BATCH_MAX_SIZE} titles and ids"
+            ),
+        )
+    # SAME LIMITS AS FOR THE title AND id QUERY PARAMETERS
+    if any(not 1 <= len(title) <= 100 for title in data.titles):
+        raise HTTPException(
+            status_code=400, detail="Title length must be from 1 to 100 characters"
+        )
+    if any(not 0 < toramp_id < 99999999999 for toramp_id in data.ids):
+        raise HTTPException(status_code=400, detail="Invalid toramp id")
+
+
+# HTTP CACHING OF JSON RESPONSES (MAX-AGE IN SECONDS)
+CACHE_CONTROL_MAX_AGE = {
+    "search": 10 * 60,
+    "info": 60 * 60,
+    "similars": 60 * 60,
+    "person": 60 * 60,
+    "trivias": 6 * 60 * 60,
+    "media_posts": 30 * 60,
+    "series_dates": 60 * 60,
+    "card": 30 * 60,
+    "torrents": 5 * 60,
+}
+
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def is_etag_matched(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def render_json_response(request: Request, content, max_age: int) -> Response:
+    """
+    Функция для формирования JSON-ответа с заголовками ETag и Cache-Control.
+    ETag вычисляется по телу ответа, поэтому одинаковые данные всегда дают
+    одинаковый ETag. Если клиент прислал совпадающий If-None-Match,
+    возвращается 304 без тела.
+
+    Parameters:
+        request (Request): Текущий запрос.
+        content (Any): Данные для сериализации в JSON.
+        max_age (int): Значение max-age для Cache-Control в секундах.
+
+    Returns:
+        Response: Ответ 200 с JSON или 304 без тела.
+    """
+
+    body = encode_json(content)
+    etag = make_etag(body)
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={max_age}"}
+
+    if is_etag_matched(request.headers.get("if-none-match"), etag):
+        return Response(content=b"", status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+# STREAMING OF LIST RESPONSES AS NEWLINE DELIMITED JSON (OPT-IN BY ACCEPT HEADER)
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def is_ndjson_accepted(request: Request) -> bool:
+    return NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+async def render_ndjson_stream(items: AsyncIterator) -> Stream | None:
+    """
+    Функция для формирования потокового ответа NDJSON: каждый элемент
+    сериализуется и отправляется клиенту отдельной строкой сразу после
+    получения из items. Первый элемент запрашивается заранее, чтобы
+    для пустого результата вернуть None (и ответить 404).
+
+    Parameters:
+        items (AsyncIterator): Асинхронный генератор элементов ответа.
+
+    Returns:
+        Stream | None: Потоковый ответ или None, если элементов нет.
+    """
+
+    try:
+        first_item = await anext(items)
+    except StopAsyncIteration:
+        return None
+
+    async def encode_lines():
+        yield encode_json(first_item) + b"\n"
+        async for item in items:
+            yield encode_json(item) + b"\n"
+
+    # HANDLER MEDIA TYPE OVERRIDES media_type OF Stream, SO HEADER IS SET EXPLICITLY
+    return Stream(
+        encode_lines(),
+        media_type=NDJSON_MEDIA_TYPE,
+        headers={"Content-Type": NDJSON_MEDIA_TYPE},
+    )
+
+
+async def enqueue_db_write_after_stream(
+    items: AsyncIterator, enqueue: Callable = enqueue_db_write
+) -> AsyncIterator:
+    # STREAMED ITEMS ARE WRITTEN LIKE THE JSON RESPONSE, ONCE THE STREAM ENDS
+    streamed = []
+    async for item in items:
+        streamed.append(item)
+        yield item
+    enqueue(streamed)
+
+
 # DEBUG PAGES RENDER FUNCTIONS
 def render_main_debug_page() -> Template:
     return Template(template_name=DEBUG_MAIN_PAGE, media_type="text/html")
 
 
 def render_viewer_debug_page(original_json, processed_json) -> Template:
+    # PROCESSED DATA MAY CONTAIN MSGSPEC MODELS (BATCH ITEMS, TITLE CARD SECTIONS)
     return Template(
         template_name=DEBUG_TEMPLATE,
         context={
-            "original_json": json.dumps(original_json, ensure_ascii=False),
-            "processed_json": json.dumps(processed_json, ensure_ascii=False),
+            "original_json": json.dumps(
+                msgspec.to_builtins(original_json), ensure_ascii=False
+            ),
+            "processed_json": json.dumps(
+                msgspec.to_builtins(processed_json), ensure_ascii=False
+            ),
         },
         media_type="text/html",
     )
@@ -0,0 +1,108 @@
+"""
+Бенчмарк профилей движка SQLite (DATABASE_PROFILES в database/db.py):
+"default" (настройки SQLite по умолчанию и логирование каждого запроса)
+против "tuned" (WAL, synchronous=NORMAL, mmap, увеличенный кэш страниц,
+кэш подготовленных запросов, без логирования).
+
+Для каждого профиля используется отдельная временная БД SQLite.
+Измеряются:
+    - запись: фильмы по одному в транзакции (set_data_to_db_items);
+    - чтение: фильмы с составом, жанрами и странами (get_film);
+    - чтение во время записи: несколько параллельных читателей, пока
+      один писатель записывает фильмы (читатели, получившие ошибку
+      блокировки БД, считаются отдельно).
+
+Логи профиля "default" отправляются в os.devnull, чтобы учитывалась
+стоимость логирования, но не вывод в терминал.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_db_profiles
+"""
+
+import os
+import time
+import random
+import asyncio
+import tempfile
+from contextlib import redirect_stdout
+
+from database.db import AsyncSessionLocal, Base, DATABASE_PROFILES, create_db_engine
+from database.requests import getters, setters
+from hubble.services.kinopoisk import parsers
+from hubble.services.kinopoisk.service_utils import filter_in_place
+from benchmarks.payloads import film_payload
+
+
+def parse_film(movie_id: int) -> dict:
+    return filter_in_place(parsers.parse_film_data(film_payload(movie_id)))
+
+
+async def read_films(ids: list[int]) -> None:
+    for movie_id in ids:
+        await getters.get_film(movie_id)
+
+
+async def run_profile(profile: str, writes: int, reads: int, readers: int) -> None:
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    with open(os.devnull, "w") as devnull:
+        # ECHO HANDLER OF SQLALCHEMY WRITES TO sys.stdout CAPTURED ON CREATION
+        with redirect_stdout(devnull):
+            engine = create_db_engine(f"sqlite+aiosqlite:///{path}", profile)
+        AsyncSessionLocal.configure(bind=engine)
+
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+        data = [parse_film(100 + i) for i in range(writes)]
+        start = time.perf_counter()
+        for item in data:
+            await setters.set_data_to_db_items(item)
+        elapsed = time.perf_counter() - start
+        print(f"{profile:<8} {'write films':<24} {writes / elapsed:10.1f}")
+
+        ids = [100 + random.randrange(writes) for _ in range(reads)]
+        start = time.perf_counter()
+        await read_films(ids)
+        elapsed = time.perf_counter() - start
+        print(f"{profile:<8} {'read films':<24} {reads / elapsed:10.1f}")
+
+        # READERS RUN WHILE ONE WRITER ADDS NEW FILMS
+        data = [parse_film(100 + writes + i) for i in range(writes)]
+        writer_done = asyncio.Event()
+        counters = {"reads": 0, "errors": 0}
+
+        async def writer():
+            for item in data:
+                await setters.set_data_to_db_items(item)
+            writer_done.set()
+
+        async def reader():
+            while not writer_done.is_set():
+                try:
+                    await getters.get_film(100 + random.randrange(writes))
+                    counters["reads"] += 1
+                except Exception:
+                    counters["errors"] += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(writer(), *(reader() for _ in range(readers)))
+        elapsed = time.perf_counter() - start
+        case = f"mixed, {readers} readers"
+        print(
+            f"{profile:<8} {case + ' (writes)':<24} {writes / elapsed:10.1f}\n"
+            f"{profile:<8} {case + ' (reads)':<24} {counters['reads'] / elapsed:10.1f}"
+            f"   errors: {counters['errors']}"
+        )
+
+        await engine.dispose()
+
+
+async def main(writes: int = 100, reads: int = 300, readers: int = 4) -> None:
+    print(f"{'':<8} {'case':<24} {'ops/s':>10}")
+    for profile in DATABASE_PROFILES:
+        random.seed(0)
+        await run_profile(profile, writes, reads, readers)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
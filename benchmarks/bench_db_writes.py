@@ -0,0 +1,138 @@
+"""
+Бенчмарк записи обработанных данных /info в БД (set_data_to_db_items):
+исходный save_object (рекурсивный resolve_duplicates с одним SELECT
+на каждый объект графа и session.merge) против текущего (многострочные
+INSERT ... ON CONFLICT DO UPDATE по каждой модели и вставка связей
+с ON CONFLICT DO NOTHING).
+
+Для каждого варианта используется отдельная временная БД SQLite.
+Измеряются записи в секунду и количество SQL-запросов на одну запись:
+    - новые фильмы с общим составом (люди, жанры, страны уже есть в БД);
+    - повторная запись того же фильма / сериала (обновление).
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_db_writes
+"""
+
+import os
+import time
+import asyncio
+import tempfile
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from database.db import AsyncSessionLocal, Base
+from database.requests import setters
+from hubble.services.kinopoisk import parsers
+from hubble.services.kinopoisk.service_utils import filter_in_place
+from benchmarks.payloads import film_payload, tvseries_payload
+
+
+CURRENT_SAVE_OBJECT = setters.save_object
+
+
+async def legacy_resolve_duplicates(obj, session, visited=None):
+    # РЕАЛИЗАЦИЯ resolve_duplicates ДО ПАКЕТНОГО ПОИСКА (ДЛЯ СРАВНЕНИЯ)
+    if visited is None:
+        visited = set()
+    if id(obj) in visited:
+        return obj
+    visited.add(id(obj))
+
+    model_class = type(obj)
+    if model_class in setters.UNIQUE_FIELDS:
+        fields = setters.UNIQUE_FIELDS[model_class]
+        conditions = [
+            getattr(model_class, field) == getattr(obj, field) for field in fields
+        ]
+        stmt = select(model_class).filter(*conditions)
+        result = await session.execute(stmt)
+        existing = result.scalar_one_or_none()
+        if existing:
+            obj.id = existing.id
+
+    for rel in obj.__mapper__.relationships:
+        related = getattr(obj, rel.key)
+        if related is None:
+            continue
+        if rel.uselist:
+            resolved_list = []
+            for item in related:
+                resolved_item = await legacy_resolve_duplicates(item, session, visited)
+                resolved_list.append(resolved_item)
+            setattr(obj, rel.key, resolved_list)
+        else:
+            resolved_item = await legacy_resolve_duplicates(related, session, visited)
+            setattr(obj, rel.key, resolved_item)
+    return obj
+
+
+async def legacy_save_object(obj):
+    async with AsyncSessionLocal() as session:
+        async with session.begin():
+            await legacy_resolve_duplicates(obj, session)
+            merged_obj = await session.merge(obj)
+        await session.commit()
+        await session.refresh(merged_obj)
+    return merged_obj
+
+
+def parse_film(movie_id: int) -> dict:
+    return filter_in_place(parsers.parse_film_data(film_payload(movie_id)))
+
+
+def parse_tvseries(movie_id: int) -> dict:
+    return filter_in_place(parsers.parse_tvseries_data(tvseries_payload(movie_id)))
+
+
+async def run_case(name: str, save_object, writes: int) -> None:
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    AsyncSessionLocal.configure(bind=engine)
+
+    queries = [0]
+    event.listen(
+        engine.sync_engine,
+        "before_cursor_execute",
+        lambda *args: queries.__setitem__(0, queries[0] + 1),
+    )
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    # FIRST WRITE CREATES SHARED PERSONS, GENRES, COUNTRIES AND ROLES.
+    # IT IS ALWAYS DONE BY THE CURRENT IMPLEMENTATION: THE LEGACY ONE FAILS
+    # ON AN EMPTY DATABASE (SAME NEW ROLE OF SEVERAL PERSONS IS INSERTED TWICE)
+    setters.save_object = CURRENT_SAVE_OBJECT
+    await setters.set_data_to_db_items(parse_film(1))
+    setters.save_object = save_object
+
+    cases = (
+        ("new films, shared cast", lambda i: parse_film(100 + i)),
+        ("rewrite film", lambda i: parse_film(1)),
+        ("rewrite tvseries", lambda i: parse_tvseries(404900)),
+    )
+    for case, make_data in cases:
+        data = [make_data(i) for i in range(writes)]
+        queries[0] = 0
+        start = time.perf_counter()
+        for item in data:
+            await setters.set_data_to_db_items(item)
+        elapsed = time.perf_counter() - start
+        print(
+            f"{name:<8} {case:<24} {writes / elapsed:10.1f} "
+            f"{queries[0] / writes:14.1f}"
+        )
+
+    await engine.dispose()
+
+
+async def main(writes: int = 30) -> None:
+    print(f"{'':<8} {'case':<24} {'writes/s':>10} {'queries/write':>14}")
+    await run_case("legacy", legacy_save_object, writes)
+    await run_case("current", CURRENT_SAVE_OBJECT, writes)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
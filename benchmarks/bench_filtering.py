@@ -0,0 +1,67 @@
+"""
+Бенчмарк фильтрации распарсенных данных: парсинг + filter_recursive
+(второй рекурсивный обход с копированием дерева) против
+парсинг + filter_in_place (нерекурсивный обход без копирования).
+
+Для каждого варианта измеряется время полного конвейера и пик
+выделенной памяти (tracemalloc) сверх памяти исходного ответа.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_filtering
+"""
+
+import timeit
+import tracemalloc
+
+from hubble.services.kinopoisk import parsers
+from hubble.services.kinopoisk.service_utils import filter_in_place, filter_recursive
+from benchmarks.payloads import (
+    person_payload,
+    similars_payload,
+    trivias_payload,
+    tvseries_payload,
+)
+
+
+CASES = (
+    ("person (best films/series)", parsers.parse_person_data, person_payload()),
+    ("tvseries (6 sequels)", parsers.parse_tvseries_data, tvseries_payload()),
+    (
+        "similars (20 films)",
+        lambda items: [parsers.parse_movie_data(item) for item in items],
+        similars_payload(),
+    ),
+    (
+        "trivias (150 items)",
+        lambda items: [parsers.parse_trivia_data(item) for item in items],
+        trivias_payload(),
+    ),
+)
+
+
+def peak_memory(func) -> int:
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    base, _ = tracemalloc.get_traced_memory()
+    result = func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return peak - base
+
+
+def best_of(func, number: int = 200, repeat: int = 5) -> float:
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number
+
+
+if __name__ == "__main__":
+    print(f"{'case':<28} {'pipeline':<16} {'time, ms':>9} {'peak, KiB':>10}")
+    for name, parser, payload in CASES:
+        two_pass = lambda: filter_recursive(parser(payload))  # noqa: E731
+        single_pass = lambda: filter_in_place(parser(payload))  # noqa: E731
+        assert two_pass() == single_pass(), f"{name}: outputs differ"
+
+        for label, func in (("two-pass", two_pass), ("in-place", single_pass)):
+            elapsed = best_of(func)
+            peak = peak_memory(func)
+            print(f"{name:<28} {label:<16} {elapsed * 1e3:9.3f} {peak / 1024:10.1f}")
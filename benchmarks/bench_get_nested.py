@@ -0,0 +1,144 @@
+"""
+Бенчмарк hubble.utils.get_nested: исходная реализация (разбор строки пути
+на каждый вызов) против скомпилированных путей (compile_path).
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_get_nested
+"""
+
+import timeit
+from typing import Any
+from unittest.mock import patch
+
+from hubble.utils import compile_path, get_nested
+from hubble.services.kinopoisk import parsers
+from benchmarks.payloads import film_payload, person_payload, tvseries_payload
+
+
+def legacy_get_nested(
+    data: Any, keys: str, required: bool = False, default: Any = None
+) -> Any:
+    # РЕАЛИЗАЦИЯ get_nested ДО ВВЕДЕНИЯ compile_path (ДЛЯ СРАВНЕНИЯ)
+    keys = keys.split(".")
+
+    for key in keys:
+        if isinstance(data, dict):
+            data = data.get(key, default)
+            if data is default and required:
+                raise KeyError(f"Required key '{key}' not found in the data.")
+        elif isinstance(data, list):
+            if key.isdigit():
+                index = int(key)
+                if index < len(data):
+                    data = data[index]
+                else:
+                    data = default
+                    if required:
+                        raise KeyError(f"Required index {index} not found in the list.")
+            elif ("[" in key) and ("]" in key):
+                i1 = key.find("[") + 1
+                i2 = key.find("]")
+                key = int(key[i1:i2])
+                if key < len(data):
+                    data = data[key]
+                else:
+                    data = default
+                    if required:
+                        raise KeyError(f"Required index {key} not found in the list.")
+            else:
+                temp_list = []
+                for item in data:
+                    if isinstance(item, dict) and key in item:
+                        temp_list.append(item[key])
+                data = temp_list if temp_list else default
+                data = data[0] if len(data) == 1 else data
+        else:
+            if required:
+                raise KeyError(f"Required key '{key}' not found in the data.")
+            return default
+
+    return data
+
+
+# ПУТИ, КОТОРЫЕ ЧИТАЕТ parse_film_data ДЛЯ ОДНОГО ФИЛЬМА
+FILM_PATHS = [
+    "__typename",
+    "id",
+    "title.russian",
+    "title.original",
+    "productionYear",
+    "shortDescription",
+    "synopsis",
+    "genres",
+    "countries",
+    "mainTrailer.streamUrl",
+    "mainTrailer.sourceVideoUrl",
+    "cover.image.avatarsUrl",
+    "actors",
+    "voiceOverActors",
+    "tagline",
+    "directors",
+    "poster.avatarsUrl",
+    "rating.imdb.value",
+    "rating.kinopoisk.value",
+    "ratingLists.top10.position",
+    "ratingLists.top250.position",
+    "rating.russianCritics.value",
+    "rating.worldwideCritics.value",
+    "duration",
+    "releaseYears.start",
+]
+
+
+def best_of(stmt, number: int, repeat: int = 5) -> float:
+    return min(timeit.repeat(stmt, number=number, repeat=repeat)) / number
+
+
+def bench_lookups() -> None:
+    film = film_payload()
+    compiled = [compile_path(path) for path in FILM_PATHS]
+
+    def run_legacy():
+        for path in FILM_PATHS:
+            legacy_get_nested(film, path)
+
+    def run_get_nested():
+        for path in FILM_PATHS:
+            get_nested(film, path)
+
+    def run_compiled():
+        for accessor in compiled:
+            accessor.get(film)
+
+    legacy = best_of(run_legacy, 20000)
+    print(f"{len(FILM_PATHS)} lookups on a film payload:")
+    print(f"  legacy get_nested       {legacy * 1e6:8.2f} us")
+    for name, func in (("get_nested", run_get_nested), ("compiled .get", run_compiled)):
+        elapsed = best_of(func, 20000)
+        print(f"  {name:<23} {elapsed * 1e6:8.2f} us  x{legacy / elapsed:.2f}")
+
+
+def bench_parsers() -> None:
+    cases = (
+        ("parse_film_data", parsers.parse_film_data, film_payload()),
+        ("parse_tvseries_data", parsers.parse_tvseries_data, tvseries_payload()),
+        ("parse_person_data", parsers.parse_person_data, person_payload()),
+    )
+    print("Full parser runs on Kinopoisk-shaped payloads:")
+    for name, parser, payload in cases:
+        with patch.object(parsers, "get_nested", legacy_get_nested):
+            legacy = best_of(lambda: parser(payload), 200)
+            legacy_result = parser(payload)
+
+        current = best_of(lambda: parser(payload), 200)
+        assert parser(payload) == legacy_result, f"{name}: outputs differ"
+        print(
+            f"  {name:<20} legacy {legacy * 1e3:7.3f} ms   "
+            f"compiled {current * 1e3:7.3f} ms   x{legacy / current:.2f}"
+        )
+
+
+if __name__ == "__main__":
+    bench_lookups()
+    print()
+    bench_parsers()
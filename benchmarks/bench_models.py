@@ -0,0 +1,84 @@
+"""
+Бенчмарк моделей обработанных данных (hubble/services/kinopoisk/models.py):
+словари после filter_in_place против моделей msgspec.Struct.
+
+Для ответов /info (фильм, сериал) и /similars измеряются:
+    - память, которую занимает результат геттера (то, что хранится в кэше);
+    - время сериализации в JSON (encode_json, как в render_json_response);
+    - стоимость преобразования словаря в модель (to_model), которую платит
+      каждый промах кэша, и количество попаданий в кэш, за которое она
+      окупается более быстрой сериализацией.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_models
+"""
+
+import gc
+import json
+import timeit
+import tracemalloc
+
+from litestar.serialization import encode_json
+
+from hubble.services.kinopoisk import parsers
+from hubble.services.kinopoisk.models import to_model, to_models
+from hubble.services.kinopoisk.service_utils import filter_in_place
+from benchmarks.payloads import film_payload, similars_payload, tvseries_payload
+
+
+def parse_info(payload: dict) -> dict:
+    return filter_in_place(parsers.parse_movie_data(payload))
+
+
+def parse_similars(payload: list) -> list:
+    return [filter_in_place(parsers.parse_movie_data(item)) for item in payload]
+
+
+CASES = (
+    ("/info film", parse_info, to_model, film_payload()),
+    ("/info tvseries", parse_info, to_model, tvseries_payload()),
+    ("/similars (20 films)", parse_similars, to_models, similars_payload()),
+)
+
+
+def retained_memory(build) -> int:
+    gc.collect()
+    tracemalloc.start()
+    base, _ = tracemalloc.get_traced_memory()
+    result = build()
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current - base
+
+
+def best_of(func, number: int = 2000, repeat: int = 5) -> float:
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number
+
+
+if __name__ == "__main__":
+    print(
+        f"{'case':<22} {'retained, KiB':>20} {'encode_json, us':>22} "
+        f"{'to_model, us':>13} {'hits to repay':>14}"
+    )
+    print(f"{'':<22} {'dict':>9} {'model':>10} {'dict':>10} {'model':>11}")
+    for name, parse, convert, payload in CASES:
+        data = parse(payload)
+        model = convert(parse(payload))
+        assert json.loads(encode_json(model)) == json.loads(encode_json(data))
+
+        dict_memory = retained_memory(lambda: parse(payload))
+        model_memory = retained_memory(lambda: convert(parse(payload)))
+        dict_encode = best_of(lambda: encode_json(data))
+        model_encode = best_of(lambda: encode_json(model))
+        conversion = best_of(lambda: convert(data))
+        # MISS PATH PAYS to_model ONCE, EACH HIT SAVES THE ENCODE DIFFERENCE
+        saved = dict_encode - model_encode
+        repay = f"{conversion / saved:14.1f}" if saved > 0 else f"{'never':>14}"
+
+        print(
+            f"{name:<22} {dict_memory / 1024:9.1f} {model_memory / 1024:10.1f} "
+            f"{dict_encode * 1e6:10.1f} {model_encode * 1e6:11.1f} "
+            f"{conversion * 1e6:13.1f} {repay}"
+        )
@@ -0,0 +1,86 @@
+"""
+Бенчмарк hubble.services.rutor.parsers.parse_rutor_html: исходная
+реализация (некомпилированные re.findall по всей странице) против
+текущей (поиск таблицы результатов и предкомпилированные паттерны).
+
+Страницы генерируются benchmarks.pages.rutor_page.
+Совпадение результатов обеих реализаций проверяется в tests/production/test_rutor.py.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_rutor
+"""
+
+import re
+import timeit
+
+from hubble.services.rutor.parsers import parse_rutor_html
+from hubble.services.rutor.service_utils import convert_to_full_torrent_url
+from benchmarks.pages import rutor_page
+
+
+def legacy_clean_html(text: str) -> str:
+    text = re.sub(r"<[^>]+>", "", text)
+    return text.replace("&nbsp;", " ").strip()
+
+
+def legacy_parse_rutor_html(html: str):
+    # РЕАЛИЗАЦИЯ parse_rutor_html ДО ПРЕДКОМПИЛЯЦИИ ПАТТЕРНОВ (ДЛЯ СРАВНЕНИЯ)
+    results = []
+    rows = re.findall(
+        r'<tr\s+class="(?:gai|tum)"[^>]*>(.*?)</tr>', html, re.DOTALL | re.IGNORECASE
+    )
+    for row in rows:
+        tds = re.findall(r"<td[^>]*>(.*?)</td>", row, re.DOTALL | re.IGNORECASE)
+        if not tds or len(tds) < 3:
+            continue
+        date = legacy_clean_html(tds[0])
+        peers_text = legacy_clean_html(tds[-1])
+        numbers = re.findall(r"\d+", peers_text)
+        seeds = int(numbers[0]) if numbers and len(numbers) >= 1 else 0
+        leechers = int(numbers[1]) if numbers and len(numbers) >= 2 else 0
+        size = legacy_clean_html(tds[-2])
+        links = re.findall(
+            r'<a\s+[^>]*href="([^"]+)"[^>]*>(.*?)</a>',
+            tds[1],
+            re.DOTALL | re.IGNORECASE,
+        )
+        magnet = ""
+        torrent = ""
+        title = ""
+        if len(links) >= 3:
+            magnet = links[1][0].strip()
+            torrent = links[2][0].strip()
+            title = legacy_clean_html(links[2][1])
+        elif len(links) == 2:
+            magnet = links[0][0].strip()
+            torrent = convert_to_full_torrent_url(links[1][0].strip())
+            title = legacy_clean_html(links[1][1])
+        results.append(
+            {
+                "date": date,
+                "magnet": magnet,
+                "torrent": torrent,
+                "title": title,
+                "size": size,
+                "seeds": seeds,
+                "leechers": leechers,
+            }
+        )
+    return results
+
+
+def best_of(func, number: int = 50, repeat: int = 5) -> float:
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number
+
+
+if __name__ == "__main__":
+    print(f"{'page':<22} {'legacy, rows/s':>15} {'current, rows/s':>16} {'speedup':>8}")
+    for rows in (20, 50, 100):
+        html = rutor_page(rows)
+        legacy = best_of(lambda: legacy_parse_rutor_html(html))
+        current = best_of(lambda: parse_rutor_html(html))
+        name = f"{rows} rows, {len(html) // 1024} KiB"
+        print(
+            f"{name:<22} {rows / legacy:15,.0f} {rows / current:16,.0f} "
+            f"{legacy / current:7.2f}x"
+        )
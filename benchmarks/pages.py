@@ -0,0 +1,73 @@
+"""
+Генераторы HTML-страниц rutor.info для бенчмарков.
+
+Разметка повторяет страницу результатов поиска rutor: шапка с меню и
+скриптами, блок <div id="index"> с таблицей результатов (строки с классами
+"gai" / "tum", с колонкой комментариев и без неё) и подвал.
+"""
+
+
+RUTOR_HEAD = (
+    "<!DOCTYPE html><html><head><title>rutor.info :: Поиск</title>"
+    + '<link rel="stylesheet" type="text/css" href="//s.rutor.info/css.css" />'
+    + "<script type=\"text/javascript\">var a = '<tr class=x>';</script>" * 20
+    + '</head><body><div id="ws"><div id="up"><div id="logo">'
+    + "".join(
+        f'<a href="/browse/0/{i}/0/0"><b>Категория {i}</b></a> | ' for i in range(30)
+    )
+    + '</div></div><div id="menu">'
+    + '<p class="news">Новость сайта с <a href="/news/1">ссылкой</a>.</p>' * 200
+    + "</div>"
+)
+
+RUTOR_FOOT = (
+    '</div><div id="sidebar">'
+    + '<div class="sideblock"><a href="/top">Топ</a></div>' * 50
+    + "</div></div></body></html>"
+)
+
+
+def make_rutor_row(i: int) -> str:
+    row_class = "gai" if i % 2 else "tum"
+    btih = f"{i:040x}"
+    links = (
+        f'<a class="downgif" href="//d.rutor.info/download/{900000 + i}">'
+        '<img src="//s.rutor.info/i/d.gif" alt="D" /></a>'
+        f'<a href="magnet:?xt=urn:btih:{btih}&dn=rutor.info&tr=udp://opentor.net:6969">'
+        '<img src="//s.rutor.info/i/m.png" alt="M" /></a>\n'
+        f'<a href="/torrent/{900000 + i}/nazvanie-{i}">Название {i} / Title {i} '
+        f"(20{i % 25:02d}) WEB-DL 1080p | <b>Дубляж</b></a>"
+    )
+    peers = (
+        '<span class="green"><img src="//s.rutor.info/t/arrowup.gif" alt="S" />'
+        f'&nbsp;{i * 7 % 500}</span>&nbsp;<img src="//s.rutor.info/t/arrowdown.gif" '
+        f'alt="L" /><span class="red">&nbsp;{i * 3 % 90}</span>'
+    )
+    size = f"{i % 40}.{i % 100:02d}&nbsp;GB"
+    date = f"{i % 28 + 1:02d}&nbsp;Окт&nbsp;24"
+
+    if i % 3:
+        # ROW WITH COMMENTS COLUMN
+        return (
+            f'<tr class="{row_class}"><td>{date}</td><td >{links}</td>'
+            '<td align="right"><img src="//s.rutor.info/i/com.gif" alt="C" />'
+            f'<a href="/torrent/{900000 + i}#com">{i % 9}</a></td>'
+            f'<td align="right">{size}</td><td align="center">{peers}</td></tr>\n'
+        )
+    return (
+        f'<tr class="{row_class}"><td>{date}</td><td colspan = "2">{links}</td>'
+        f'<td align="right">{size}</td><td align="center">{peers}</td></tr>\n'
+    )
+
+
+def rutor_page(rows: int = 100) -> str:
+    table = (
+        '<div id="index"><b>Результатов поиска '
+        f'{rows} (max. 2000)</b><table width="100%">'
+        '<tr class="backgr"><td width="10px">Добавлен</td>'
+        '<td colspan="2">Название</td><td width="1px">Размер</td>'
+        '<td width="1px">Пиры</td></tr>\n'
+        + "".join(make_rutor_row(i) for i in range(rows))
+        + "</table>"
+    )
+    return RUTOR_HEAD + table + RUTOR_FOOT
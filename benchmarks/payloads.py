@@ -0,0 +1,153 @@
+"""
+Генераторы ответов Кинопоиск API для бенчмарков.
+
+Структура повторяет поля, которые читают парсеры из
+hubble/services/kinopoisk/parsers.py (film/tvseries base info,
+person preview card, trivias, media posts), а размеры списков
+соответствуют типичному ответу на популярный тайтл.
+"""
+
+
+def make_person(person_id: int, with_best: bool = False) -> dict:
+    person = {
+        "__typename": "Person",
+        "id": person_id,
+        "name": f"Имя Фамилия {person_id}",
+        "originalName": f"First Last {person_id}",
+        "birthDate": f"19{50 + person_id % 50}-0{person_id % 9 + 1}-1{person_id % 9}",
+        "poster": {"avatarsUrl": f"//avatars.mds.yandex.net/get-kinopoisk/{person_id}"},
+        "roles": {
+            "items": [
+                {"role": {"title": {"russian": "Актер", "english": "Actor"}}},
+                {"role": {"title": {"russian": "Продюсер", "english": "Producer"}}},
+            ]
+        },
+    }
+    if with_best:
+        person["bestFilms"] = {
+            "items": [{"movie": make_movie(1000 + i, n_persons=0)} for i in range(10)]
+        }
+        person["bestSeries"] = {
+            "items": [
+                {"movie": make_movie(2000 + i, "TvSeries", n_persons=0)}
+                for i in range(10)
+            ]
+        }
+    return person
+
+
+def _people(start: int, count: int) -> dict:
+    return {
+        "items": [{"person": make_person(start + i)} for i in range(count)],
+        "total": count,
+    }
+
+
+def make_movie(
+    movie_id: int,
+    typename: str = "Film",
+    n_persons: int = 30,
+    n_sequels: int = 0,
+) -> dict:
+    movie = {
+        "__typename": typename,
+        "id": movie_id,
+        "title": {"russian": f"Название {movie_id}", "original": f"Title {movie_id}"},
+        "productionYear": 1990 + movie_id % 35,
+        "shortDescription": "Короткое описание фильма в одну строку.",
+        "synopsis": "Длинное описание сюжета. " * 20,
+        "genres": [
+            {"__typename": "Genre", "id": 2, "name": "драма", "slug": "drama"},
+            {"__typename": "Genre", "id": 8, "name": "криминал", "slug": "crime"},
+            {"__typename": "Genre", "id": 13, "name": "триллер", "slug": "thriller"},
+        ],
+        "countries": [
+            {"__typename": "Country", "id": 1, "name": "США"},
+            {"__typename": "Country", "id": 11, "name": "Великобритания"},
+        ],
+        "mainTrailer": {
+            "streamUrl": f"https://strm.yandex.ru/vh-kp-converted/{movie_id}.m3u8",
+            "sourceVideoUrl": None,
+        },
+        "cover": {"image": {"avatarsUrl": None}},
+        "actors": _people(10000, n_persons),
+        "voiceOverActors": _people(20000, n_persons // 3),
+        "tagline": "«Слоган»",
+        "directors": _people(30000, 2 if n_persons else 0),
+        "poster": {"avatarsUrl": f"//avatars.mds.yandex.net/get-kinopoisk/p{movie_id}"},
+        "rating": {
+            "imdb": {"value": 8.1},
+            "kinopoisk": {"value": 8.4},
+            "russianCritics": {"value": None},
+            "worldwideCritics": {"value": 7.9},
+        },
+        "ratingLists": {"top10": {"position": None}, "top250": {"position": 42}},
+        "duration": 139,
+    }
+    if typename == "TvSeries":
+        movie.update(
+            {
+                "releaseYears": [{"start": 2008, "end": 2013}],
+                "seasons": {"total": 5},
+                "totalDuration": 2760,
+                "seriesDuration": 47,
+            }
+        )
+    if n_sequels:
+        movie["sequelsPrequels"] = {
+            "items": [
+                {
+                    "relationType": "AFTER" if i % 2 else "BEFORE",
+                    "movie": make_movie(
+                        movie_id + 1 + i, "TvSeries" if i % 3 else "Film", n_persons=3
+                    ),
+                }
+                for i in range(n_sequels)
+            ]
+        }
+    return movie
+
+
+def make_trivia(trivia_id: int) -> dict:
+    return {
+        "__typename": "Trivia",
+        "id": trivia_id,
+        "isSpoiler": trivia_id % 5 == 0,
+        "text": "Факт о <a href='/name/1/'>фильме</a> &laquo;с разметкой&raquo;. " * 3,
+        "type": "FACT",
+    }
+
+
+def make_media_post(post_id: int) -> dict:
+    return {
+        "__typename": "Post",
+        "id": post_id,
+        "title": f"Статья {post_id}",
+        "publishedAt": "2024-03-0%dT12:30:00Z" % (post_id % 9 + 1),
+        "type": "ARTICLE",
+        "thumbImage": {"avatarsUrl": f"//avatars.mds.yandex.net/get-media/{post_id}"},
+    }
+
+
+def film_payload(movie_id: int = 435) -> dict:
+    return make_movie(movie_id, "Film", n_persons=30)
+
+
+def tvseries_payload(movie_id: int = 404900) -> dict:
+    return make_movie(movie_id, "TvSeries", n_persons=30, n_sequels=6)
+
+
+def person_payload(person_id: int = 7836) -> dict:
+    return make_person(person_id, with_best=True)
+
+
+def similars_payload(count: int = 20) -> list[dict]:
+    return [make_movie(5000 + i, "Film", n_persons=0) for i in range(count)]
+
+
+def trivias_payload(count: int = 150) -> list[dict]:
+    return [make_trivia(i + 1) for i in range(count)]
+
+
+def media_posts_payload(count: int = 30) -> list[dict]:
+    return [make_media_post(i + 1) for i in range(count)]
@@ -1,10 +1,68 @@
+from sqlalchemy import event
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 
 DATABASE_URL = "sqlite+aiosqlite:///database/hubble.db"
 
-engine = create_async_engine(DATABASE_URL, echo=True)
+# ПРОФИЛИ НАСТРОЕК ДВИЖКА SQLITE, PRAGMA ВЫПОЛНЯЮТСЯ ПРИ КАЖДОМ ПОДКЛЮЧЕНИИ
+DATABASE_PROFILES = {
+    # SQLITE DEFAULTS: ROLLBACK JOURNAL, FULL SYNC, EVERY STATEMENT IS LOGGED
+    "default": {"echo": True, "connect_args": {}, "pragmas": {}},
+    "tuned": {
+        "echo": False,
+        # PREPARED STATEMENTS CACHED BY SQLITE3 FOR EACH CONNECTION
+        "connect_args": {"cached_statements": 512},
+        "pragmas": {
+            # READERS ARE NOT BLOCKED BY THE WRITER
+            "journal_mode": "WAL",
+            # NO FSYNC ON EACH COMMIT (WAL STAYS CONSISTENT ON A CRASH)
+            "synchronous": "NORMAL",
+            "mmap_size": 256 * 1024 * 1024,
+            # NEGATIVE SIZE IS IN KIB
+            "cache_size": -64 * 1024,
+            "busy_timeout": 5000,
+            "temp_store": "MEMORY",
+        },
+    },
+}
+DATABASE_PROFILE = "tuned"
+
+
+def create_db_engine(
+    url: str = DATABASE_URL, profile: str = DATABASE_PROFILE
+) -> AsyncEngine:
+    """
+    Функция для создания асинхронного движка SQLite с настройками профиля
+    из DATABASE_PROFILES.
+
+    Parameters:
+        url (str): URL базы данных.
+        profile (str): Имя профиля из DATABASE_PROFILES.
+
+    Returns:
+        AsyncEngine: Движок, подключения которого настраиваются PRAGMA профиля.
+    """
+
+    settings = DATABASE_PROFILES[profile]
+    db_engine = create_async_engine(
+        url, echo=settings["echo"], connect_args=settings["connect_args"]
+    )
+
+    pragmas = settings["pragmas"]
+    if pragmas:
+
+        @event.listens_for(db_engine.sync_engine, "connect")
+        def set_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+            cursor.close()
+
+    return db_engine
+
+
+engine = create_db_engine()
 AsyncSessionLocal = sessionmaker(
     bind=engine, class_=AsyncSession, expire_on_commit=False
 )
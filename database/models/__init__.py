@@ -1 +1,8 @@
 from database.models.models import Person, Film, TvSeries, Genre, Country, Role, Trivia
+from database.models.models import Season, Episode, TorampTitle
+from database.models.search_index import SEARCH_INDEX_TABLE, decode_search_index_rowid
+from database.models.search_index import TITLE_INDEX_TABLE, TITLE_INDEX_INSERT
+from database.models.search_index import TITLE_INDEX_COLUMNS
+from database.models.search_index import TITLE_INDEX_SOURCES, make_title_index_rows
+from database.models.search_index import normalize_title, make_trigrams
+from database.models.search_index import trigram_similarity
@@ -54,6 +54,8 @@ class Film(Base):
     kinopoisk_url = Column(String)
     created_at = Column(DateTime, default=datetime.now)
     updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
+    # LAST WRITE OF THE FULL /info DATA (NOT OF A PARTIAL ONE FROM A LIST)
+    info_updated_at = Column(DateTime)
 
     genres = relationship("Genre", secondary=genre_films, back_populates="films")
     countries = relationship(
@@ -131,6 +133,8 @@ class TvSeries(Base):
     toramp_url = Column(String)
     created_at = Column(DateTime, default=datetime.now)
     updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
+    # LAST WRITE OF THE FULL /info DATA (NOT OF A PARTIAL ONE FROM A LIST)
+    info_updated_at = Column(DateTime)
 
     genres = relationship("Genre", secondary=genre_tvseries, back_populates="tvseries")
     countries = relationship(
@@ -368,6 +372,7 @@ class Trivia(Base):
 
     id = Column(Integer, primary_key=True, index=True, nullable=False)
     kinopoisk_id = Column(Integer, index=True, nullable=False, unique=True)
+    is_spoiler = Column(Boolean)
     text = Column(String, nullable=False)
     trivia_type = Column(String, index=True, nullable=False)
     created_at = Column(DateTime, default=datetime.now)
@@ -382,8 +387,35 @@ class Trivia(Base):
         return str(
             {
                 "id": self.id,
+                "is_spoiler": self.is_spoiler,
                 "text": self.text,
                 "trivia_type": self.trivia_type,
                 "typename": self.__qualname__.lower(),
             }
         )
+
+
+class TorampTitle(Base):
+    __tablename__ = "toramp_titles"
+
+    id = Column(Integer, primary_key=True, index=True, nullable=False)
+    query = Column(String, nullable=False, index=True, unique=True)
+    toramp_id = Column(String, nullable=False, index=True)
+    url = Column(String, nullable=False)
+    poster_url = Column(String)
+    title_russian = Column(String)
+    production_year = Column(String)
+    typename = Column(String)
+    created_at = Column(DateTime, default=datetime.now)
+    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
+
+    def __repr__(self):
+        return str(
+            {
+                "id": self.id,
+                "query": self.query,
+                "toramp_id": self.toramp_id,
+                "url": self.url,
+                "typename": self.__qualname__.lower(),
+            }
+        )
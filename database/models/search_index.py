@@ -0,0 +1,215 @@
+import re
+import unicodedata
+from sqlalchemy import event, text
+
+from database.db import Base
+
+
+# ПОЛНОТЕКСТОВЫЙ ИНДЕКС (FTS5) ФИЛЬМОВ, СЕРИАЛОВ И ПЕРСОН ДЛЯ ЛОКАЛЬНОГО ПОИСКА.
+# ИНДЕКС ОБНОВЛЯЕТСЯ ТРИГГЕРАМИ SQLITE ПРИ ЛЮБОЙ ЗАПИСИ В ИСХОДНЫЕ ТАБЛИЦЫ
+SEARCH_INDEX_TABLE = "search_index"
+SEARCH_INDEX_COLUMNS = ("name", "original_name", "tagline", "description")
+SEARCH_INDEX_TOKENIZER = "unicode61 remove_diacritics 2"
+
+# ROWID OF THE INDEX ROW IS id * SEARCH_INDEX_ROWID_STEP + CODE OF THE SOURCE
+SEARCH_INDEX_ROWID_STEP = 4
+# {typename: (table, code, source column for each of SEARCH_INDEX_COLUMNS)}
+SEARCH_INDEX_SOURCES = {
+    "film": (
+        "films",
+        1,
+        ("title_russian", "title_original", "tagline", "short_description"),
+    ),
+    "tvseries": (
+        "tvseries",
+        2,
+        ("title_russian", "title_original", "tagline", "short_description"),
+    ),
+    "person": ("persons", 3, ("name", "original_name", None, None)),
+}
+
+# НЕЧЁТКИЙ (ТРИГРАММНЫЙ) ИНДЕКС НАЗВАНИЙ И ИМЁН. ТЕКСТ НОРМАЛИЗУЕТСЯ В PYTHON
+# (normalize_title), ПОЭТОМУ ИНДЕКС ОБНОВЛЯЕТСЯ ПРИ ЗАПИСИ (upsert_objects).
+# ROWID СТРОКИ СОВПАДАЕТ С ROWID СТРОКИ SEARCH_INDEX_TABLE
+TITLE_INDEX_TABLE = "title_index"
+TITLE_INDEX_COLUMNS = ("name", "original_name")
+# {typename: source column for each of TITLE_INDEX_COLUMNS}
+TITLE_INDEX_SOURCES = {
+    "film": ("title_russian", "title_original"),
+    "tvseries": ("title_russian", "title_original"),
+    "person": ("name", "original_name"),
+}
+
+# RUSSIAN TITLES ARE INDEXED (AND SEARCHED) IN LATIN, AS USERS TYPE THEM
+TRANSLITERATION = str.maketrans(
+    {
+        "а": "a", "б": "b", "в": "v", "г": "g", "д": "d", "е": "e", "ё": "e",
+        "ж": "zh", "з": "z", "и": "i", "й": "y", "к": "k", "л": "l", "м": "m",
+        "н": "n", "о": "o", "п": "p", "р": "r", "с": "s", "т": "t", "у": "u",
+        "ф": "f", "х": "h", "ц": "ts", "ч": "ch", "ш": "sh", "щ": "sch",
+        "ъ": "", "ы": "y", "ь": "", "э": "e", "ю": "yu", "я": "ya",
+    }
+)  # fmt: skip
+NOT_ALPHANUMERIC_PATTERN = re.compile(r"[^0-9a-z]+")
+
+TITLE_INDEX_INSERT = (
+    f"INSERT INTO {TITLE_INDEX_TABLE} (rowid, {', '.join(TITLE_INDEX_COLUMNS)}) "
+    f"VALUES (:rowid, {', '.join(':' + column for column in TITLE_INDEX_COLUMNS)})"
+)
+
+
+def decode_search_index_rowid(rowid: int) -> tuple[str, int]:
+    """
+    Функция для получения типа (typename) и id записи исходной таблицы
+    по rowid строки полнотекстового индекса.
+    """
+
+    code = rowid % SEARCH_INDEX_ROWID_STEP
+    for typename, (_, source_code, _) in SEARCH_INDEX_SOURCES.items():
+        if source_code == code:
+            return typename, rowid // SEARCH_INDEX_ROWID_STEP
+    raise ValueError(f"Unknown search index rowid: {rowid}")
+
+
+def make_search_index_rowid(typename: str, obj_id: int) -> int:
+    _, code, _ = SEARCH_INDEX_SOURCES[typename]
+    return obj_id * SEARCH_INDEX_ROWID_STEP + code
+
+
+def normalize_title(title: str | None) -> str:
+    """
+    Функция для нормализации названия или имени для нечёткого поиска:
+    нижний регистр, транслитерация кириллицы, удаление диакритических знаков
+    и всех символов, кроме латинских букв и цифр.
+    Например, "Ёлки 2" -> "elki 2", "Pokémon" -> "pokemon".
+    """
+
+    if not title:
+        return ""
+    title = unicodedata.normalize("NFKD", title.casefold().translate(TRANSLITERATION))
+    title = "".join(char for char in title if not unicodedata.combining(char))
+    return " ".join(NOT_ALPHANUMERIC_PATTERN.sub(" ", title).split())
+
+
+def make_trigrams(text: str) -> set[str]:
+    # EACH WORD IS PADDED AS IN PG_TRGM: "  word "
+    trigrams = set()
+    for word in text.split():
+        padded = f"  {word} "
+        trigrams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return trigrams
+
+
+def trigram_similarity(trigrams: set[str], other_trigrams: set[str]) -> float:
+    if not trigrams or not other_trigrams:
+        return 0.0
+    shared = len(trigrams & other_trigrams)
+    return shared / (len(trigrams) + len(other_trigrams) - shared)
+
+
+def make_title_index_rows(typename: str, rows) -> list[dict]:
+    """
+    Функция для получения строк TITLE_INDEX_TABLE из строк исходной
+    таблицы (id и столбцы из TITLE_INDEX_SOURCES в том же порядке).
+    """
+
+    return [
+        {
+            "rowid": make_search_index_rowid(typename, row[0]),
+            **{
+                column: normalize_title(value)
+                for column, value in zip(TITLE_INDEX_COLUMNS, row[1:])
+            },
+        }
+        for row in rows
+    ]
+
+
+def _make_rowid(row: str, code: int) -> str:
+    return f"{row}.id * {SEARCH_INDEX_ROWID_STEP} + {code}"
+
+
+def _make_values(row: str, columns: tuple) -> str:
+    # "Ё" IS NOT FOLDED BY THE TOKENIZER: IT IS INDEXED AS "Е"
+    return ", ".join(
+        f"replace(replace({row}.{column}, 'ё', 'е'), 'Ё', 'Е')" if column else "NULL"
+        for column in columns
+    )
+
+
+def make_search_index_ddl() -> list[str]:
+    index_columns = ", ".join(SEARCH_INDEX_COLUMNS)
+    ddl = [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_INDEX_TABLE} "
+        f"USING fts5({index_columns}, "
+        f"tokenize = '{SEARCH_INDEX_TOKENIZER}', prefix = '2 3')",
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {TITLE_INDEX_TABLE} "
+        f"USING fts5({', '.join(TITLE_INDEX_COLUMNS)}, tokenize = 'trigram')",
+    ]
+    for table, code, columns in SEARCH_INDEX_SOURCES.values():
+        insert = (
+            f"INSERT INTO {SEARCH_INDEX_TABLE} (rowid, {index_columns}) "
+            f"VALUES ({_make_rowid('new', code)}, {_make_values('new', columns)});"
+        )
+        delete = (
+            f"DELETE FROM {SEARCH_INDEX_TABLE} "
+            f"WHERE rowid = {_make_rowid('old', code)};"
+        )
+        # UPSERTS REWRITE ALL COLUMNS: THE INDEX IS UPDATED ONLY IF TEXT CHANGED
+        changed = " OR ".join(
+            f"old.{column} IS NOT new.{column}" for column in columns if column
+        )
+        ddl += [
+            f"CREATE TRIGGER IF NOT EXISTS {table}_search_index_insert "
+            f"AFTER INSERT ON {table} BEGIN {insert} END",
+            f"CREATE TRIGGER IF NOT EXISTS {table}_search_index_update "
+            f"AFTER UPDATE ON {table} WHEN {changed} BEGIN {delete} {insert} END",
+            f"CREATE TRIGGER IF NOT EXISTS {table}_search_index_delete "
+            f"AFTER DELETE ON {table} BEGIN {delete} END",
+        ]
+    return ddl
+
+
+def make_search_index_backfill() -> list[str]:
+    index_columns = ", ".join(SEARCH_INDEX_COLUMNS)
+    return [
+        f"INSERT INTO {SEARCH_INDEX_TABLE} (rowid, {index_columns}) "
+        f"SELECT {_make_rowid(table, code)}, {_make_values(table, columns)} "
+        f"FROM {table}"
+        for table, code, columns in SEARCH_INDEX_SOURCES.values()
+    ]
+
+
+def _table_exists(connection, name: str) -> bool:
+    return (
+        connection.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)
+        ).first()
+        is not None
+    )
+
+
+def _backfill_title_index(connection) -> None:
+    for typename, columns in TITLE_INDEX_SOURCES.items():
+        table = SEARCH_INDEX_SOURCES[typename][0]
+        rows = connection.exec_driver_sql(
+            f"SELECT id, {', '.join(columns)} FROM {table}"
+        ).all()
+        if rows:
+            connection.execute(
+                text(TITLE_INDEX_INSERT), make_title_index_rows(typename, rows)
+            )
+
+
+@event.listens_for(Base.metadata, "after_create")
+def create_search_index(target, connection, **kw) -> None:
+    search_index_exists = _table_exists(connection, SEARCH_INDEX_TABLE)
+    title_index_exists = _table_exists(connection, TITLE_INDEX_TABLE)
+    for statement in make_search_index_ddl():
+        connection.exec_driver_sql(statement)
+    # ROWS STORED BEFORE THE INDEXES EXISTED ARE INDEXED ONCE
+    if not search_index_exists:
+        for statement in make_search_index_backfill():
+            connection.exec_driver_sql(statement)
+    if not title_index_exists:
+        _backfill_title_index(connection)
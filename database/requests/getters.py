@@ -0,0 +1,609 @@
+import re
+from datetime import datetime, timedelta
+from sqlalchemy import or_, select, text
+from sqlalchemy.orm import raiseload, selectinload
+
+from database.db import AsyncSessionLocal
+from database.models import Person, Film, TvSeries, Genre, Country, TorampTitle
+from database.models import Trivia, Season, Episode
+from database.models import SEARCH_INDEX_TABLE, decode_search_index_rowid
+from database.models import TITLE_INDEX_TABLE, TITLE_INDEX_COLUMNS
+from database.models import normalize_title, make_trigrams, trigram_similarity
+
+
+# WEIGHTS OF THE SEARCH INDEX COLUMNS IN RANKING:
+# NAME, ORIGINAL NAME, TAGLINE, DESCRIPTION
+SEARCH_RANK_WEIGHTS = (10.0, 10.0, 2.0, 1.0)
+SEARCH_TOKEN_PATTERN = re.compile(r"\w+")
+
+# FUZZY SEARCH: MIN TRIGRAM SIMILARITY OF A RESULT AND NUMBER OF CANDIDATES
+# (ROWS SHARING TRIGRAMS WITH THE QUERY) THAT ARE SCORED
+FUZZY_MIN_SIMILARITY = 0.3
+FUZZY_CANDIDATES = 100
+
+
+def _is_fresh(obj, max_age: timedelta | None, column: str = "updated_at") -> bool:
+    if max_age is None:
+        return True
+    updated_at = getattr(obj, column)
+    if updated_at is None:
+        return False
+    return datetime.now() - updated_at <= max_age
+
+
+def _format_date(value) -> str | None:
+    return value.isoformat() if value else None
+
+
+def _get_loaded(obj, key: str) -> list:
+    # RELATIONSHIPS THAT WERE NOT LOADED (raiseload) ARE SERIALIZED AS EMPTY
+    return obj.__dict__.get(key, [])
+
+
+# Функции для сериализации объектов БД в формат парсеров Кинопоиска:
+
+
+def serialize_person(person: Person) -> dict:
+    return {
+        "id": person.kinopoisk_id,
+        "name": person.name,
+        "original_name": person.original_name,
+        "birth_date": _format_date(person.birth_date),
+        "roles": [role.name for role in person.roles],
+        "avatars_url": person.kinopoisk_avatars_url,
+        "person_url": person.kinopoisk_person_url,
+        "typename": "person",
+    }
+
+
+def serialize_genre(genre: Genre) -> dict:
+    return {
+        "id": genre.kinopoisk_id,
+        "name": genre.name,
+        "slug": genre.slug,
+        "typename": "genre",
+    }
+
+
+def serialize_country(country: Country) -> dict:
+    return {
+        "id": country.kinopoisk_id,
+        "name": country.name,
+        "typename": "country",
+    }
+
+
+def serialize_film(film: Film) -> dict:
+    return {
+        "id": film.kinopoisk_id,
+        "title_russian": film.title_russian,
+        "title_original": film.title_original,
+        "production_year": film.production_year,
+        "short_description": film.short_description,
+        "synopsis": film.synopsis,
+        "genres": [serialize_genre(genre) for genre in film.genres],
+        "countries": [serialize_country(country) for country in film.countries],
+        "trailer_stream_url": film.trailer_ya_stream_url,
+        "trailer_youtube": film.trailer_youtube,
+        "cover_url": film.cover_url,
+        "actors": [serialize_person(person) for person in _get_loaded(film, "actors")],
+        "voice_over_actors": [
+            serialize_person(person)
+            for person in _get_loaded(film, "voice_over_actors")
+        ],
+        "tagline": film.tagline,
+        "directors": [
+            serialize_person(person) for person in _get_loaded(film, "directors")
+        ],
+        "poster_url": film.kinopoisk_poster_url,
+        "rating_imdb": film.rating_imdb,
+        "rating_kinopoisk": film.rating_kinopoisk,
+        "rating_kinopoisk_top10_pos": film.rating_kinopoisk_top10_pos,
+        "rating_kinopoisk_top250_pos": film.rating_kinopoisk_top250_pos,
+        "rating_russian_critics": film.rating_russian_critics,
+        "rating_world_wide_critics": film.rating_world_wide_critics,
+        "duration": film.duration,
+        "url": film.kinopoisk_url,
+        "typename": "film",
+    }
+
+
+def serialize_tvseries(tvseries: TvSeries) -> dict:
+    return {
+        "id": tvseries.kinopoisk_id,
+        "title_russian": tvseries.title_russian,
+        "title_original": tvseries.title_original,
+        "production_year": tvseries.production_year,
+        "short_description": tvseries.short_description,
+        "synopsis": tvseries.synopsis,
+        "release_start": tvseries.release_start,
+        "release_end": tvseries.release_end,
+        "genres": [serialize_genre(genre) for genre in tvseries.genres],
+        "countries": [serialize_country(country) for country in tvseries.countries],
+        "seasons_count": tvseries.seasons_count,
+        "cover_url": tvseries.cover_url,
+        "trailer_stream_url": tvseries.trailer_ya_stream_url,
+        "trailer_youtube": tvseries.trailer_youtube,
+        "actors": [
+            serialize_person(person) for person in _get_loaded(tvseries, "actors")
+        ],
+        "voice_over_actors": [
+            serialize_person(person)
+            for person in _get_loaded(tvseries, "voice_over_actors")
+        ],
+        "tagline": tvseries.tagline,
+        "directors": [
+            serialize_person(person) for person in _get_loaded(tvseries, "directors")
+        ],
+        "poster_url": tvseries.kinopoisk_poster_url,
+        "rating_imdb": tvseries.rating_imdb,
+        "rating_kinopoisk": tvseries.rating_kinopoisk,
+        "rating_kinopoisk_top10_pos": tvseries.rating_kinopoisk_top10_pos,
+        "rating_kinopoisk_top250_pos": tvseries.rating_kinopoisk_top250_pos,
+        "rating_russian_critics": tvseries.rating_russian_critics,
+        "rating_worldwide_critics": tvseries.rating_world_wide_critics,
+        "duration_total": tvseries.duration_total,
+        "duration_series": tvseries.duration_series,
+        "sequels": [
+            serialize_tvseries(sequel) for sequel in _get_loaded(tvseries, "sequels")
+        ],
+        "prequels": [
+            serialize_tvseries(prequel) for prequel in _get_loaded(tvseries, "prequels")
+        ],
+        "url": tvseries.kinopoisk_url,
+        "typename": "tvseries",
+    }
+
+
+def serialize_trivia(trivia: Trivia) -> dict:
+    return {
+        "id": trivia.kinopoisk_id,
+        "is_spoiler": trivia.is_spoiler,
+        "text": trivia.text,
+        "trivia_type": trivia.trivia_type,
+        "typename": "trivia",
+    }
+
+
+def serialize_episode(episode: Episode) -> dict:
+    return {
+        "episode_number": episode.episode_number,
+        "title_russian": episode.title_russian,
+        "title_original": episode.title_original,
+        "release_date": _format_date(episode.release_date),
+        "typename": "episode",
+    }
+
+
+def serialize_season(season: Season) -> dict:
+    episodes = sorted(season.episodes, key=lambda episode: episode.episode_number)
+    return {
+        "season_number": season.season_number,
+        "release_year": season.release_year,
+        "episodes": [serialize_episode(episode) for episode in episodes],
+        "typename": "season",
+    }
+
+
+def serialize_toramp_title(toramp_title: TorampTitle) -> dict:
+    return {
+        "id": toramp_title.toramp_id,
+        "url": toramp_title.url,
+        "poster_url": toramp_title.poster_url,
+        "title_russian": toramp_title.title_russian,
+        "production_year": toramp_title.production_year,
+        "typename": toramp_title.typename,
+    }
+
+
+# Опции загрузки связей. Все связи, которые читают сериализаторы, загружаются
+# заранее (selectinload - один запрос на связь), остальные запрещены (raiseload),
+# поэтому количество запросов не зависит от размера графа объекта:
+
+
+def _movie_options(model) -> list:
+    options = [
+        selectinload(model.genres),
+        selectinload(model.countries),
+        selectinload(model.actors).selectinload(Person.roles),
+        selectinload(model.directors).selectinload(Person.roles),
+        selectinload(model.voice_over_actors).selectinload(Person.roles),
+    ]
+    if model is TvSeries:
+        options += [
+            selectinload(TvSeries.sequels).options(*_nested_movie_options(TvSeries)),
+            selectinload(TvSeries.prequels).options(*_nested_movie_options(TvSeries)),
+        ]
+    return options + [raiseload("*")]
+
+
+def _nested_movie_options(model) -> list:
+    # NESTED MOVIES (SEQUELS, BEST FILMS OF A PERSON, SEARCH RESULTS) HAVE
+    # NO CAST AND NO NESTED MOVIES, LIKE IN THE RESPONSES OF KINOPOISK
+    return [
+        selectinload(model.genres),
+        selectinload(model.countries),
+        raiseload("*"),
+    ]
+
+
+# Функции для чтения объектов верхнего уровня:
+
+
+async def get_film(kinopoisk_id: int, max_age: timedelta | None = None) -> dict | None:
+    """
+    Функция для получения фильма из БД в формате parse_film_data.
+
+    Parameters:
+        kinopoisk_id (int): ID фильма на Кинопоиске.
+        max_age (timedelta | None): Максимальный возраст полных данных
+        (по info_updated_at). Более старые записи и записи, сохранённые только
+        из неполных представлений (списки /similars, /search), считаются устаревшими.
+
+    Returns:
+        dict | None: Данные о фильме или None, если записи нет или она устарела.
+    """
+
+    stmt = (
+        select(Film)
+        .where(Film.kinopoisk_id == kinopoisk_id)
+        .options(*_movie_options(Film))
+    )
+    async with AsyncSessionLocal() as session:
+        film = (await session.execute(stmt)).scalar_one_or_none()
+        if film is None or not _is_fresh(film, max_age, "info_updated_at"):
+            return None
+        return serialize_film(film)
+
+
+async def get_tvseries(
+    kinopoisk_id: int, max_age: timedelta | None = None
+) -> dict | None:
+    """
+    Функция для получения сериала из БД в формате parse_tvseries_data.
+
+    Parameters:
+        kinopoisk_id (int): ID сериала на Кинопоиске.
+        max_age (timedelta | None): Максимальный возраст полных данных
+        (по info_updated_at). Более старые записи и записи, сохранённые только
+        из неполных представлений (списки /similars, /search, сиквелы и приквелы),
+        считаются устаревшими.
+
+    Returns:
+        dict | None: Данные о сериале или None, если записи нет или она устарела.
+    """
+
+    stmt = (
+        select(TvSeries)
+        .where(TvSeries.kinopoisk_id == kinopoisk_id)
+        .options(*_movie_options(TvSeries))
+    )
+    async with AsyncSessionLocal() as session:
+        tvseries = (await session.execute(stmt)).scalar_one_or_none()
+        if tvseries is None or not _is_fresh(tvseries, max_age, "info_updated_at"):
+            return None
+        return serialize_tvseries(tvseries)
+
+
+async def get_person(
+    kinopoisk_id: int, max_age: timedelta | None = None
+) -> dict | None:
+    """
+    Функция для получения персоны из БД в формате parse_person_data.
+    В best_films и best_tvseries попадают сохранённые фильмы и сериалы,
+    в которых персона - актёр, режиссёр или актёр дубляжа
+    (по убыванию рейтинга Кинопоиска).
+
+    Parameters:
+        kinopoisk_id (int): ID персоны на Кинопоиске.
+        max_age (timedelta | None): Максимальный возраст записи (по updated_at).
+        Более старые записи считаются устаревшими.
+
+    Returns:
+        dict | None: Данные о персоне или None, если записи нет или она устарела.
+    """
+
+    stmt = (
+        select(Person)
+        .where(Person.kinopoisk_id == kinopoisk_id)
+        .options(selectinload(Person.roles), raiseload("*"))
+    )
+    async with AsyncSessionLocal() as session:
+        person = (await session.execute(stmt)).scalar_one_or_none()
+        if person is None or not _is_fresh(person, max_age):
+            return None
+        person_data = serialize_person(person)
+        films = await _get_person_movies(Film, person.id, session)
+        tvseries = await _get_person_movies(TvSeries, person.id, session)
+        person_data["best_films"] = [serialize_film(film) for film in films]
+        person_data["best_tvseries"] = [serialize_tvseries(item) for item in tvseries]
+        return person_data
+
+
+async def _get_person_movies(model, person_id: int, session) -> list:
+    # ONE QUERY FOR ALL LINKS INSTEAD OF LOADING EACH OF THE PERSON'S COLLECTIONS
+    is_linked = or_(
+        model.actors.any(Person.id == person_id),
+        model.directors.any(Person.id == person_id),
+        model.voice_over_actors.any(Person.id == person_id),
+    )
+    stmt = (
+        select(model)
+        .where(is_linked)
+        .order_by(model.rating_kinopoisk.desc().nulls_last(), model.id)
+        .options(*_nested_movie_options(model))
+    )
+    return (await session.execute(stmt)).scalars().all()
+
+
+async def get_trivias(content_type: str, kinopoisk_id: int) -> list[dict]:
+    """
+    Функция для получения фактов о фильме или сериале из БД
+    в формате parse_trivia_data.
+
+    Parameters:
+        content_type (str): Тип контента ("film" или "tvseries").
+        kinopoisk_id (int): ID фильма или сериала на Кинопоиске.
+
+    Returns:
+        list[dict]: Факты (пустой список, если их нет в БД).
+    """
+
+    model = SEARCH_MODELS[content_type]
+    movies = Trivia.films if model is Film else Trivia.tvseries
+    stmt = (
+        select(Trivia)
+        .where(movies.any(model.kinopoisk_id == kinopoisk_id))
+        .order_by(Trivia.id)
+        .options(raiseload("*"))
+    )
+    async with AsyncSessionLocal() as session:
+        trivias = (await session.execute(stmt)).scalars().all()
+        return [serialize_trivia(trivia) for trivia in trivias]
+
+
+async def get_seasons(kinopoisk_id: int) -> list[dict]:
+    """
+    Функция для получения сезонов сериала с эпизодами из БД.
+
+    Parameters:
+        kinopoisk_id (int): ID сериала на Кинопоиске.
+
+    Returns:
+        list[dict]: Сезоны по возрастанию номера (пустой список,
+        если их нет в БД).
+    """
+
+    stmt = (
+        select(Season)
+        .join(Season.tvseries)
+        .where(TvSeries.kinopoisk_id == kinopoisk_id)
+        .order_by(Season.season_number)
+        .options(selectinload(Season.episodes), raiseload("*"))
+    )
+    async with AsyncSessionLocal() as session:
+        seasons = (await session.execute(stmt)).scalars().all()
+        return [serialize_season(season) for season in seasons]
+
+
+async def get_episode(
+    kinopoisk_id: int, season_number: int, episode_number: int
+) -> dict | None:
+    """
+    Функция для получения эпизода сериала из БД.
+
+    Parameters:
+        kinopoisk_id (int): ID сериала на Кинопоиске.
+        season_number (int): Номер сезона.
+        episode_number (int): Номер эпизода в сезоне.
+
+    Returns:
+        dict | None: Данные об эпизоде или None, если записи нет.
+    """
+
+    stmt = (
+        select(Episode)
+        .join(Episode.season)
+        .join(Season.tvseries)
+        .where(
+            TvSeries.kinopoisk_id == kinopoisk_id,
+            Season.season_number == season_number,
+            Episode.episode_number == episode_number,
+        )
+        .options(raiseload("*"))
+    )
+    async with AsyncSessionLocal() as session:
+        episode = (await session.execute(stmt)).scalar_one_or_none()
+        return serialize_episode(episode) if episode is not None else None
+
+
+async def get_toramp_title(query: str, max_age: timedelta | None = None) -> dict | None:
+    """
+    Функция для получения сохранённого результата поиска toramp
+    в формате parse_search.
+
+    Parameters:
+        query (str): Нормализованный запрос (название сериала).
+        max_age (timedelta | None): Максимальный возраст записи (по updated_at).
+
+    Returns:
+        dict | None: Результат поиска или None, если записи нет или она устарела.
+    """
+
+    stmt = select(TorampTitle).where(TorampTitle.query == query)
+    async with AsyncSessionLocal() as session:
+        toramp_title = (await session.execute(stmt)).scalar_one_or_none()
+        if toramp_title is None or not _is_fresh(toramp_title, max_age):
+            return None
+        return serialize_toramp_title(toramp_title)
+
+
+async def search_local(query: str, limit: int = 10) -> dict | None:
+    """
+    Функция для поиска фильмов, сериалов и персон, сохранённых в БД,
+    по полнотекстовому индексу (FTS5). Каждое слово запроса ищется как
+    префикс в названиях, слогане, кратком описании и именах персон.
+
+    Parameters:
+        query (str): Запрос поиска.
+        limit (int): Максимальное количество найденных объектов.
+
+    Returns:
+        dict | None: Результат в формате search_result из get_search:
+        лучший результат в match, остальные - в movies и persons.
+        None, если ничего не найдено.
+    """
+
+    tokens = SEARCH_TOKEN_PATTERN.findall(query.casefold().replace("ё", "е"))
+    if not tokens:
+        return None
+    match_expression = " ".join(f'"{token}"*' for token in tokens)
+    weights = ", ".join(str(weight) for weight in SEARCH_RANK_WEIGHTS)
+    stmt = text(
+        f"SELECT rowid FROM {SEARCH_INDEX_TABLE} "
+        f"WHERE {SEARCH_INDEX_TABLE} MATCH :match_expression "
+        f"ORDER BY bm25({SEARCH_INDEX_TABLE}, {weights}) LIMIT :limit"
+    )
+
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            stmt, {"match_expression": match_expression, "limit": limit}
+        )
+        hits = [decode_search_index_rowid(rowid) for rowid in result.scalars()]
+        return await _make_search_result(hits, session)
+
+
+async def search_fuzzy(
+    query: str, limit: int = 10, min_similarity: float = FUZZY_MIN_SIMILARITY
+) -> list[dict]:
+    """
+    Функция для нечёткого поиска фильмов, сериалов и персон, сохранённых в БД,
+    по тригаммному индексу названий и имён. Запрос и названия сравниваются
+    после normalize_title, поэтому опечатки, "ё"/"е" и транслитерация
+    ("vedmak" вместо "Ведьмак") не мешают найти объект.
+
+    Parameters:
+        query (str): Запрос поиска.
+        limit (int): Максимальное количество найденных объектов.
+        min_similarity (float): Минимальное сходство (0..1) по триграммам.
+
+    Returns:
+        list[dict]: Найденные объекты по убыванию сходства: typename,
+        id (ID на Кинопоиске), name и similarity.
+    """
+
+    normalized = normalize_title(query)
+    # FTS5 TRIGRAM TOKENIZER INDEXES EVERY 3 CHARACTERS OF THE TEXT (UNPADDED)
+    tokens = {normalized[i : i + 3] for i in range(len(normalized) - 2)}
+    if not tokens:
+        return []
+    match_expression = " OR ".join(f'"{token}"' for token in sorted(tokens))
+    stmt = text(
+        f"SELECT rowid, {', '.join(TITLE_INDEX_COLUMNS)} FROM {TITLE_INDEX_TABLE} "
+        f"WHERE {TITLE_INDEX_TABLE} MATCH :match_expression "
+        f"ORDER BY rank LIMIT :limit"
+    )
+
+    query_trigrams = make_trigrams(normalized)
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            stmt, {"match_expression": match_expression, "limit": FUZZY_CANDIDATES}
+        )
+        scored = []
+        for rowid, *names in result:
+            similarity = max(
+                trigram_similarity(query_trigrams, make_trigrams(name))
+                for name in names
+            )
+            if similarity >= min_similarity:
+                scored.append((similarity, rowid))
+        scored.sort(key=lambda item: -item[0])
+        scored = scored[:limit]
+
+        hits = [decode_search_index_rowid(rowid) for _, rowid in scored]
+        ids = {}
+        for typename, obj_id in hits:
+            ids.setdefault(typename, []).append(obj_id)
+        found = {}
+        for typename, model_ids in ids.items():
+            model = SEARCH_MODELS[typename]
+            name_column = model.name if typename == "person" else model.title_russian
+            stmt = select(model.id, model.kinopoisk_id, name_column)
+            for obj_id, kinopoisk_id, name in await session.execute(
+                stmt.where(model.id.in_(model_ids))
+            ):
+                found[typename, obj_id] = kinopoisk_id, name
+
+    return [
+        {
+            "typename": typename,
+            "id": found[typename, obj_id][0],
+            "name": found[typename, obj_id][1],
+            "similarity": round(similarity, 3),
+        }
+        for (similarity, _), (typename, obj_id) in zip(scored, hits)
+        if (typename, obj_id) in found
+    ]
+
+
+async def get_search_result(items: list[tuple[str, int]]) -> dict | None:
+    """
+    Функция для получения сохранённых в БД фильмов, сериалов и персон
+    в формате search_result из get_search (первый объект - в match).
+
+    Parameters:
+        items (list[tuple[str, int]]): Пары (typename, ID на Кинопоиске).
+
+    Returns:
+        dict | None: Результат поиска или None, если ни одного объекта нет в БД.
+    """
+
+    async with AsyncSessionLocal() as session:
+        return await _make_search_result(items, session, "kinopoisk_id")
+
+
+async def _make_search_result(
+    hits: list[tuple[str, int]], session, id_field: str = "id"
+) -> dict | None:
+    ids = {}
+    for typename, obj_id in hits:
+        ids.setdefault(typename, []).append(obj_id)
+    found = {}
+    for typename, model_ids in ids.items():
+        for obj in await _get_search_objects(typename, model_ids, session, id_field):
+            found[typename, getattr(obj, id_field)] = obj
+
+    items = [
+        SEARCH_SERIALIZERS[typename](found[typename, obj_id])
+        for typename, obj_id in hits
+        if (typename, obj_id) in found
+    ]
+    if not items:
+        return None
+    return {
+        "match": items[0],
+        "movies": [item for item in items[1:] if item["typename"] != "person"],
+        "persons": [item for item in items[1:] if item["typename"] == "person"],
+        "typename": "search_result",
+    }
+
+
+async def _get_search_objects(
+    typename: str, ids: list, session, id_field: str = "id"
+) -> list:
+    model = SEARCH_MODELS[typename]
+    # SEARCH RESULTS HAVE NO CAST, LIKE THE SUGGEST RESPONSE OF KINOPOISK
+    if typename == "person":
+        stmt = select(Person).options(selectinload(Person.roles), raiseload("*"))
+    else:
+        stmt = select(model).options(*_nested_movie_options(model))
+    stmt = stmt.where(getattr(model, id_field).in_(ids))
+    return (await session.execute(stmt)).scalars().all()
+
+
+SEARCH_MODELS = {"film": Film, "tvseries": TvSeries, "person": Person}
+SEARCH_SERIALIZERS = {
+    "film": serialize_film,
+    "tvseries": serialize_tvseries,
+    "person": serialize_person,
+}
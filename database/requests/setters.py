@@ -1,9 +1,16 @@
+import msgspec
 from datetime import datetime
-from sqlalchemy import select
+from sqlalchemy import delete, func, inspect, select, text
+from sqlalchemy.dialects.sqlite import insert
 
 from hubble.utils import get_nested
+from hubble.write_behind import WriteBehindQueue
 from database.db import AsyncSessionLocal
 from database.models import Person, Film, TvSeries, Genre, Country, Role, Trivia
+from database.models import TorampTitle
+from database.models import TITLE_INDEX_TABLE, TITLE_INDEX_INSERT
+from database.models import TITLE_INDEX_SOURCES, make_title_index_rows
+from database.models.relations import film_trivias, tvseries_trivias
 
 
 UNIQUE_FIELDS = {
@@ -14,48 +21,252 @@ UNIQUE_FIELDS = {
     Country: ("name",),
     Role: ("name",),
     Trivia: ("kinopoisk_id",),
+    TorampTitle: ("query",),
 }
 
 
-async def resolve_duplicates(obj, session, visited=None):
+# СВЯЗИ, КОТОРЫЕ ЗАПОЛНЯЮТ СЕТТЕРЫ: ПРИ ЗАПИСИ ОБЪЕКТА ОНИ ЗАМЕНЯЮТСЯ ЦЕЛИКОМ.
+# ОСТАЛЬНЫЕ СВЯЗИ (ОБРАТНЫЕ СТОРОНЫ, НАПРИМЕР Person.films) ТОЛЬКО ДОПОЛНЯЮТСЯ
+REPLACED_RELATIONSHIPS = {
+    Film: ("actors", "directors", "voice_over_actors", "genres", "countries"),
+    TvSeries: ("actors", "directors", "voice_over_actors", "genres", "countries"),
+    Person: ("roles",),
+}
+
+# ФИЛЬМЫ И СЕРИАЛЫ, С КОТОРЫМИ СВЯЗЫВАЮТСЯ ФАКТЫ (set_movie_trivias), И ТАБЛИЦЫ СВЯЗЕЙ
+TRIVIA_MOVIES = {"film": (Film, film_trivias), "tvseries": (TvSeries, tvseries_trivias)}
+
+# МОДЕЛИ, НАЗВАНИЯ (ИМЕНА) КОТОРЫХ ХРАНЯТСЯ В ТРИГРАММНОМ ИНДЕКСЕ TITLE_INDEX_TABLE
+TITLE_INDEX_MODELS = {Film: "film", TvSeries: "tvseries", Person: "person"}
+
+# МАКСИМАЛЬНОЕ КОЛИЧЕСТВО ПАРАМЕТРОВ В ОДНОМ ЗАПРОСЕ (ЛИМИТ SQLITE)
+MAX_QUERY_PARAMETERS = 999
+
+# ОЧЕРЕДЬ ОТЛОЖЕННОЙ ЗАПИСИ (DB_WRITE_QUEUE): РАЗМЕР, ЗАПИСЕЙ В ОДНОЙ ТРАНЗАКЦИИ
+# И ВРЕМЯ (В СЕКУНДАХ), В ТЕЧЕНИЕ КОТОРОГО НАКАПЛИВАЕТСЯ НЕПОЛНАЯ ПАЧКА
+DB_WRITE_QUEUE_MAXSIZE = 1000
+DB_WRITE_BATCH_SIZE = 50
+DB_WRITE_FLUSH_INTERVAL = 0.5
+
+
+async def upsert_objects(objs: list, session) -> list:
     """
-    Рекурсивно обходит объект и его отношения, пытаясь найти в БД уже существующие записи
-    по заданным уникальным полям. Если объект найден, присваивает найденный primary key.
-    Для предотвращения бесконечной рекурсии используется множество visited.
+    Сохраняет объекты и все связанные с ними объекты запросами
+    INSERT ... ON CONFLICT DO UPDATE по уникальным полям (UNIQUE_FIELDS):
+    один запрос на каждую модель, без предварительного поиска записей.
+    Связи записываются в таблицы relations.py запросами
+    INSERT ... ON CONFLICT DO NOTHING.
+
+    Объекты с одинаковыми уникальными полями внутри всех переданных графов
+    заменяются одним экземпляром (identity map), поэтому, например, человек,
+    который есть и в актёрах, и в режиссёрах, сохраняется один раз.
+    Пустые (None) значения не затирают уже сохранённые, поэтому неполное
+    представление объекта (человек из списка актёров) не удаляет данные,
+    сохранённые из полного (карточка человека).
+
+    Parameters:
+        objs (list): Объекты моделей БД (корни графов).
+        session (AsyncSession): Сессия с открытой транзакцией.
+
+    Returns:
+        list: Корни графов после замены дубликатов (в том же порядке),
+        с заполненными id.
     """
-    if visited is None:
-        visited = set()
-    if id(obj) in visited:
-        return obj
-    visited.add(id(obj))
-
-    model_class = type(obj)
-    if model_class in UNIQUE_FIELDS:
-        fields = UNIQUE_FIELDS[model_class]
-        conditions = [
-            getattr(model_class, field) == getattr(obj, field) for field in fields
-        ]
-        stmt = select(model_class).filter(*conditions)
-        result = await session.execute(stmt)
-        existing = result.scalar_one_or_none()
-        if existing:
-            obj.id = existing.id
-
-    # Обрабатываем все отношения рекурсивно
-    for rel in obj.__mapper__.relationships:
-        related = getattr(obj, rel.key)
-        if related is None:
+    identity_map = {}
+    objs = [_get_canonical(obj, identity_map) for obj in objs]
+    pending = _deduplicate_graph(objs, identity_map)
+    for model_class, objects in pending.items():
+        await _upsert_rows(model_class, objects, session)
+    await _upsert_links(pending, session)
+    await _upsert_trivia_links(pending, session)
+    await _update_title_index(pending, session)
+    return objs
+
+
+def _get_unique_key(obj) -> tuple | None:
+    fields = UNIQUE_FIELDS.get(type(obj))
+    if fields is None:
+        return None
+    key = tuple(getattr(obj, field) for field in fields)
+    return None if None in key else (type(obj), key)
+
+
+def _get_canonical(obj, identity_map: dict):
+    key = _get_unique_key(obj)
+    return obj if key is None else identity_map.setdefault(key, obj)
+
+
+def _deduplicate_graph(objs: list, identity_map: dict) -> dict:
+    # OBJECTS TO LOOK UP IN THE DATABASE: {model: {unique key values: object}}
+    pending = {}
+    visited = set()
+    stack = list(reversed(objs))
+    while stack:
+        current = stack.pop()
+        if id(current) in visited:
             continue
-        if rel.uselist:
-            resolved_list = []
-            for item in related:
-                resolved_item = await resolve_duplicates(item, session, visited)
-                resolved_list.append(resolved_item)
-            setattr(obj, rel.key, resolved_list)
-        else:
-            resolved_item = await resolve_duplicates(related, session, visited)
-            setattr(obj, rel.key, resolved_item)
-    return obj
+        visited.add(id(current))
+
+        key = _get_unique_key(current)
+        if key is not None:
+            pending.setdefault(key[0], {})[key[1]] = current
+
+        for rel in current.__mapper__.relationships:
+            related = getattr(current, rel.key)
+            if related is None:
+                continue
+            if rel.uselist:
+                resolved_list = []
+                resolved_ids = set()
+                for item in related:
+                    item = _get_canonical(item, identity_map)
+                    if id(item) not in resolved_ids:
+                        resolved_ids.add(id(item))
+                        resolved_list.append(item)
+                if len(resolved_list) != len(related) or any(
+                    item is not original
+                    for item, original in zip(resolved_list, related)
+                ):
+                    setattr(current, rel.key, resolved_list)
+                # OBJECTS ARE VISITED (AND INSERTED) IN THE ORDER OF THE LIST
+                stack.extend(reversed(resolved_list))
+            else:
+                resolved_item = _get_canonical(related, identity_map)
+                if resolved_item is not related:
+                    setattr(current, rel.key, resolved_item)
+                stack.append(resolved_item)
+    return pending
+
+
+async def _upsert_rows(model_class, objects: dict, session) -> None:
+    table = model_class.__table__
+    fields = UNIQUE_FIELDS[model_class]
+    columns = [column.name for column in table.columns if column.name != "id"]
+
+    now = datetime.now()
+    rows = []
+    for obj in objects.values():
+        row = {column: getattr(obj, column) for column in columns}
+        if "created_at" in row:
+            row["created_at"] = row["created_at"] or now
+        if "updated_at" in row:
+            row["updated_at"] = now
+        rows.append(row)
+
+    chunk_size = max(1, MAX_QUERY_PARAMETERS // len(columns))
+    for start in range(0, len(rows), chunk_size):
+        stmt = insert(table).values(rows[start : start + chunk_size])
+        update_values = {
+            column: func.coalesce(stmt.excluded[column], table.c[column])
+            for column in columns
+            if column not in fields and column != "created_at"
+        }
+        if "updated_at" in update_values:
+            update_values["updated_at"] = stmt.excluded.updated_at
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(fields), set_=update_values
+        ).returning(table.c.id, *(table.c[field] for field in fields))
+
+        for row in await session.execute(stmt):
+            obj = objects.get(tuple(row[1:]))
+            if obj is not None:
+                obj.id = row[0]
+
+
+async def _upsert_links(pending: dict, session) -> None:
+    links = {}
+    replaced = {}
+    for model_class, objects in pending.items():
+        for rel in inspect(model_class).relationships:
+            if rel.secondary is None:
+                continue
+            parent_column = rel.synchronize_pairs[0][1]
+            child_column = rel.secondary_synchronize_pairs[0][1]
+            is_replaced = rel.key in REPLACED_RELATIONSHIPS.get(model_class, ())
+
+            for obj in objects.values():
+                # COLLECTIONS THAT WERE NEVER FILLED ARE NOT TOUCHED
+                children = obj.__dict__.get(rel.key)
+                if obj.id is None or not children:
+                    continue
+                if is_replaced:
+                    replaced.setdefault(parent_column, set()).add(obj.id)
+                table_links = links.setdefault(rel.secondary, {})
+                for child in children:
+                    if child.id is None:
+                        continue
+                    link = {parent_column.name: obj.id, child_column.name: child.id}
+                    # SAME LINK IS SEEN FROM BOTH SIDES OF THE RELATIONSHIP
+                    table_links[tuple(sorted(link.items()))] = link
+
+    for parent_column, parent_ids in replaced.items():
+        parent_ids = list(parent_ids)
+        for start in range(0, len(parent_ids), MAX_QUERY_PARAMETERS):
+            chunk = parent_ids[start : start + MAX_QUERY_PARAMETERS]
+            await session.execute(
+                delete(parent_column.table).where(parent_column.in_(chunk))
+            )
+
+    for table, table_links in links.items():
+        rows = list(table_links.values())
+        chunk_size = MAX_QUERY_PARAMETERS // len(table.columns)
+        for start in range(0, len(rows), chunk_size):
+            stmt = insert(table).values(rows[start : start + chunk_size])
+            await session.execute(stmt.on_conflict_do_nothing())
+
+
+async def _upsert_trivia_links(pending: dict, session) -> None:
+    # TRIVIAS OF ONE MOVIE: {(content_type, kinopoisk_id): [trivia ids]}
+    movie_trivias = {}
+    for trivia in pending.get(Trivia, {}).values():
+        movie_key = getattr(trivia, "movie_key", None)
+        if movie_key is not None and trivia.id is not None:
+            movie_trivias.setdefault(movie_key, []).append(trivia.id)
+
+    for (content_type, kinopoisk_id), trivia_ids in movie_trivias.items():
+        model, table = TRIVIA_MOVIES[content_type]
+        movie_id = await session.scalar(
+            select(model.id).where(model.kinopoisk_id == kinopoisk_id)
+        )
+        # MOVIE WITHOUT DATA IS NOT CREATED: TRIVIAS STAY UNLINKED UNTIL IT IS SAVED
+        if movie_id is None:
+            continue
+        movie_column, trivia_column = table.columns
+        # THE LIST OF TRIVIAS IS COMPLETE, SO IT REPLACES THE STORED ONE
+        await session.execute(delete(table).where(movie_column == movie_id))
+        chunk_size = MAX_QUERY_PARAMETERS // len(table.columns)
+        rows = [
+            {movie_column.name: movie_id, trivia_column.name: trivia_id}
+            for trivia_id in trivia_ids
+        ]
+        for start in range(0, len(rows), chunk_size):
+            stmt = insert(table).values(rows[start : start + chunk_size])
+            await session.execute(stmt.on_conflict_do_nothing())
+
+
+async def _update_title_index(pending: dict, session) -> None:
+    delete_stmt = text(f"DELETE FROM {TITLE_INDEX_TABLE} WHERE rowid = :rowid")
+    insert_stmt = text(TITLE_INDEX_INSERT)
+    for model_class, typename in TITLE_INDEX_MODELS.items():
+        columns = TITLE_INDEX_SOURCES[typename]
+        # NAMES ARE READ BACK: COALESCE MAY HAVE KEPT THE STORED ONES
+        ids = [
+            obj.id
+            for obj in pending.get(model_class, {}).values()
+            if obj.id is not None
+            and any(getattr(obj, column) is not None for column in columns)
+        ]
+        for start in range(0, len(ids), MAX_QUERY_PARAMETERS):
+            chunk = ids[start : start + MAX_QUERY_PARAMETERS]
+            stmt = select(
+                model_class.id, *(getattr(model_class, column) for column in columns)
+            ).where(model_class.id.in_(chunk))
+            rows = make_title_index_rows(typename, (await session.execute(stmt)).all())
+            if rows:
+                await session.execute(
+                    delete_stmt, [{"rowid": row["rowid"]} for row in rows]
+                )
+                await session.execute(insert_stmt, rows)
 
 
 # Функции для создания объектов верхнего уровня:
@@ -96,7 +307,7 @@ async def set_role(role_name: str) -> Role:
     return Role(name=role_name)
 
 
-async def set_film(film_data: dict) -> Film:
+async def set_film(film_data: dict, is_info: bool = False) -> Film:
     typename = get_nested(film_data, "typename", required=True)
     if typename != "film":
         raise ValueError(
@@ -112,7 +323,7 @@ async def set_film(film_data: dict) -> Film:
     trailer_youtube = get_nested(film_data, "trailer_youtube")
     cover_url = get_nested(film_data, "cover_url")
     tagline = get_nested(film_data, "tagline")
-    kinopoisk_poster_url = get_nested(film_data, "kinopoisk_poster_url")
+    kinopoisk_poster_url = get_nested(film_data, "poster_url")
     rating_imdb = get_nested(film_data, "rating_imdb")
     rating_kinopoisk = get_nested(film_data, "rating_kinopoisk")
     rating_kinopoisk_top10_pos = get_nested(film_data, "rating_kinopoisk_top10_pos")
@@ -141,6 +352,8 @@ async def set_film(film_data: dict) -> Film:
         rating_world_wide_critics=rating_world_wide_critics,
         duration=duration,
         kinopoisk_url=kinopoisk_url,
+        updated_at=datetime.now(),
+        info_updated_at=datetime.now() if is_info else None,
     )
     # Вложенные объекты
     actors = get_nested(film_data, "actors")
@@ -166,7 +379,7 @@ async def set_film(film_data: dict) -> Film:
     return film
 
 
-async def set_tvseries(tvseries_data: dict) -> TvSeries:
+async def set_tvseries(tvseries_data: dict, is_info: bool = False) -> TvSeries:
     typename = get_nested(tvseries_data, "typename", required=True)
     if typename != "tvseries":
         raise ValueError(
@@ -185,7 +398,7 @@ async def set_tvseries(tvseries_data: dict) -> TvSeries:
     trailer_ya_stream_url = get_nested(tvseries_data, "trailer_stream_url")
     trailer_youtube = get_nested(tvseries_data, "trailer_youtube")
     tagline = get_nested(tvseries_data, "tagline")
-    kinopoisk_poster_url = get_nested(tvseries_data, "kinopoisk_poster_url")
+    kinopoisk_poster_url = get_nested(tvseries_data, "poster_url")
     rating_imdb = get_nested(tvseries_data, "rating_imdb")
     rating_kinopoisk = get_nested(tvseries_data, "rating_kinopoisk")
     rating_kinopoisk_top10_pos = get_nested(tvseries_data, "rating_kinopoisk_top10_pos")
@@ -221,6 +434,8 @@ async def set_tvseries(tvseries_data: dict) -> TvSeries:
         duration_total=duration_total,
         duration_series=duration_series,
         kinopoisk_url=kinopoisk_url,
+        updated_at=datetime.now(),
+        info_updated_at=datetime.now() if is_info else None,
     )
     actors = get_nested(tvseries_data, "actors")
     if actors:
@@ -242,6 +457,17 @@ async def set_tvseries(tvseries_data: dict) -> TvSeries:
     if countries:
         for country_data in countries:
             tvseries.countries.append(await set_country(country_data))
+    # СИКВЕЛЫ И ПРИКВЕЛЫ ХРАНЯТСЯ ТОЛЬКО ДЛЯ СЕРИАЛОВ (TvSeries.sequels)
+    sequels = get_nested(tvseries_data, "sequels")
+    if sequels:
+        for sequel_data in sequels:
+            if get_nested(sequel_data, "typename") == "tvseries":
+                tvseries.sequels.append(await set_tvseries(sequel_data))
+    prequels = get_nested(tvseries_data, "prequels")
+    if prequels:
+        for prequel_data in prequels:
+            if get_nested(prequel_data, "typename") == "tvseries":
+                tvseries.prequels.append(await set_tvseries(prequel_data))
     return tvseries
 
 
@@ -275,9 +501,80 @@ async def set_trivia(trivia_data: dict) -> Trivia:
             f"{set_trivia.__qualname__}: Ожидался тип 'trivia', получен {typename}"
         )
     tid = get_nested(trivia_data, "id", required=True)
+    is_spoiler = get_nested(trivia_data, "is_spoiler")
     text = get_nested(trivia_data, "text", required=True)
     trivia_type = get_nested(trivia_data, "trivia_type", required=True)
-    return Trivia(kinopoisk_id=tid, text=text, trivia_type=trivia_type)
+    return Trivia(
+        kinopoisk_id=tid, is_spoiler=is_spoiler, text=text, trivia_type=trivia_type
+    )
+
+
+async def set_movie_trivias(movie_trivias_data: dict) -> list[Trivia]:
+    """
+    Функция для создания фактов о фильме или сериале. При сохранении
+    (upsert_objects) факты связываются с фильмом или сериалом, если он уже
+    есть в БД, и заменяют ранее связанные с ним факты.
+
+    Parameters:
+        movie_trivias_data (dict): Словарь с ключами content_type, id
+        (ID фильма или сериала на Кинопоиске) и trivias (результат get_trivias).
+    """
+
+    content_type = get_nested(movie_trivias_data, "content_type", required=True)
+    if content_type not in TRIVIA_MOVIES:
+        raise ValueError(
+            f"{set_movie_trivias.__qualname__}: Неизвестный content_type: {content_type}"
+        )
+    movie_id = get_nested(movie_trivias_data, "id", required=True)
+    trivias = []
+    for trivia_data in movie_trivias_data.get("trivias") or []:
+        trivia = await set_trivia(trivia_data)
+        # NOT A COLUMN: READ BY _upsert_trivia_links AFTER THE ROWS ARE WRITTEN
+        trivia.movie_key = (content_type, movie_id)
+        trivias.append(trivia)
+    return trivias
+
+
+async def set_movie_info(movie_info_data: dict) -> Film | TvSeries:
+    """
+    Функция для создания фильма или сериала из полных данных /info (get_info).
+    В отличие от неполных представлений (списки /similars, /search, сиквелы
+    и приквелы), такая запись обновляет info_updated_at, по которому
+    get_film и get_tvseries определяют свежесть записи.
+
+    Parameters:
+        movie_info_data (dict): Словарь с ключом movie (результат get_info).
+    """
+
+    movie_data = get_nested(movie_info_data, "movie", required=True)
+    typename = get_nested(movie_data, "typename", required=True)
+    if typename == "film":
+        return await set_film(movie_data, is_info=True)
+    if typename == "tvseries":
+        return await set_tvseries(movie_data, is_info=True)
+    raise ValueError(
+        f"{set_movie_info.__qualname__}: Ожидался тип 'film' или 'tvseries', получен {typename}"
+    )
+
+
+async def set_toramp_title(query: str, search_data: dict) -> TorampTitle:
+    url = get_nested(search_data, "url", required=True)
+    toramp_id = get_nested(search_data, "id", required=True)
+    return TorampTitle(
+        query=query,
+        toramp_id=toramp_id,
+        url=url,
+        poster_url=get_nested(search_data, "poster_url"),
+        title_russian=get_nested(search_data, "title_russian"),
+        production_year=get_nested(search_data, "production_year"),
+        typename=get_nested(search_data, "typename"),
+    )
+
+
+async def delete_toramp_title(query: str) -> None:
+    async with AsyncSessionLocal() as session:
+        async with session.begin():
+            await session.execute(delete(TorampTitle).where(TorampTitle.query == query))
 
 
 def _parse_date(date_str: str):
@@ -347,20 +644,18 @@ async def set_search_result(search_data: dict) -> dict:
 # Функция сохранения объекта (или нескольких) в базу данных с обновлением, если запись уже существует.
 # Если получен словарь (например, для search_result), то сохраняем каждое значение отдельно.
 async def save_object(obj):
-    async with AsyncSessionLocal() as session:
-        async with session.begin():
-            await resolve_duplicates(obj, session)
-            merged_obj = await session.merge(obj)
-        await session.commit()
-        await session.refresh(merged_obj)
-    return merged_obj
+    (saved_obj,) = await save_objects([obj])
+    return saved_obj
 
 
+# Несколько объектов сохраняются в одной транзакции: общие связанные объекты
+# (жанры, страны, люди) сохраняются один раз
 async def save_objects(objs: list) -> list:
-    result = []
-    for obj in objs:
-        result.append(await save_object(obj))
-    return result
+    if not objs:
+        return []
+    async with AsyncSessionLocal() as session:
+        async with session.begin():
+            return await upsert_objects(objs, session)
 
 
 # Основная функция, создающая объект(ы) нужного типа и сохраняющая(ие) его(их) в базу данных
@@ -377,23 +672,8 @@ async def set_data_to_db_items(data: dict | list):
         return saved_objects
 
     typename = get_nested(data, "typename", required=True)
-    if typename == "film":
-        obj = await set_film(data)
-        return await save_object(obj)
-    elif typename == "tvseries":
-        obj = await set_tvseries(data)
-        return await save_object(obj)
-    elif typename == "person":
-        obj = await set_person(data)
-        return await save_object(obj)
-    elif typename == "genre":
-        obj = await set_genre(data)
-        return await save_object(obj)
-    elif typename == "country":
-        obj = await set_country(data)
-        return await save_object(obj)
-    elif typename == "trivia":
-        obj = await set_trivia(data)
+    if typename in OBJECT_SETTERS:
+        obj = await OBJECT_SETTERS[typename](data)
         return await save_object(obj)
     elif typename == "search_result":
         search_result = await set_search_result(data)
@@ -404,7 +684,98 @@ async def set_data_to_db_items(data: dict | list):
         if search_result.get("persons"):
             search_result["persons"] = await save_objects(search_result["persons"])
         return search_result
+    elif typename == "movie_info":
+        return await save_object(await set_movie_info(data))
+    elif typename == "movie_trivias":
+        return await save_objects(await set_movie_trivias(data))
     else:
         raise ValueError(
             f"{set_data_to_db_items.__qualname__}: Неизвестный typename: {typename}"
         )
+
+
+# Функция, создающая объекты БД (без сохранения) из обработанных данных любого типа
+async def set_data_to_db_objects(data: dict | list) -> list:
+
+    if isinstance(data, list):
+        return [obj for item in data for obj in await set_data_to_db_objects(item)]
+
+    if not data or data.get("error"):
+        return []
+
+    typename = get_nested(data, "typename", required=True)
+    if typename in OBJECT_SETTERS:
+        return [await OBJECT_SETTERS[typename](data)]
+    elif typename == "search_result":
+        search_result = await set_search_result(data)
+        objs = [search_result["match"], *search_result["movies"]]
+        return [obj for obj in objs + search_result["persons"] if obj is not None]
+    elif typename == "movie_info":
+        return [await set_movie_info(data)]
+    elif typename == "movie_trivias":
+        return await set_movie_trivias(data)
+    else:
+        raise ValueError(
+            f"{set_data_to_db_objects.__qualname__}: Неизвестный typename: {typename}"
+        )
+
+
+async def set_data_to_db_batch(payloads: list) -> None:
+    """
+    Сохраняет несколько обработанных ответов (словари или модели
+    hubble.services.kinopoisk.models) в одной транзакции. Ответы записываются
+    по порядку, поэтому непустые значения более позднего ответа заменяют
+    значения более раннего.
+
+    Parameters:
+        payloads (list): Обработанные данные любого типа из set_data_to_db_items.
+    """
+
+    objs_list = []
+    for payload in payloads:
+        if isinstance(payload, (msgspec.Struct, list)):
+            payload = msgspec.to_builtins(payload)
+        objs_list.append(await set_data_to_db_objects(payload))
+
+    async with AsyncSessionLocal() as session:
+        async with session.begin():
+            for objs in objs_list:
+                if objs:
+                    await upsert_objects(objs, session)
+
+
+def get_db_write_key(data) -> tuple | None:
+    # PENDING WRITES OF THE SAME FILM, TVSERIES OR PERSON ARE COALESCED
+    if isinstance(data, msgspec.Struct):
+        typename = type(data).__struct_config__.tag
+        data_id = getattr(data, "id", None)
+    elif isinstance(data, dict):
+        typename = data.get("typename")
+        data_id = data.get("id")
+        if typename == "movie_info":
+            # FULL DATA IS NOT REPLACED BY A PARTIAL WRITE OF THE SAME MOVIE
+            movie_data = data.get("movie") or {}
+            return typename, movie_data.get("typename"), movie_data.get("id")
+    else:
+        return None
+    if typename in OBJECT_SETTERS and data_id is not None:
+        return typename, data_id
+    return None
+
+
+OBJECT_SETTERS = {
+    "film": set_film,
+    "tvseries": set_tvseries,
+    "person": set_person,
+    "genre": set_genre,
+    "country": set_country,
+    "trivia": set_trivia,
+}
+
+DB_WRITE_QUEUE = WriteBehindQueue(
+    set_data_to_db_batch,
+    maxsize=DB_WRITE_QUEUE_MAXSIZE,
+    batch_size=DB_WRITE_BATCH_SIZE,
+    flush_interval=DB_WRITE_FLUSH_INTERVAL,
+    key=get_db_write_key,
+)
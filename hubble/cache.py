@@ -0,0 +1,221 @@
+import time
+import asyncio
+import inspect
+import logging
+import functools
+from typing import Any, Awaitable, Callable, Hashable
+from collections import OrderedDict
+
+
+logger = logging.getLogger(__name__)
+
+
+class TTLCache:
+    """
+    Ограниченный по размеру и времени жизни записей кэш в памяти процесса.
+    При переполнении вытесняется давно не использовавшаяся запись (LRU).
+    Каждая запись хранит собственный TTL, поэтому один кэш может
+    обслуживать несколько геттеров с разными временами жизни.
+
+    Запись может иметь дополнительное "устаревшее" окно (stale_ttl): после
+    истечения ttl и до истечения ttl + stale_ttl она не отдаётся через get(),
+    но доступна через lookup() для режима stale-while-revalidate.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300.0) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[Hashable, tuple[float, float, Any]] = OrderedDict()
+        self._refreshing: dict[Hashable, asyncio.Task] = {}
+
+        # COUNTERS
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.refreshes = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        entry = self._data.get(key)
+        return entry is not None and entry[0] > time.monotonic()
+
+    def lookup(self, key: Hashable) -> tuple[Any, bool]:
+        """
+        Метод для получения записи вместе с признаком её устаревания.
+
+        Returns:
+            tuple[Any, bool]: Значение (None, если записи нет) и флаг,
+            указывающий, что запись устарела, но ещё может быть отдана.
+        """
+
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None, False
+
+        fresh_until, expires_at, value = entry
+        now = time.monotonic()
+        if expires_at <= now:
+            del self._data[key]
+            self.expirations += 1
+            self.misses += 1
+            return None, False
+
+        self._data.move_to_end(key)
+        if fresh_until <= now:
+            self.stale_hits += 1
+            return value, True
+
+        self.hits += 1
+        return value, False
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        value, is_stale = self.lookup(key)
+        if value is None or is_stale:
+            return default
+        return value
+
+    def set(
+        self, key: Hashable, value: Any, ttl: float | None = None, stale_ttl: float = 0
+    ) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        fresh_until = time.monotonic() + ttl
+        self._data[key] = (fresh_until, fresh_until + stale_ttl, value)
+        self._data.move_to_end(key)
+
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def refresh(
+        self,
+        key: Hashable,
+        factory: Callable[[], Awaitable[Any]],
+        ttl: float | None = None,
+        stale_ttl: float = 0,
+    ) -> None:
+        """
+        Метод для фонового обновления записи. Для каждого ключа одновременно
+        выполняется не больше одного обновления. Ошибки обновления не
+        удаляют запись: она отдаётся до истечения устаревшего окна.
+        """
+
+        if key in self._refreshing:
+            return
+
+        async def _refresh() -> None:
+            try:
+                value = await factory()
+                if value:
+                    self.set(key, value, ttl, stale_ttl)
+            except Exception as e:
+                logger.warning("Background refresh of %r failed: %r", key, e)
+            finally:
+                self._refreshing.pop(key, None)
+
+        self.refreshes += 1
+        self._refreshing[key] = asyncio.ensure_future(_refresh())
+
+    def delete(self, key: Hashable) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "refreshes": self.refreshes,
+            "refreshing": len(self._refreshing),
+        }
+
+
+def normalize_cache_arg(value: Any) -> Hashable:
+    """
+    Функция для приведения аргумента к виду, пригодному для ключа кэша.
+    Строки приводятся к нижнему регистру, лишние пробелы удаляются.
+    """
+
+    if isinstance(value, str):
+        return " ".join(value.split()).casefold()
+    if isinstance(value, (list, tuple)):
+        return tuple(normalize_cache_arg(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, normalize_cache_arg(v)) for k, v in value.items()))
+    return value
+
+
+def make_cache_key(name: str, arguments: dict) -> tuple:
+    """
+    Функция для построения ключа кэша из имени геттера и его аргументов.
+    Аргумент debug в ключ не входит.
+    """
+
+    return (
+        name,
+        tuple(
+            (key, normalize_cache_arg(value))
+            for key, value in arguments.items()
+            if key != "debug"
+        ),
+    )
+
+
+def bind_arguments(signature: inspect.Signature, args: tuple, kwargs: dict) -> dict:
+    bound = signature.bind(*args, **kwargs)
+    bound.apply_defaults()
+    return bound.arguments
+
+
+def cached(cache: TTLCache, ttl: float | None = None, stale_ttl: float = 0) -> Callable:
+    """
+    Декоратор для кэширования результатов асинхронных геттеров.
+
+    Ключ кэша - имя геттера и нормализованные аргументы.
+    Вызовы с debug=True и пустые результаты (None, {}, []) не кэшируются.
+
+    При stale_ttl > 0 включается режим stale-while-revalidate: запись старше
+    ttl, но моложе ttl + stale_ttl отдаётся сразу, а в фоне запускается
+    её обновление через тот же геттер.
+
+    Parameters:
+        cache (TTLCache): Кэш, в котором хранятся результаты.
+        ttl (float | None): Время жизни записи в секундах (по умолчанию - TTL кэша).
+        stale_ttl (float): Сколько секунд после ttl запись ещё может быть отдана.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            arguments = bind_arguments(signature, args, kwargs)
+            if arguments.get("debug"):
+                return await func(*args, **kwargs)
+
+            key = make_cache_key(func.__name__, arguments)
+            result, is_stale = cache.lookup(key)
+            if result is not None:
+                if is_stale:
+                    cache.refresh(key, lambda: func(*args, **kwargs), ttl, stale_ttl)
+                return result
+
+            result = await func(*args, **kwargs)
+            if result:
+                cache.set(key, result, ttl, stale_ttl)
+            return result
+
+        wrapper.cache = cache
+        return wrapper
+
+    return decorator
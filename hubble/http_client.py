@@ -0,0 +1,106 @@
+import aiohttp
+
+from hubble.ratelimit import RateLimiter
+
+
+# CONNECTION POOL SETTINGS FOR EACH SERVICE (TIMEOUTS IN SECONDS)
+DEFAULT_HTTP_CLIENT_SETTINGS = {
+    "limit": 100,
+    "limit_per_host": 10,
+    "keepalive_timeout": 60,
+    "ttl_dns_cache": 300,
+    "total_timeout": 20,
+    "connect_timeout": 5,
+    # REQUESTS PER SECOND TO THE SERVICE (None - NO LIMIT) AND ALLOWED BURST
+    "rate_limit": None,
+    "rate_burst": 1,
+}
+HTTP_CLIENT_SETTINGS = {
+    "rutor": {"limit_per_host": 8, "total_timeout": 15},
+    "toramp": {
+        "limit_per_host": 8,
+        "total_timeout": 15,
+        "rate_limit": 5,
+        "rate_burst": 10,
+    },
+}
+
+
+_sessions: dict[str, aiohttp.ClientSession] = {}
+_rate_limiters: dict[str, RateLimiter | None] = {}
+
+
+def _get_settings(name: str) -> dict:
+    return {**DEFAULT_HTTP_CLIENT_SETTINGS, **HTTP_CLIENT_SETTINGS.get(name, {})}
+
+
+def _create_session(name: str) -> aiohttp.ClientSession:
+    settings = _get_settings(name)
+    connector = aiohttp.TCPConnector(
+        limit=settings["limit"],
+        limit_per_host=settings["limit_per_host"],
+        keepalive_timeout=settings["keepalive_timeout"],
+        use_dns_cache=True,
+        ttl_dns_cache=settings["ttl_dns_cache"],
+    )
+    timeout = aiohttp.ClientTimeout(
+        total=settings["total_timeout"], connect=settings["connect_timeout"]
+    )
+    return aiohttp.ClientSession(connector=connector, timeout=timeout)
+
+
+def get_http_session(name: str) -> aiohttp.ClientSession:
+    """
+    Функция для получения общей (на время жизни приложения) HTTP-сессии сервиса.
+    Сессии создаются при старте приложения, но при необходимости (например,
+    при вызове геттеров вне приложения) создаются при первом обращении.
+
+    Parameters:
+        name (str): Имя сервиса из HTTP_CLIENT_SETTINGS.
+
+    Returns:
+        aiohttp.ClientSession: Сессия с пулом соединений сервиса.
+    """
+
+    session = _sessions.get(name)
+    if session is None or session.closed:
+        session = _create_session(name)
+        _sessions[name] = session
+    return session
+
+
+def get_rate_limiter(name: str) -> RateLimiter | None:
+    if name not in _rate_limiters:
+        settings = _get_settings(name)
+        rate_limiter = None
+        if settings["rate_limit"]:
+            rate_limiter = RateLimiter(settings["rate_limit"], settings["rate_burst"])
+        _rate_limiters[name] = rate_limiter
+    return _rate_limiters[name]
+
+
+async def wait_for_rate_limit(name: str) -> None:
+    """
+    Функция для ожидания очереди запроса к сервису с учётом его ограничения
+    частоты запросов (rate_limit в HTTP_CLIENT_SETTINGS). Для сервисов
+    без ограничения возвращается сразу.
+
+    Parameters:
+        name (str): Имя сервиса из HTTP_CLIENT_SETTINGS.
+    """
+
+    rate_limiter = get_rate_limiter(name)
+    if rate_limiter is not None:
+        await rate_limiter.acquire()
+
+
+async def open_http_sessions() -> None:
+    for name in HTTP_CLIENT_SETTINGS:
+        get_http_session(name)
+
+
+async def close_http_sessions() -> None:
+    while _sessions:
+        _, session = _sessions.popitem()
+        if not session.closed:
+            await session.close()
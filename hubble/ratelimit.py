@@ -0,0 +1,48 @@
+import time
+import asyncio
+
+
+class RateLimiter:
+    """
+    Ограничение частоты запросов к стороннему сервису (GCRA, "ведро
+    с маркерами"): в среднем не больше rate запросов в секунду, при этом
+    до burst запросов могут быть выполнены подряд без ожидания.
+
+    Каждый вызов acquire() резервирует следующий свободный интервал,
+    поэтому ожидающие вызовы получают доступ в порядке обращения.
+    """
+
+    def __init__(self, rate: float, burst: int = 1) -> None:
+        if rate <= 0 or burst < 1:
+            raise ValueError("rate must be positive and burst at least 1")
+        self.rate = rate
+        self.burst = burst
+        self._interval = 1.0 / rate
+        # THEORETICAL ARRIVAL TIME OF THE NEXT REQUEST
+        self._tat = 0.0
+
+        # COUNTERS
+        self.acquired = 0
+        self.delayed = 0
+        self.total_delay = 0.0
+
+    async def acquire(self) -> None:
+        now = time.monotonic()
+        tat = max(self._tat, now)
+        delay = tat - now - (self.burst - 1) * self._interval
+        self._tat = tat + self._interval
+
+        self.acquired += 1
+        if delay > 0:
+            self.delayed += 1
+            self.total_delay += delay
+            await asyncio.sleep(delay)
+
+    def stats(self) -> dict:
+        return {
+            "rate": self.rate,
+            "burst": self.burst,
+            "acquired": self.acquired,
+            "delayed": self.delayed,
+            "total_delay": round(self.total_delay, 3),
+        }
@@ -1,8 +1,14 @@
 from hubble.services.kinopoisk.getters import (
     get_info,
+    get_info_batch,
     get_search,
     get_similars,
     get_person,
     get_trivias,
     get_media_posts,
+    get_title_card,
+    stream_info_batch,
+    stream_similars,
+    stream_trivias,
+    stream_media_posts,
 )
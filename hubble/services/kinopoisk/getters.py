@@ -1,3 +1,7 @@
+import asyncio
+import logging
+from typing import AsyncIterator, Iterator
+
 from kinopapi import suggest_search_async
 from kinopapi import person_preview_card_async
 from kinopapi import film_trivias_async, tvseries_trivias_async
@@ -5,6 +9,8 @@ from kinopapi import film_base_info_async, tvseries_base_info_async
 from kinopapi import film_similar_movies_async, tvseries_similar_movies_async
 from kinopapi import film_media_posts_async, tvseries_media_posts_async
 
+from hubble.cache import cached
+from hubble.singleflight import coalesced
 from hubble.utils import get_nested
 from hubble.services.kinopoisk.parsers import parse_trivia_data
 from hubble.services.kinopoisk.parsers import parse_film_data
@@ -12,10 +18,37 @@ from hubble.services.kinopoisk.parsers import parse_movie_data
 from hubble.services.kinopoisk.parsers import parse_person_data
 from hubble.services.kinopoisk.parsers import parse_tvseries_data
 from hubble.services.kinopoisk.parsers import parse_media_post_data
-from hubble.services.kinopoisk.service_utils import filter_recursive
+from hubble.services.kinopoisk.models import to_model, to_models
+from hubble.services.kinopoisk.service_utils import filter_in_place
 from hubble.services.kinopoisk.service_utils import MEDIA_CONTENT_TYPES
-
-
+from hubble.services.kinopoisk.service_utils import INFO_DB_CACHE_ENABLED
+from hubble.services.kinopoisk.service_utils import INFO_DB_CACHE_TTL
+from hubble.services.kinopoisk.service_utils import SEARCH_LOCAL_ENABLED
+from hubble.services.kinopoisk.service_utils import SEARCH_LOCAL_LIMIT
+from hubble.services.kinopoisk.service_utils import SEARCH_UPSTREAM_TIMEOUT
+from hubble.services.kinopoisk.service_utils import SEARCH_FUZZY_ENABLED
+from hubble.services.kinopoisk.service_utils import SEARCH_FUZZY_MIN_SIMILARITY
+from hubble.services.kinopoisk.service_utils import RESPONSE_CACHE
+from hubble.services.kinopoisk.service_utils import RESPONSE_CACHE_TTL
+from hubble.services.kinopoisk.service_utils import RESPONSE_CACHE_STALE_TTL
+from hubble.services.kinopoisk.service_utils import INFLIGHT_REQUESTS
+from hubble.services.kinopoisk.service_utils import INFO_BATCH_CONCURRENCY
+from hubble.services.kinopoisk.service_utils import TITLE_CARD_SECTION_TIMEOUT
+from hubble.services.kinopoisk.service_utils import is_media_content_type_valid
+from database.requests.getters import get_film, get_tvseries, search_local
+from database.requests.getters import search_fuzzy, get_search_result
+from database.requests.setters import DB_WRITE_QUEUE
+
+
+logger = logging.getLogger(__name__)
+
+
+@cached(
+    RESPONSE_CACHE,
+    ttl=RESPONSE_CACHE_TTL["get_search"],
+    stale_ttl=RESPONSE_CACHE_STALE_TTL["get_search"],
+)
+@coalesced(INFLIGHT_REQUESTS)
 async def get_search(
     query: str, debug: bool = False
 ) -> None | dict | tuple[dict, dict]:
@@ -24,15 +57,46 @@ async def get_search(
     При значении debug=True возвращает кортеж из двух словарей,
     где первый - оригинальный json, второй - содержащий только необходимые данные после парсинга.
 
+    Сначала выполняется поиск по сохранённым в БД фильмам, сериалам и персонам
+    (SEARCH_LOCAL_ENABLED): при точном совпадении названия или имени запрос
+    к API не выполняется, а если API недоступен, не ответил за
+    SEARCH_UPSTREAM_TIMEOUT секунд или ничего не нашёл, возвращаются
+    найденные в БД результаты.
+    Если полнотекстовый поиск ничего не нашёл, выполняется нечёткий поиск
+    по названиям (SEARCH_FUZZY_ENABLED), который находит объекты с опечатками
+    и транслитерацией в запросе. Его результаты, как и результаты
+    полнотекстового поиска, возвращаются только если API недоступен:
+    похожее название может оказаться другим фильмом (например, сиквелом).
+
     Parameters:
         query (str): Запрос поиска.
         debug (bool): Флаг для отладки (получения оригинального ответа сервера
         помимо обработанного json).
     """
 
-    response = await suggest_search_async(query)
+    local_data = None
+    if SEARCH_LOCAL_ENABLED and not debug:
+        local_data = await _get_local_search(query)
+        if local_data and _is_exact_match(local_data, query):
+            return to_model(local_data)
+        if SEARCH_FUZZY_ENABLED and not local_data:
+            local_data = await _get_fuzzy_search(query)
+
+    try:
+        if local_data:
+            response = await asyncio.wait_for(
+                suggest_search_async(query), SEARCH_UPSTREAM_TIMEOUT
+            )
+        else:
+            response = await suggest_search_async(query)
+    except Exception as e:
+        if not local_data:
+            raise
+        logger.warning("Search %r failed, local results are used: %r", query, e)
+        return to_model(local_data)
+
     if not response or not response.ok:
-        return
+        return to_model(local_data) if local_data else None
 
     response_data = await response.json()
 
@@ -92,14 +156,62 @@ async def get_search(
             "typename": "search_result",
         }
 
-        parsed_data = filter_recursive(parsed_data)
+        parsed_data = filter_in_place(parsed_data)
         if parsed_data.keys() == {"typename"}:
             parsed_data = {}
     if debug:
         return response_data, parsed_data
-    return parsed_data
+    if not parsed_data and local_data:
+        return to_model(local_data)
+    return to_model(parsed_data)
+
+
+async def _get_local_search(query: str) -> dict | None:
+    # DATABASE ERRORS DO NOT BREAK THE SEARCH: THE API IS USED
+    try:
+        local_data = await search_local(query, SEARCH_LOCAL_LIMIT)
+    except Exception as e:
+        logger.warning("Local search %r failed: %r", query, e)
+        return None
+    return filter_in_place(local_data) if local_data else None
+
+
+async def _get_fuzzy_search(query: str) -> dict | None:
+    try:
+        hits = await search_fuzzy(
+            query, SEARCH_LOCAL_LIMIT, SEARCH_FUZZY_MIN_SIMILARITY
+        )
+        if not hits:
+            return None
+        fuzzy_data = await get_search_result(
+            [(hit["typename"], hit["id"]) for hit in hits]
+        )
+    except Exception as e:
+        logger.warning("Fuzzy local search %r failed: %r", query, e)
+        return None
+    return filter_in_place(fuzzy_data) if fuzzy_data else None
+
+
+def _is_exact_match(search_data: dict, query: str) -> bool:
+    query = _normalize_name(query)
+    match = get_nested(search_data, "match") or {}
+    return any(
+        _normalize_name(match[field]) == query
+        for field in ("title_russian", "title_original", "name", "original_name")
+        if match.get(field)
+    )
 
 
+def _normalize_name(name: str) -> str:
+    return " ".join(name.casefold().replace("ё", "е").split())
+
+
+@cached(
+    RESPONSE_CACHE,
+    ttl=RESPONSE_CACHE_TTL["get_info"],
+    stale_ttl=RESPONSE_CACHE_STALE_TTL["get_info"],
+)
+@coalesced(INFLIGHT_REQUESTS)
 async def get_info(
     content_type: str, id: int, debug: bool = False
 ) -> None | dict | tuple[dict, dict]:
@@ -120,6 +232,12 @@ async def get_info(
 
     ct_key = get_nested(MEDIA_CONTENT_TYPES, content_type)
 
+    # READ-THROUGH: FRESH ENOUGH ROW FROM DATABASE (DEBUG ALWAYS GOES UPSTREAM)
+    if INFO_DB_CACHE_ENABLED and not debug:
+        stored_data = await _get_stored_info(content_type, id)
+        if stored_data:
+            return to_model(stored_data)
+
     if content_type == "film":
         response = await film_base_info_async(id)
     elif content_type == "tvseries":
@@ -138,13 +256,116 @@ async def get_info(
     parsed_data = {}
     if root:
         parsed_data = parse_movie_data(root)
-        parsed_data = filter_recursive(parsed_data)
+        parsed_data = filter_in_place(parsed_data)
+
+    # WRITE-BEHIND: THE RESPONSE DOES NOT WAIT FOR THE DATABASE.
+    # FULL DATA IS MARKED, SO THAT READ-THROUGH DOES NOT TRUST PARTIAL ROWS
+    if INFO_DB_CACHE_ENABLED and parsed_data:
+        DB_WRITE_QUEUE.put({"movie": parsed_data, "typename": "movie_info"})
 
     if debug:
         return response_data, parsed_data
-    return parsed_data
+    return to_model(parsed_data)
+
+
+async def _get_stored_info(content_type: str, id: int) -> dict | None:
+    """
+    Функция для чтения данных о фильме или сериале из БД, если запись
+    не старше INFO_DB_CACHE_TTL для данного типа контента.
+    Ошибки БД не прерывают запрос: в этом случае данные берутся из API.
+    """
+
+    max_age = get_nested(INFO_DB_CACHE_TTL, content_type)
+    stored_data = None
+    try:
+        if content_type == "film":
+            stored_data = await get_film(id, max_age)
+        elif content_type == "tvseries":
+            stored_data = await get_tvseries(id, max_age)
+    except Exception as e:
+        logger.warning("Reading %s %s from database failed: %r", content_type, id, e)
+
+    if stored_data:
+        return filter_in_place(stored_data)
+    return None
+
+
+async def get_info_batch(
+    items: list[tuple[str, int]], concurrency: int = INFO_BATCH_CONCURRENCY
+) -> list[dict]:
+    """
+    Функция для получения данных о нескольких фильмах и сериалах.
+    Каждый элемент запрашивается через get_info (с кэшем и объединением
+    одинаковых запросов), одновременно выполняется не более concurrency запросов.
+    Ошибка одного элемента не прерывает обработку остальных.
 
+    Parameters:
+        items (list[tuple[str, int]]): Пары (content_type, id).
+        concurrency (int): Максимальное количество одновременных запросов.
+
+    Returns:
+        list[dict]: Результаты в порядке items. Каждый результат содержит
+        content_type, id и status, а также data (при status=200) или error.
+    """
+
+    semaphore = asyncio.Semaphore(concurrency)
+    return await asyncio.gather(
+        *(_get_batch_item(content_type, id, semaphore) for content_type, id in items)
+    )
+
+
+async def stream_info_batch(
+    items: list[tuple[str, int]], concurrency: int = INFO_BATCH_CONCURRENCY
+) -> AsyncIterator[dict]:
+    """
+    Потоковый вариант get_info_batch: результаты отдаются по мере готовности,
+    а не в порядке items. Если потребитель прекращает чтение, оставшиеся
+    запросы отменяются.
+    """
 
+    semaphore = asyncio.Semaphore(concurrency)
+    tasks = [
+        asyncio.ensure_future(_get_batch_item(content_type, id, semaphore))
+        for content_type, id in items
+    ]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def _get_batch_item(
+    content_type: str, id: int, semaphore: asyncio.Semaphore
+) -> dict:
+    result = {"content_type": content_type, "id": id}
+
+    if not is_media_content_type_valid(content_type):
+        result.update(status=415, error=f"Invalid media content type: '{content_type}'")
+        return result
+
+    try:
+        async with semaphore:
+            data = await get_info(content_type, id)
+    except Exception as e:
+        logger.warning("Batch item %s %s failed: %r", content_type, id, e)
+        result.update(status=502, error="Upstream request failed")
+        return result
+
+    if not data:
+        result.update(status=404, error="Not Found")
+    else:
+        result.update(status=200, data=data)
+    return result
+
+
+@cached(
+    RESPONSE_CACHE,
+    ttl=RESPONSE_CACHE_TTL["get_similars"],
+    stale_ttl=RESPONSE_CACHE_STALE_TTL["get_similars"],
+)
+@coalesced(INFLIGHT_REQUESTS)
 async def get_similars(
     content_type: str, id: int, debug: bool = False
 ) -> None | list[dict] | tuple[dict, list[dict]]:
@@ -165,6 +386,18 @@ async def get_similars(
 
     ct_key = get_nested(MEDIA_CONTENT_TYPES, content_type, required=True)
 
+    response_data = await _fetch_similars(content_type, id)
+    if response_data is None:
+        return
+
+    parsed_data = list(_iter_similars(response_data, ct_key))
+
+    if debug:
+        return response_data, parsed_data
+    return to_models(parsed_data)
+
+
+async def _fetch_similars(content_type: str, id: int) -> dict | None:
     if content_type == "film":
         response = await film_similar_movies_async(filmId=id)
     elif content_type == "tvseries":
@@ -172,11 +405,11 @@ async def get_similars(
 
     if not response or not response.ok:
         return
+    return await response.json()
 
-    response_data = await response.json()
-    root = get_nested(response_data, f"data.{ct_key}.userRecommendations")
 
-    parsed_data = []
+def _iter_similars(response_data: dict, ct_key: str) -> Iterator[dict]:
+    root = get_nested(response_data, f"data.{ct_key}.userRecommendations")
     if root:
         movies_items = get_nested(root, "items")
 
@@ -184,17 +417,15 @@ async def get_similars(
             movie_data = get_nested(movie_item, "movie")
 
             # SEEMS LIKE NO TVSERIES RECOMMENDATIONS HERE. TESTING THIS YET...
-            processed_movie_data = parse_movie_data(movie_data)
-
-            parsed_data.append(processed_movie_data)
-
-        parsed_data = filter_recursive(parsed_data)
-
-    if debug:
-        return response_data, parsed_data
-    return parsed_data
+            yield filter_in_place(parse_movie_data(movie_data))
 
 
+@cached(
+    RESPONSE_CACHE,
+    ttl=RESPONSE_CACHE_TTL["get_person"],
+    stale_ttl=RESPONSE_CACHE_STALE_TTL["get_person"],
+)
+@coalesced(INFLIGHT_REQUESTS)
 async def get_person(id: int, debug: bool = False) -> None | dict | tuple[dict, dict]:
     response = await person_preview_card_async(id)
 
@@ -207,18 +438,36 @@ async def get_person(id: int, debug: bool = False) -> None | dict | tuple[dict,
     parsed_data = {}
     if person_root:
         parsed_data = parse_person_data(person_root)
-        parsed_data = filter_recursive(parsed_data)
+        parsed_data = filter_in_place(parsed_data)
 
     if debug:
         return response_data, parsed_data
-    return parsed_data
+    return to_model(parsed_data)
 
 
+@cached(
+    RESPONSE_CACHE,
+    ttl=RESPONSE_CACHE_TTL["get_trivias"],
+    stale_ttl=RESPONSE_CACHE_STALE_TTL["get_trivias"],
+)
+@coalesced(INFLIGHT_REQUESTS)
 async def get_trivias(
     content_type: str, id: int, debug: bool = False
 ) -> None | list[dict] | tuple[dict, list[dict]]:
     ct_key = get_nested(MEDIA_CONTENT_TYPES, content_type, required=True)
 
+    response_data = await _fetch_trivias(content_type, id)
+    if response_data is None:
+        return
+
+    parsed_data = list(_iter_trivias(response_data, ct_key))
+
+    if debug:
+        return response_data, parsed_data
+    return to_models(parsed_data)
+
+
+async def _fetch_trivias(content_type: str, id: int) -> dict | None:
     if content_type == "film":
         response = await film_trivias_async(film_id=id)
     elif content_type == "tvseries":
@@ -226,29 +475,41 @@ async def get_trivias(
 
     if not response or not response.ok:
         return
+    return await response.json()
 
-    response_data = await response.json()
-    parsed_data = []
+
+def _iter_trivias(response_data: dict, ct_key: str) -> Iterator[dict]:
     if response_data:
         _trivias_items = get_nested(response_data, f"data.{ct_key}.trivias.items")
 
         if _trivias_items:
             for _trivia_item in _trivias_items:
-                parsed_trivia = parse_trivia_data(_trivia_item)
-                parsed_data.append(parsed_trivia)
-
-        parsed_data = filter_recursive(parsed_data)
-
-    if debug:
-        return response_data, parsed_data
-    return parsed_data
+                yield filter_in_place(parse_trivia_data(_trivia_item))
 
 
+@cached(
+    RESPONSE_CACHE,
+    ttl=RESPONSE_CACHE_TTL["get_media_posts"],
+    stale_ttl=RESPONSE_CACHE_STALE_TTL["get_media_posts"],
+)
+@coalesced(INFLIGHT_REQUESTS)
 async def get_media_posts(
     content_type: str, id: int, debug: bool = False
 ) -> None | list[dict] | tuple[dict, list[dict]]:
     ct_key = get_nested(MEDIA_CONTENT_TYPES, content_type, required=True)
 
+    response_data = await _fetch_media_posts(content_type, id)
+    if response_data is None:
+        return
+
+    parsed_data = list(_iter_media_posts(response_data, ct_key))
+
+    if debug:
+        return response_data, parsed_data
+    return to_models(parsed_data)
+
+
+async def _fetch_media_posts(content_type: str, id: int) -> dict | None:
     if content_type == "film":
         response = await film_media_posts_async(film_id=id)
     elif content_type == "tvseries":
@@ -256,21 +517,122 @@ async def get_media_posts(
 
     if not response or not response.ok:
         return
+    return await response.json()
 
-    response_data = await response.json()
 
-    parsed_data = []
+def _iter_media_posts(response_data: dict, ct_key: str) -> Iterator[dict]:
     if response_data:
         _media_posts_items = get_nested(
             response_data, f"data.{ct_key}.mediaPosts.items"
         )
         if _media_posts_items:
             for _media_post_item in _media_posts_items:
-                parsed_media_post_item = parse_media_post_data(_media_post_item)
-                parsed_data.append(parsed_media_post_item)
+                yield filter_in_place(parse_media_post_data(_media_post_item))
 
-    parsed_data = filter_recursive(parsed_data)
 
-    if debug:
-        return response_data, parsed_data
-    return parsed_data
+async def stream_similars(content_type: str, id: int) -> AsyncIterator[dict]:
+    """
+    Потоковый вариант get_similars: фильмы отдаются по одному.
+    Список получается через get_similars, поэтому используются тот же кэш
+    (с фоновым обновлением устаревших данных) и объединение одинаковых запросов.
+    """
+
+    async for item in _stream_items(get_similars, content_type, id):
+        yield item
+
+
+async def stream_trivias(content_type: str, id: int) -> AsyncIterator[dict]:
+    """
+    Потоковый вариант get_trivias: факты отдаются по одному.
+    Список получается через get_trivias (тот же кэш и объединение запросов).
+    """
+
+    async for item in _stream_items(get_trivias, content_type, id):
+        yield item
+
+
+async def stream_media_posts(content_type: str, id: int) -> AsyncIterator[dict]:
+    """
+    Потоковый вариант get_media_posts: статьи отдаются по одной.
+    Список получается через get_media_posts (тот же кэш и объединение запросов).
+    """
+
+    async for item in _stream_items(get_media_posts, content_type, id):
+        yield item
+
+
+async def _stream_items(getter, content_type: str, id: int) -> AsyncIterator[dict]:
+    # CACHED GETTER: STALE LIST IS SERVED AND REFRESHED IN BACKGROUND,
+    # CONCURRENT MISSES OF THE SAME LIST SHARE ONE UPSTREAM REQUEST
+    items = await getter(content_type, id)
+    for item in items or []:
+        yield item
+
+
+async def get_title_card(content_type: str, id: int) -> dict:
+    """
+    Функция для получения всех данных страницы фильма или сериала одним запросом.
+    Секции info, similars, trivias и media_posts запрашиваются одновременно,
+    поэтому время ответа равно времени самой медленной секции, но не больше
+    её таймаута из TITLE_CARD_SECTION_TIMEOUT.
+
+    Секция, не уложившаяся в таймаут или завершившаяся ошибкой, возвращается
+    пустой и попадает в список degraded. Запрос такой секции продолжается
+    в фоне, чтобы её результат попал в кэш к следующему запросу.
+
+    Parameters:
+        content_type (str): Тип контента: 'film' или 'tvseries'.
+        id (int): ID контента.
+
+    Returns:
+        dict: Словарь с секциями info, similars, trivias, media_posts и
+        списком degraded.
+    """
+
+    sections = {
+        "info": (get_info, {}),
+        "similars": (get_similars, []),
+        "trivias": (get_trivias, []),
+        "media_posts": (get_media_posts, []),
+    }
+    results = await asyncio.gather(
+        *(
+            _get_card_section(name, getter, content_type, id)
+            for name, (getter, _) in sections.items()
+        )
+    )
+
+    card, degraded = {}, []
+    for (name, (_, empty)), (data, is_degraded) in zip(sections.items(), results):
+        card[name] = data or empty
+        if is_degraded:
+            degraded.append(name)
+    card["degraded"] = degraded
+    return card
+
+
+async def _get_card_section(
+    name: str, getter, content_type: str, id: int
+) -> tuple[dict | list | None, bool]:
+    task = asyncio.ensure_future(getter(content_type, id))
+    try:
+        data = await asyncio.wait_for(
+            asyncio.shield(task), TITLE_CARD_SECTION_TIMEOUT[name]
+        )
+        return data, False
+    except asyncio.TimeoutError:
+        logger.warning(
+            "Title card section %s for %s %s timed out", name, content_type, id
+        )
+        # LET THE REQUEST FINISH IN BACKGROUND TO WARM UP THE CACHE
+        task.add_done_callback(_consume_task_result)
+    except Exception as e:
+        logger.warning(
+            "Title card section %s for %s %s failed: %r", name, content_type, id, e
+        )
+    return None, True
+
+
+def _consume_task_result(task: asyncio.Future) -> None:
+    if not task.cancelled():
+        task.exception()
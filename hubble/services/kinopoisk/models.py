@@ -0,0 +1,191 @@
+import logging
+from collections import Counter
+from typing import Union
+
+import msgspec
+
+
+logger = logging.getLogger(__name__)
+
+
+# NUMBERS ARE KEPT AS RECEIVED (8 STAYS 8, 8.0 STAYS 8.0)
+Number = Union[int, float]
+
+
+class Model(
+    msgspec.Struct,
+    tag_field="typename",
+    omit_defaults=True,
+    forbid_unknown_fields=True,
+    gc=False,
+):
+    """
+    Базовая модель обработанных данных Кинопоиска.
+
+    Модели строятся из словарей после filter_in_place: отсутствующие
+    (отфильтрованные) поля равны None и не попадают в JSON, поэтому
+    сериализованная модель содержит те же ключи и значения, что и словарь.
+    Поле typename хранится как тег модели.
+    """
+
+
+class Genre(Model, tag="genre"):
+    id: int
+    name: str | None = None
+    slug: str | None = None
+
+
+class Country(Model, tag="country"):
+    id: int
+    name: str | None = None
+
+
+class Person(Model, tag="person"):
+    id: int
+    name: str | None = None
+    original_name: str | None = None
+    birth_date: str | None = None
+    roles: list[str] | None = None
+    avatars_url: str | None = None
+    best_films: list[Union["Film", "TvSeries"]] | None = None
+    best_tvseries: list[Union["Film", "TvSeries"]] | None = None
+    person_url: str | None = None
+
+
+class Film(Model, tag="film"):
+    id: int
+    title_russian: str | None = None
+    title_original: str | None = None
+    production_year: int | None = None
+    short_description: str | None = None
+    synopsis: str | None = None
+    genres: list[Genre] | None = None
+    countries: list[Country] | None = None
+    trailer_stream_url: str | None = None
+    trailer_youtube: str | None = None
+    cover_url: str | None = None
+    actors: list[Person] | None = None
+    voice_over_actors: list[Person] | None = None
+    tagline: str | None = None
+    directors: list[Person] | None = None
+    poster_url: str | None = None
+    rating_imdb: Number | None = None
+    rating_kinopoisk: Number | None = None
+    rating_kinopoisk_top10_pos: int | None = None
+    rating_kinopoisk_top250_pos: int | None = None
+    rating_russian_critics: Number | None = None
+    rating_world_wide_critics: Number | None = None
+    duration: int | None = None
+    url: str | None = None
+
+
+class TvSeries(Model, tag="tvseries"):
+    id: int
+    title_russian: str | None = None
+    title_original: str | None = None
+    production_year: int | None = None
+    short_description: str | None = None
+    synopsis: str | None = None
+    release_start: int | None = None
+    release_end: int | None = None
+    genres: list[Genre] | None = None
+    countries: list[Country] | None = None
+    seasons_count: int | None = None
+    cover_url: str | None = None
+    trailer_stream_url: str | None = None
+    trailer_youtube: str | None = None
+    actors: list[Person] | None = None
+    voice_over_actors: list[Person] | None = None
+    tagline: str | None = None
+    directors: list[Person] | None = None
+    poster_url: str | None = None
+    rating_imdb: Number | None = None
+    rating_kinopoisk: Number | None = None
+    rating_kinopoisk_top10_pos: int | None = None
+    rating_kinopoisk_top250_pos: int | None = None
+    rating_russian_critics: Number | None = None
+    rating_worldwide_critics: Number | None = None
+    duration_total: int | None = None
+    duration_series: int | None = None
+    sequels: list[Union[Film, "TvSeries"]] | None = None
+    prequels: list[Union[Film, "TvSeries"]] | None = None
+    url: str | None = None
+
+
+class Trivia(Model, tag="trivia"):
+    id: int
+    is_spoiler: bool | None = None
+    text: str | None = None
+    trivia_type: str | None = None
+
+
+class Post(Model, tag="post"):
+    id: int
+    title: str | None = None
+    published_at: str | None = None
+    media_post_type: str | None = None
+    poster_url: str | None = None
+
+
+class SearchResult(Model, tag="search_result"):
+    match: Union[Film, TvSeries, Person, None] = None
+    movies: list[Union[Film, TvSeries]] | None = None
+    persons: list[Person] | None = None
+
+
+AnyModel = Union[Film, TvSeries, Person, Genre, Country, Trivia, Post, SearchResult]
+
+# CONVERTING TO A CONCRETE MODEL IS MUCH CHEAPER THAN TO THE AnyModel UNION
+MODELS_BY_TYPENAME = {
+    model.__struct_config__.tag: model
+    for model in (Film, TvSeries, Person, Genre, Country, Trivia, Post, SearchResult)
+}
+
+# DICTS THAT DID NOT MATCH THEIR MODEL, BY TYPENAME: A GROWING COUNT MEANS
+# THE PARSERS (OR UPSTREAM DATA) CHANGED AND THE MODELS NEED AN UPDATE
+VALIDATION_FALLBACKS = Counter()
+
+
+def to_model(data: dict) -> Union[AnyModel, dict]:
+    """
+    Функция для преобразования отфильтрованного словаря в модель по typename.
+    Если словарь пустой или не соответствует модели, он возвращается
+    без изменений, поэтому JSON ответа в любом случае остаётся прежним.
+    Несоответствия записываются в лог и считаются в VALIDATION_FALLBACKS.
+
+    Преобразование выполняется при каждом промахе кэша и стоит примерно
+    столько же, сколько сериализация словаря (benchmarks/bench_models.py),
+    а каждое попадание экономит лишь часть сериализации. Основной выигрыш
+    моделей – память, которую занимают записи кэша.
+
+    Parameters:
+        data (dict): Данные после filter_in_place.
+
+    Returns:
+        Model | dict: Модель или исходный словарь.
+    """
+
+    model = MODELS_BY_TYPENAME.get(data.get("typename")) if data else None
+    if model is None:
+        return data
+    try:
+        return msgspec.convert(data, model)
+    except msgspec.ValidationError as e:
+        typename = data.get("typename")
+        VALIDATION_FALLBACKS[typename] += 1
+        logger.warning(
+            "Keeping %s %s as dict (fallback #%d for this typename): %s",
+            typename,
+            data.get("id"),
+            VALIDATION_FALLBACKS[typename],
+            e,
+        )
+        return data
+
+
+def model_stats() -> dict:
+    return {"validation_fallbacks": dict(VALIDATION_FALLBACKS)}
+
+
+def to_models(items: list[dict]) -> list[Union[AnyModel, dict]]:
+    return [to_model(item) for item in items]
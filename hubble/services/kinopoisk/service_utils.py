@@ -1,5 +1,9 @@
+from datetime import timedelta
 from typing import List, Dict, Union
 
+from hubble.cache import TTLCache
+from hubble.singleflight import SingleFlight
+
 
 PERSON_URL_TEMPLATE = "https://www.kinopoisk.ru/name/{}/"
 FILM_URL_TEMPLATE = "https://www.kinopoisk.ru/film/{}/"
@@ -10,6 +14,64 @@ MEDIA_CONTENT_TYPES = {"tvseries": "tvSeries", "film": "film"}
 REQUIRED_FIELDS: list = ["id", "typename"]
 
 
+# READ-THROUGH DATABASE CACHE FOR get_info
+INFO_DB_CACHE_ENABLED = True
+INFO_DB_CACHE_TTL = {
+    "film": timedelta(days=7),
+    "tvseries": timedelta(days=1),
+}
+
+
+# LOCAL FULL-TEXT SEARCH (FTS5 INDEX OF STORED TITLES AND PERSONS) FOR get_search:
+# EXACT LOCAL MATCH IS RETURNED WITHOUT UPSTREAM REQUEST, OTHER LOCAL RESULTS
+# ARE RETURNED IF UPSTREAM FAILS OR DOES NOT ANSWER IN SEARCH_UPSTREAM_TIMEOUT SECONDS
+SEARCH_LOCAL_ENABLED = True
+SEARCH_LOCAL_LIMIT = 10
+SEARCH_UPSTREAM_TIMEOUT = 3.0
+# FUZZY LOCAL SEARCH (TRIGRAM INDEX OF NORMALIZED TITLES AND NAMES) FOR TYPOS AND
+# TRANSLITERATION, USED WHEN FULL-TEXT SEARCH FINDS NOTHING. SIMILAR TITLES MAY BE
+# OTHER MOVIES ("ЁЛКИ 2" AND "ЁЛКИ"), SO ITS RESULTS ARE ONLY A FALLBACK AS WELL
+SEARCH_FUZZY_ENABLED = True
+SEARCH_FUZZY_MIN_SIMILARITY = 0.3
+
+
+# IN-MEMORY RESPONSE CACHE FOR ALL GETTERS (TTL IN SECONDS)
+RESPONSE_CACHE_MAXSIZE = 2048
+RESPONSE_CACHE_TTL = {
+    "get_search": 10 * 60,
+    "get_info": 60 * 60,
+    "get_similars": 60 * 60,
+    "get_person": 60 * 60,
+    "get_trivias": 6 * 60 * 60,
+    "get_media_posts": 30 * 60,
+}
+# STALE-WHILE-REVALIDATE WINDOW AFTER TTL (STALE ENTRY IS SERVED, REFRESH IN BACKGROUND)
+RESPONSE_CACHE_STALE_TTL = {
+    "get_search": 0,
+    "get_info": 24 * 60 * 60,
+    "get_similars": 24 * 60 * 60,
+    "get_person": 24 * 60 * 60,
+    "get_trivias": 0,
+    "get_media_posts": 0,
+}
+RESPONSE_CACHE = TTLCache(maxsize=RESPONSE_CACHE_MAXSIZE)
+
+# CONCURRENT IDENTICAL REQUESTS ARE COALESCED INTO ONE UPSTREAM CALL
+INFLIGHT_REQUESTS = SingleFlight()
+
+# BATCH get_info: MAX ITEMS IN ONE BATCH AND MAX CONCURRENT get_info CALLS
+INFO_BATCH_MAX_SIZE = 200
+INFO_BATCH_CONCURRENCY = 10
+
+# TITLE CARD: TIMEOUT OF EACH SECTION IN SECONDS (SLOW SECTION IS RETURNED EMPTY)
+TITLE_CARD_SECTION_TIMEOUT = {
+    "info": 8.0,
+    "similars": 3.0,
+    "trivias": 3.0,
+    "media_posts": 3.0,
+}
+
+
 class MissingFieldError(Exception):
     """Exception raised when a required field is missing or empty."""
 
@@ -78,6 +140,90 @@ def filter_recursive(data: Union[List, Dict]) -> Union[List, Dict]:
     return filtered_data
 
 
+def filter_in_place(data: Union[List, Dict]) -> Union[List, Dict]:
+    """
+    Функция для удаления пустых значений и проверки обязательных полей
+    во вложенных структурах dict и list без рекурсии и без копирования.
+
+    Результат совпадает с filter_recursive, но данные изменяются на месте.
+    Первый (нерекурсивный) обход удаляет пустые скалярные значения и
+    запоминает вложенные контейнеры, второй - проходит по ним от листьев
+    к корню и удаляет опустевшие словари и списки.
+
+    Args:
+        data (Any): Данные для фильтрации (изменяются на месте).
+
+    Returns:
+        data (Any): Те же данные после фильтрации.
+    """
+
+    # TOP-LEVEL LIST ITEMS ARE FILTERED, BUT NEVER REMOVED (LIKE IN filter_recursive)
+    if isinstance(data, dict):
+        stack = [data]
+    else:
+        stack = [item for item in data if isinstance(item, dict)]
+
+    # 1. PRE-ORDER PASS: SCALARS ARE VALIDATED AND REMOVED RIGHT AWAY,
+    #    CONTAINERS THAT MAY BECOME EMPTY ARE REMEMBERED FOR THE SECOND PASS
+    containers = []
+    while stack:
+        node = stack.pop()
+        empty_keys = None
+        container_keys = None
+
+        for key, value in node.items():
+            if isinstance(value, dict):
+                if value:
+                    stack.append(value)
+                    if container_keys is None:
+                        container_keys = []
+                    container_keys.append(key)
+                    continue
+            elif isinstance(value, list):
+                if value:
+                    has_dicts = False
+                    for item in value:
+                        if isinstance(item, dict):
+                            stack.append(item)
+                            has_dicts = True
+                    if has_dicts:
+                        if container_keys is None:
+                            container_keys = []
+                        container_keys.append(key)
+                    continue
+            elif key in REQUIRED_FIELDS:
+                # VALIDATING REQUIRED FIELDS
+                if not value:
+                    raise MissingFieldError(f"Missing or empty required field: {key}")
+                continue
+            elif value:
+                continue
+
+            if empty_keys is None:
+                empty_keys = []
+            empty_keys.append(key)
+
+        if empty_keys:
+            for key in empty_keys:
+                del node[key]
+        if container_keys:
+            containers.append((node, container_keys))
+
+    # 2. FROM LEAVES TO ROOT: REMOVING DICTS AND LISTS THAT BECAME EMPTY
+    for node, container_keys in reversed(containers):
+        for key in container_keys:
+            value = node[key]
+            if isinstance(value, list):
+                for item in value:
+                    if isinstance(item, dict) and not item:
+                        value[:] = [i for i in value if not isinstance(i, dict) or i]
+                        break
+            if not value:
+                del node[key]
+
+    return data
+
+
 def is_media_content_type_valid(content_type: str) -> bool:
     """
     Функция для валидации типа медиа-контента.
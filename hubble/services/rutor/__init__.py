@@ -1 +1,5 @@
-from hubble.services.rutor.getters import get_rutor_search
+from hubble.services.rutor.getters import (
+    get_rutor_search,
+    get_rutor_results,
+    get_torrents,
+)
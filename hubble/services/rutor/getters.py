@@ -1,10 +1,24 @@
-import aiohttp
+import asyncio
+import logging
 from typing import Optional, Union
 
+from hubble.cache import cached
+from hubble.singleflight import coalesced
+from hubble.http_client import get_http_session
 from hubble.services.rutor.parsers import parse_rutor_html
 from hubble.services.rutor.service_utils import HEADERS, build_search_url
+from hubble.services.rutor.service_utils import INFLIGHT_REQUESTS
+from hubble.services.rutor.service_utils import SEARCH_MAX_PAGES
+from hubble.services.rutor.service_utils import SEARCH_PAGE_CONCURRENCY
+from hubble.services.rutor.service_utils import SEARCH_CACHE, SEARCH_CACHE_TTL
+from hubble.services.rutor.service_utils import merge_results
+from hubble.services.rutor.service_utils import filter_results, sort_results
 
 
+logger = logging.getLogger(__name__)
+
+
+@coalesced(INFLIGHT_REQUESTS)
 async def get_rutor_search(
     query: str,
     *,
@@ -12,6 +26,7 @@ async def get_rutor_search(
     mode: Optional[str] = None,
     scope: Optional[str] = None,
     sort: Optional[Union[str, int]] = None,
+    pages: int = 1,
 ) -> str:
     """
     Асинхронно выполняет поиск на rutor.info.
@@ -23,20 +38,98 @@ async def get_rutor_search(
       - scope: область поиска – "title" (только название) или "both" (название и описание, по умолчанию "both").
       - sort: способ сортировки – "date_desc", "date_asc", "seeds_desc", "seeds_asc", "leechers_desc", "leechers_asc",
               "title_desc", "title_asc", "size_desc", "size_asc" или "relevance" (по умолчанию "date_desc").
+      - pages: количество страниц результатов (не больше SEARCH_MAX_PAGES). Страницы
+              загружаются одновременно (не больше SEARCH_PAGE_CONCURRENCY), раздачи
+              с одинаковым info-hash удаляются, результаты сортируются в порядке sort.
 
     Если дополнительных параметров не задано, то формируется URL вида:
        BASE_URL/&lt;encoded_query&gt;
     Иначе URL выглядит как:
        BASE_URL/0/&lt;category_code&gt;/&lt;search_mode_code&gt;/&lt;sort_code&gt;/&lt;encoded_query&gt;
 
-    Возвращает HTML-страницу с результатами поиска.
+    Возвращает список раздач (результат parse_rutor_html).
     """
-    url = build_search_url(query, category=category, mode=mode, scope=scope, sort=sort)
+    params = {"category": category, "mode": mode, "scope": scope, "sort": sort}
+    pages = max(1, min(pages, SEARCH_MAX_PAGES))
+    if pages == 1:
+        return await _get_search_page(query, 0, params)
+
+    semaphore = asyncio.Semaphore(SEARCH_PAGE_CONCURRENCY)
+
+    async def get_page(page: int) -> list[dict]:
+        async with semaphore:
+            # ERRORS OF THE FIRST PAGE ARE RAISED, FURTHER PAGES ARE SKIPPED
+            try:
+                return await _get_search_page(query, page, params) or []
+            except Exception as e:
+                if page == 0:
+                    raise
+                logger.warning("Rutor page %s of %r failed: %r", page, query, e)
+                return []
+
+    # EACH PAGE IS PARSED (IN A WORKER THREAD) AS SOON AS IT IS LOADED,
+    # WHILE OTHER PAGES ARE LOADING
+    results = await asyncio.gather(*(get_page(page) for page in range(pages)))
+    return merge_results(results, sort)
+
 
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url, headers=HEADERS) as response:
-            response.raise_for_status()
-    response_text = await response.text()
+async def _get_search_page(query: str, page: int, params: dict):
+    url = build_search_url(query, page=page, **params)
+
+    session = get_http_session("rutor")
+    async with session.get(url, headers=HEADERS) as response:
+        response.raise_for_status()
+        response_text = await response.text()
     if response_text:
-        return parse_rutor_html(response_text)
+        # PARSING A PAGE TAKES MILLISECONDS OF CPU: THE EVENT LOOP IS NOT BLOCKED
+        return await asyncio.to_thread(parse_rutor_html, response_text)
     return {}
+
+
+@cached(SEARCH_CACHE, ttl=SEARCH_CACHE_TTL)
+async def get_rutor_results(
+    query: str, category: Optional[Union[str, int]] = None, pages: int = 1
+) -> list[dict]:
+    """
+    Функция для получения результатов поиска на rutor.info (без фильтров,
+    в порядке по умолчанию) с кэшированием на SEARCH_CACHE_TTL секунд.
+    """
+
+    return await get_rutor_search(query, category=category, pages=pages) or []
+
+
+async def get_torrents(
+    query: str,
+    *,
+    category: Optional[Union[str, int]] = None,
+    pages: int = 1,
+    sort: Optional[Union[str, int]] = None,
+    min_seeds: int | None = None,
+    min_size: float | None = None,
+    max_size: float | None = None,
+    title: str | None = None,
+) -> list[dict]:
+    """
+    Функция для поиска раздач с фильтрацией и сортировкой.
+    Результаты поиска кэшируются по query, category и pages, а фильтры
+    и сортировка применяются к ним локально, поэтому разные варианты
+    фильтров и сортировки одного запроса не требуют новых запросов к rutor.
+    Сортируются только загруженные страницы (pages), а не вся выдача rutor.
+
+    Parameters:
+        query (str): Поисковая фраза.
+        category (str | int | None): Категория (как в build_search_url).
+        pages (int): Количество загружаемых страниц результатов.
+        sort (str | int | None): Способ сортировки (как в build_search_url).
+        min_seeds (int | None): Минимальное количество сидов.
+        min_size (float | None): Минимальный размер раздачи в байтах.
+        max_size (float | None): Максимальный размер раздачи в байтах.
+        title (str | None): Подстрока названия (без учёта регистра).
+
+    Returns:
+        list[dict]: Отфильтрованные и отсортированные раздачи.
+    """
+
+    results = await get_rutor_results(query, category=category, pages=pages)
+    results = filter_results(results, min_seeds, min_size, max_size, title)
+    return sort_results(results, sort)
@@ -3,6 +3,23 @@ import re
 from hubble.services.rutor.service_utils import clean_html, convert_to_full_torrent_url
 
 
+# ПАТТЕРНЫ КОМПИЛИРУЮТСЯ ОДИН РАЗ ПРИ ИМПОРТЕ МОДУЛЯ.
+# ВМЕСТО (.*?)</tr> ИСПОЛЬЗУЕТСЯ "РАЗВЁРНУТЫЙ ЦИКЛ" [^<]*(?:<(?!/tr>)[^<]*)*:
+# СОВПАДАЕТ ТОТ ЖЕ ТЕКСТ, НО БЕЗ ПРОВЕРКИ </tr> НА КАЖДОМ СИМВОЛЕ
+RESULTS_TABLE_MARKER = '<div id="index">'
+ROW_PATTERN = re.compile(
+    r'<tr\s+class="(?:gai|tum)"[^>]*>([^<]*(?:<(?!/tr>)[^<]*)*)</tr>',
+    re.DOTALL | re.IGNORECASE,
+)
+CELL_PATTERN = re.compile(
+    r"<td[^>]*>([^<]*(?:<(?!/td>)[^<]*)*)</td>", re.DOTALL | re.IGNORECASE
+)
+LINK_PATTERN = re.compile(
+    r'<a\s+[^>]*href="([^"]+)"[^>]*>(.*?)</a>', re.DOTALL | re.IGNORECASE
+)
+NUMBER_PATTERN = re.compile(r"\d+")
+
+
 def parse_rutor_html(html: str):
     """
     Извлекает из HTML-результатов следующие данные для каждой раздачи:
@@ -23,42 +40,36 @@ def parse_rutor_html(html: str):
     """
     results = []
 
-    # Находим все строки с результатами (класс "gai" или "tum")
-    rows = re.findall(
-        r'<tr\s+class="(?:gai|tum)"[^>]*>(.*?)</tr>', html, re.DOTALL | re.IGNORECASE
-    )
-    for row in rows:
+    # Таблица результатов ищется один раз: строки до неё не просматриваются
+    start = html.find(RESULTS_TABLE_MARKER)
+    if start != -1:
+        html = html[start:]
+
+    # Строки с результатами (класс "gai" или "tum") - за один проход по странице
+    for row_match in ROW_PATTERN.finditer(html):
         # Извлекаем все содержимое ячеек <td>...</td> в строке
-        tds = re.findall(r"<td[^>]*>(.*?)</td>", row, re.DOTALL | re.IGNORECASE)
-        if not tds or len(tds) < 3:
+        tds = CELL_PATTERN.findall(row_match.group(1))
+        if len(tds) < 3:
             continue
 
         # 1. Первая ячейка – дата
         date = clean_html(tds[0])
 
         # 2. Последняя TD содержит данные о пирах (сиды/личи)
-        peers_html = tds[-1]
-        peers_text = clean_html(peers_html)
         # Ищем все числа: первое – сиды, второе – личи
-        numbers = re.findall(r"\d+", peers_text)
-        seeds = int(numbers[0]) if numbers and len(numbers) >= 1 else 0
-        leechers = int(numbers[1]) if numbers and len(numbers) >= 2 else 0
+        numbers = NUMBER_PATTERN.findall(clean_html(tds[-1]))
+        seeds = int(numbers[0]) if numbers else 0
+        leechers = int(numbers[1]) if len(numbers) >= 2 else 0
 
         # 3. Предпоследняя TD – размер раздачи
         size = clean_html(tds[-2])
 
         # 4. Блок с заголовком и ссылками – берем вторую TD (даже если есть colspan)
-        title_block = tds[1]
-
         # Извлекаем все ссылки: ожидается, что:
         #   - первая ссылка (с классом "downgif") пропускается,
         #   - вторая содержит magnet-ссылку,
         #   - третья – торрент-ссылку и название.
-        links = re.findall(
-            r'<a\s+[^>]*href="([^"]+)"[^>]*>(.*?)</a>',
-            title_block,
-            re.DOTALL | re.IGNORECASE,
-        )
+        links = LINK_PATTERN.findall(tds[1])
         magnet = ""
         torrent = ""
         title = ""
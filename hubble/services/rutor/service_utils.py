@@ -1,7 +1,11 @@
 import re
 import urllib.parse
+from datetime import date
 from typing import Optional, Union
 
+from hubble.cache import TTLCache
+from hubble.singleflight import SingleFlight
+
 
 BASE_URL = "https://rutor.info/search"
 
@@ -24,8 +28,42 @@ HEADERS = {
 }
 
 
+# CONCURRENT IDENTICAL REQUESTS ARE COALESCED INTO ONE UPSTREAM CALL
+INFLIGHT_REQUESTS = SingleFlight()
+
+# MULTI-PAGE SEARCH: MAX PAGES IN ONE SEARCH AND MAX CONCURRENT PAGE REQUESTS
+SEARCH_MAX_PAGES = 20
+SEARCH_PAGE_CONCURRENCY = 4
+
+# IN-MEMORY CACHE OF UNSORTED SEARCH RESULTS (TTL IN SECONDS).
+# FILTERS AND SORT ARE APPLIED TO CACHED RESULTS WITHOUT NEW REQUESTS
+SEARCH_CACHE_MAXSIZE = 256
+SEARCH_CACHE_TTL = 5 * 60
+SEARCH_CACHE = TTLCache(maxsize=SEARCH_CACHE_MAXSIZE, ttl=SEARCH_CACHE_TTL)
+
+
+# SORT CODES OF THE SEARCH URL (4TH PARAMETER)
+SORT_CODES = {
+    "date_desc": 0,
+    "date_asc": 1,
+    "seeds_desc": 2,
+    "seeds_asc": 3,
+    "leechers_desc": 4,
+    "leechers_asc": 5,
+    "title_desc": 6,
+    "title_asc": 7,
+    "size_desc": 8,
+    "size_asc": 9,
+    "relevance": 10,
+}
+
+
+HTML_TAG_PATTERN = re.compile(r"<[^>]+>")
+
+
 def clean_html(text: str) -> str:
-    text = re.sub(r"<[^>]+>", "", text)
+    if "<" in text:
+        text = HTML_TAG_PATTERN.sub("", text)
     return text.replace("&nbsp;", " ").strip()
 
 
@@ -44,12 +82,13 @@ def build_search_url(
     mode: Optional[str] = None,
     scope: Optional[str] = None,
     sort: Optional[Union[str, int]] = None,
+    page: int = 0,
 ) -> str:
     """
     Формирует URL для поиска на rutor.info.
 
-    Если не переданы дополнительные параметры (category, mode, scope, sort),
-    то URL формируется как BASE_URL/&lt;query&gt;.
+    Если не переданы дополнительные параметры (category, mode, scope, sort)
+    и запрашивается первая страница (page=0), то URL формируется как BASE_URL/&lt;query&gt;.
 
     Иначе используются следующие правила (при отсутствии значения подставляются дефолты):
       - category: по-умолчанию "any" (любая категория)
@@ -60,7 +99,13 @@ def build_search_url(
     Внутри функция использует словари для преобразования понятных ключей в нужные коды.
     """
     # Если никаких параметров не задано – формируем упрощённый URL
-    if category is None and mode is None and scope is None and sort is None:
+    if (
+        category is None
+        and mode is None
+        and scope is None
+        and sort is None
+        and not page
+    ):
         return f"{BASE_URL}/{urllib.parse.quote(query)}"
 
     # Словарь для категорий (2-й параметр)
@@ -108,27 +153,168 @@ def build_search_url(
         f"{mode_map.get(mode.lower(), '1')}{scope_map.get(scope.lower(), '1')}0"
     )
 
-    # Словарь для сортировки (4-й параметр)
-    sort_mapping = {
-        "date_desc": 0,
-        "date_asc": 1,
-        "seeds_desc": 2,
-        "seeds_asc": 3,
-        "leechers_desc": 4,
-        "leechers_asc": 5,
-        "title_desc": 6,
-        "title_asc": 7,
-        "size_desc": 8,
-        "size_asc": 9,
-        "relevance": 10,
-    }
+    # Код сортировки (4-й параметр)
     if isinstance(sort, str):
-        sort_code = sort_mapping.get(sort.lower(), 0)
+        sort_code = SORT_CODES.get(sort.lower(), 0)
     else:
         sort_code = sort
 
-    # Первый параметр всегда 0
-    first_param = 0
+    # Первый параметр – номер страницы результатов (начиная с 0)
+    first_param = page
     encoded_query = urllib.parse.quote(query)
 
     return f"{BASE_URL}/{first_param}/{category_code}/{search_mode_code}/{sort_code}/{encoded_query}"
+
+
+# СЛИЯНИЕ И СОРТИРОВКА РЕЗУЛЬТАТОВ НЕСКОЛЬКИХ СТРАНИЦ ПОИСКА
+
+BTIH_PATTERN = re.compile(r"urn:btih:([0-9a-z]+)", re.IGNORECASE)
+SIZE_PATTERN = re.compile(r"([\d.]+)\s*([KMGT]?B)", re.IGNORECASE)
+SIZE_UNITS = {"B": 1, "KB": 1024, "MB": 1024**2, "GB": 1024**3, "TB": 1024**4}
+MONTHS = {
+    "янв": 1,
+    "фев": 2,
+    "мар": 3,
+    "апр": 4,
+    "май": 5,
+    "июн": 6,
+    "июл": 7,
+    "авг": 8,
+    "сен": 9,
+    "окт": 10,
+    "ноя": 11,
+    "дек": 12,
+}
+
+
+def get_result_key(result: dict) -> str:
+    """
+    Функция для получения ключа раздачи: info-hash из magnet-ссылки,
+    а если его нет – ссылка на торрент.
+    """
+
+    match = BTIH_PATTERN.search(result.get("magnet") or "")
+    if match:
+        return match.group(1).lower()
+    return result.get("torrent") or result.get("title") or ""
+
+
+def parse_result_date(text: str) -> date:
+    # ФОРМАТ ДАТЫ: "27 Окт 24"
+    parts = text.split()
+    if len(parts) != 3:
+        return date.min
+    month = MONTHS.get(parts[1][:3].lower())
+    try:
+        return date(2000 + int(parts[2]), month, int(parts[0]))
+    except (TypeError, ValueError):
+        return date.min
+
+
+def parse_result_size(text: str) -> float:
+    # ФОРМАТ РАЗМЕРА: "16.48 GB"
+    match = SIZE_PATTERN.search(text)
+    if not match:
+        return 0.0
+    try:
+        return float(match.group(1)) * SIZE_UNITS[match.group(2).upper()]
+    except ValueError:
+        return 0.0
+
+
+RESULT_SORT_KEYS = {
+    "date": lambda result: parse_result_date(result["date"]),
+    "seeds": lambda result: result["seeds"],
+    "leechers": lambda result: result["leechers"],
+    "title": lambda result: result["title"].casefold(),
+    "size": lambda result: parse_result_size(result["size"]),
+}
+
+
+def merge_results(
+    pages: list[list[dict]], sort: Optional[Union[str, int]] = None
+) -> list[dict]:
+    """
+    Функция для слияния результатов нескольких страниц поиска.
+    Раздачи с одинаковым info-hash (например, сдвинувшиеся между страницами
+    за время запроса) остаются в одном экземпляре – с более ранней страницы.
+    Объединённый список сортируется в порядке sort (как в build_search_url),
+    при сортировке "relevance" сохраняется порядок страниц.
+
+    Parameters:
+        pages (list[list[dict]]): Результаты parse_rutor_html по страницам.
+        sort (str | int | None): Способ сортировки (по умолчанию "date_desc").
+
+    Returns:
+        list[dict]: Объединённые результаты.
+    """
+
+    results = []
+    seen = set()
+    for page_results in pages:
+        for result in page_results:
+            key = get_result_key(result)
+            if key in seen:
+                continue
+            seen.add(key)
+            results.append(result)
+
+    return sort_results(results, sort)
+
+
+def sort_results(
+    results: list[dict], sort: Optional[Union[str, int]] = None
+) -> list[dict]:
+    """
+    Функция для сортировки результатов поиска в порядке sort
+    (как в build_search_url). Возвращает новый список, при сортировке
+    "relevance" порядок не меняется.
+    """
+
+    results = list(results)
+    # UNKNOWN SORT IS TREATED AS "date_desc", AS IN build_search_url
+    if isinstance(sort, int):
+        sort = next((name for name, code in SORT_CODES.items() if code == sort), None)
+    if sort is None or sort.lower() not in SORT_CODES:
+        sort = "date_desc"
+    field, _, direction = sort.lower().rpartition("_")
+    if field in RESULT_SORT_KEYS:
+        # SORT IS STABLE: RESULTS WITH EQUAL KEYS KEEP THE PAGE ORDER
+        results.sort(key=RESULT_SORT_KEYS[field], reverse=direction == "desc")
+    return results
+
+
+def filter_results(
+    results: list[dict],
+    min_seeds: int | None = None,
+    min_size: float | None = None,
+    max_size: float | None = None,
+    title: str | None = None,
+) -> list[dict]:
+    """
+    Функция для фильтрации результатов поиска. Возвращает новый список.
+
+    Parameters:
+        results (list[dict]): Результаты parse_rutor_html.
+        min_seeds (int | None): Минимальное количество сидов.
+        min_size (float | None): Минимальный размер раздачи в байтах.
+        max_size (float | None): Максимальный размер раздачи в байтах.
+        title (str | None): Подстрока названия (без учёта регистра).
+    """
+
+    # PLAIN SUBSTRING INSTEAD OF A REGEX: USER INPUT CANNOT CAUSE BACKTRACKING
+    title = title.casefold() if title else None
+    filtered = []
+    for result in results:
+        if min_seeds is not None and result["seeds"] < min_seeds:
+            continue
+        if min_size is not None or max_size is not None:
+            size = parse_result_size(result["size"])
+            if min_size is not None and size < min_size:
+                continue
+            if max_size is not None and size > max_size:
+                continue
+        if title is not None and title not in result["title"].casefold():
+            continue
+        filtered.append(result)
+    return filtered
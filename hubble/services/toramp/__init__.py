@@ -1 +1,6 @@
-from hubble.services.toramp.getters import get_series_dates
+from hubble.services.toramp.getters import (
+    get_series_dates,
+    get_series_dates_by_id,
+    get_series_dates_batch,
+    stream_series_dates_batch,
+)
@@ -1,22 +1,40 @@
+import asyncio
+import logging
+from typing import AsyncIterator
+
 import aiohttp
 
 from hubble.utils import get_nested
+from hubble.cache import normalize_cache_arg
+from hubble.singleflight import coalesced
+from hubble.http_client import get_http_session, wait_for_rate_limit
 from hubble.services.toramp.parsers import parse_search, parse_series_dates
 from hubble.services.toramp.service_utils import HEADERS, SEARCH_URL
+from hubble.services.toramp.service_utils import SERIES_URL_TEMPLATE
+from hubble.services.toramp.service_utils import INFLIGHT_REQUESTS
+from hubble.services.toramp.service_utils import TITLE_MAPPING_CACHE
+from hubble.services.toramp.service_utils import TITLE_MAPPING_DB_ENABLED
+from hubble.services.toramp.service_utils import TITLE_MAPPING_DB_TTL
+from hubble.services.toramp.service_utils import SERIES_DATES_BATCH_CONCURRENCY
+from database.requests.getters import get_toramp_title
+from database.requests.setters import delete_toramp_title, save_object
+from database.requests.setters import set_toramp_title
+
 
+logger = logging.getLogger(__name__)
 
+
+@coalesced(INFLIGHT_REQUESTS)
 async def get_search(query: str) -> dict:
     data = aiohttp.FormData()
     data.add_field("value", query)
     data.add_field("db", "2")
 
-    try:
-        async with aiohttp.request(
-            "POST", SEARCH_URL, headers=HEADERS, data=data
-        ) as response:
-            response_data = await response.text(encoding="utf-8")
-    except Exception as e:
-        return {}
+    # TRANSPORT ERRORS ARE NOT HIDDEN: THE HANDLERS REPORT THEM AS 502
+    await wait_for_rate_limit("toramp")
+    session = get_http_session("toramp")
+    async with session.post(SEARCH_URL, headers=HEADERS, data=data) as response:
+        response_data = await response.text(encoding="utf-8")
 
     parsed_data = {}
     if response_data:
@@ -25,7 +43,34 @@ async def get_search(query: str) -> dict:
     return parsed_data
 
 
+@coalesced(INFLIGHT_REQUESTS)
 async def get_series_dates(query: str) -> dict:
+    """
+    Функция для получения дат выхода серий сериала по его названию.
+    Страница сериала находится через поиск toramp, найденный результат
+    сохраняется (в памяти и в БД), поэтому повторные запросы того же
+    названия сразу загружают страницу сериала.
+
+    Parameters:
+        query (str): Название сериала.
+    """
+
+    title_key = normalize_cache_arg(query)
+    search_result = await _get_title_mapping(title_key)
+    if search_result:
+        try:
+            status, response_data = await _get_series_page(search_result["url"])
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.warning("Toramp page %s failed: %r", search_result["url"], e)
+            status, response_data = None, None
+        if status == 200:
+            return _build_series_dates(search_result, response_data)
+        if status == 404:
+            # SERIES PAGE HAS MOVED, THE SAVED RESULT IS NOT VALID ANYMORE
+            await _delete_title_mapping(title_key)
+        # ANY OTHER ANSWER (ERROR PAGE, TRANSPORT ERROR):
+        # THE TITLE IS SEARCHED AGAIN ONCE
+
     search_result = await get_search(query)
     if not search_result:
         return {}
@@ -34,17 +79,170 @@ async def get_series_dates(query: str) -> dict:
     if not url_to_parse:
         return {}
 
-    try:
-        async with aiohttp.request("GET", url_to_parse, headers=HEADERS) as response:
-            response_data = await response.text(encoding="utf-8")
-    except Exception as e:
+    # ERROR PAGES ARE NEVER PARSED AS SERIES DATA
+    status, response_data = await _get_series_page(url_to_parse)
+    if status != 200:
+        return {}
+    await _set_title_mapping(title_key, search_result)
+    return _build_series_dates(search_result, response_data)
+
+
+@coalesced(INFLIGHT_REQUESTS)
+async def get_series_dates_by_id(toramp_id: int) -> dict:
+    """
+    Функция для получения дат выхода серий сериала по его ID на toramp
+    (без запроса поиска).
+
+    Parameters:
+        toramp_id (int): ID сериала на toramp.
+    """
+
+    url = SERIES_URL_TEMPLATE.format(toramp_id)
+    status, response_data = await _get_series_page(url)
+    if status != 200:
         return {}
+    return _build_series_dates({"id": str(toramp_id), "url": url}, response_data)
+
 
+def _build_series_dates(search_result: dict, response_data: str | None) -> dict:
     parsed_data = {}
     if response_data:
         parsed_data = parse_series_dates(response_data)
 
+    # SEARCH RESULT MAY BE SHARED WITH COALESCED CALLERS, SO IT IS COPIED
+    search_result = dict(search_result)
     search_result.update(parsed_data)
     search_result["typename"] = "toramp_search"
 
     return search_result
+
+
+async def get_series_dates_batch(
+    titles: list[str],
+    ids: list[int],
+    concurrency: int = SERIES_DATES_BATCH_CONCURRENCY,
+) -> list[dict]:
+    """
+    Функция для получения дат выхода серий нескольких сериалов.
+    Одновременно выполняется не более concurrency запросов, частота запросов
+    к toramp дополнительно ограничена rate_limit HTTP-клиента.
+    Ошибка одного элемента не прерывает обработку остальных.
+
+    Parameters:
+        titles (list[str]): Названия сериалов.
+        ids (list[int]): ID сериалов на toramp.
+        concurrency (int): Максимальное количество одновременных запросов.
+
+    Returns:
+        list[dict]: Результаты в порядке titles, затем ids. Каждый результат
+        содержит title или id и status, а также data (при status=200) или error.
+    """
+
+    semaphore = asyncio.Semaphore(concurrency)
+    return await asyncio.gather(*_make_batch_items(titles, ids, semaphore))
+
+
+async def stream_series_dates_batch(
+    titles: list[str],
+    ids: list[int],
+    concurrency: int = SERIES_DATES_BATCH_CONCURRENCY,
+) -> AsyncIterator[dict]:
+    """
+    Потоковый вариант get_series_dates_batch: результаты отдаются по мере
+    готовности. Если потребитель прекращает чтение, оставшиеся запросы
+    отменяются.
+    """
+
+    semaphore = asyncio.Semaphore(concurrency)
+    tasks = [
+        asyncio.ensure_future(item)
+        for item in _make_batch_items(titles, ids, semaphore)
+    ]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+def _make_batch_items(
+    titles: list[str], ids: list[int], semaphore: asyncio.Semaphore
+) -> list:
+    return [
+        _get_batch_item("title", title, get_series_dates, semaphore) for title in titles
+    ] + [
+        _get_batch_item("id", toramp_id, get_series_dates_by_id, semaphore)
+        for toramp_id in ids
+    ]
+
+
+async def _get_batch_item(
+    key: str, value: str | int, getter, semaphore: asyncio.Semaphore
+) -> dict:
+    result = {key: value}
+
+    try:
+        async with semaphore:
+            data = await getter(value)
+    except Exception as e:
+        logger.warning("Batch item %s %r failed: %r", key, value, e)
+        result.update(status=502, error="Upstream request failed")
+        return result
+
+    if not data:
+        result.update(status=404, error="Not Found")
+    else:
+        result.update(status=200, data=data)
+    return result
+
+
+async def _get_series_page(url: str) -> tuple[int, str]:
+    await wait_for_rate_limit("toramp")
+    session = get_http_session("toramp")
+    async with session.get(url, headers=HEADERS) as response:
+        return response.status, await response.text(encoding="utf-8")
+
+
+async def _get_title_mapping(title_key: str) -> dict | None:
+    """
+    Функция для получения сохранённого результата поиска по названию:
+    сначала из памяти, затем из БД (если запись не старше TITLE_MAPPING_DB_TTL).
+    Ошибки БД не прерывают запрос: в этом случае выполняется поиск.
+    """
+
+    search_result = TITLE_MAPPING_CACHE.get(title_key)
+    if search_result or not TITLE_MAPPING_DB_ENABLED:
+        return search_result
+
+    try:
+        search_result = await get_toramp_title(title_key, TITLE_MAPPING_DB_TTL)
+    except Exception as e:
+        logger.warning("Reading toramp title %r from database failed: %r", title_key, e)
+        return None
+
+    if search_result:
+        TITLE_MAPPING_CACHE.set(title_key, search_result)
+    return search_result
+
+
+async def _set_title_mapping(title_key: str, search_result: dict) -> None:
+    TITLE_MAPPING_CACHE.set(title_key, search_result)
+    if not TITLE_MAPPING_DB_ENABLED:
+        return
+    try:
+        await save_object(await set_toramp_title(title_key, search_result))
+    except Exception as e:
+        logger.warning("Writing toramp title %r to database failed: %r", title_key, e)
+
+
+async def _delete_title_mapping(title_key: str) -> None:
+    TITLE_MAPPING_CACHE.delete(title_key)
+    if not TITLE_MAPPING_DB_ENABLED:
+        return
+    try:
+        await delete_toramp_title(title_key)
+    except Exception as e:
+        logger.warning(
+            "Deleting toramp title %r from database failed: %r", title_key, e
+        )
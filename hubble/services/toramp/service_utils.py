@@ -1,4 +1,11 @@
+from datetime import timedelta
+
+from hubble.cache import TTLCache
+from hubble.singleflight import SingleFlight
+
+
 SEARCH_URL = "https://www.toramp.com/search_all.php"
+SERIES_URL_TEMPLATE = "https://www.toramp.com/series.php?id={}"
 
 
 HEADERS = {
@@ -20,3 +27,22 @@ HEADERS = {
     ),
     "x-kl-saas-ajax-request": "Ajax_Request",
 }
+
+
+# CONCURRENT IDENTICAL REQUESTS ARE COALESCED INTO ONE UPSTREAM CALL
+INFLIGHT_REQUESTS = SingleFlight()
+
+# TITLE -> SERIES PAGE MAPPING: REPEAT LOOKUPS SKIP THE SEARCH REQUEST
+TITLE_MAPPING_DB_ENABLED = True
+TITLE_MAPPING_DB_TTL = timedelta(days=30)
+# IN-MEMORY FRONT OF THE MAPPING (TTL IN SECONDS)
+TITLE_MAPPING_CACHE_MAXSIZE = 4096
+TITLE_MAPPING_CACHE_TTL = 24 * 60 * 60
+TITLE_MAPPING_CACHE = TTLCache(
+    maxsize=TITLE_MAPPING_CACHE_MAXSIZE, ttl=TITLE_MAPPING_CACHE_TTL
+)
+
+# BATCH get_series_dates: MAX ITEMS IN ONE BATCH AND MAX CONCURRENT CALLS
+# (REQUESTS ARE ALSO LIMITED BY rate_limit OF THE "toramp" HTTP CLIENT)
+SERIES_DATES_BATCH_MAX_SIZE = 500
+SERIES_DATES_BATCH_CONCURRENCY = 8
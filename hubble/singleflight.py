@@ -0,0 +1,94 @@
+import asyncio
+import inspect
+import functools
+from typing import Any, Awaitable, Callable, Hashable
+
+from hubble.cache import bind_arguments, make_cache_key
+
+
+class SingleFlight:
+    """
+    Объединение одновременных одинаковых запросов: пока запрос с ключом key
+    выполняется, остальные вызовы с тем же ключом ожидают его результат,
+    не обращаясь к стороннему API повторно.
+
+    Запрос выполняется в отдельной задаче, поэтому отмена вызвавшего его
+    обработчика не отменяет запрос для остальных ожидающих. Задача
+    отменяется, только если отменены все ожидающие её вызовы.
+    """
+
+    def __init__(self) -> None:
+        self._inflight: dict[Hashable, list] = {}
+
+        # COUNTERS
+        self.calls = 0
+        self.coalesced = 0
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+    async def do(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        self.calls += 1
+
+        entry = self._inflight.get(key)
+        if entry is None:
+            task = asyncio.ensure_future(factory())
+            entry = [task, 0]
+            self._inflight[key] = entry
+            task.add_done_callback(functools.partial(self._forget, key, entry))
+        else:
+            self.coalesced += 1
+
+        task = entry[0]
+        entry[1] += 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            # LAST WAITER CANCELLED: NOBODY NEEDS THE RESULT ANYMORE
+            if entry[1] == 1 and not task.done():
+                task.cancel()
+            raise
+        finally:
+            entry[1] -= 1
+
+    def _forget(self, key: Hashable, entry: list, task: asyncio.Future) -> None:
+        if self._inflight.get(key) is entry:
+            del self._inflight[key]
+        # MARK EXCEPTION AS RETRIEVED IF ALL WAITERS WERE CANCELLED
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> dict:
+        return {
+            "inflight": len(self._inflight),
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+        }
+
+
+def coalesced(group: SingleFlight) -> Callable:
+    """
+    Декоратор для объединения одновременных вызовов асинхронного геттера
+    с одинаковыми (нормализованными) аргументами в один запрос.
+    Вызовы с debug=True выполняются независимо.
+
+    Parameters:
+        group (SingleFlight): Группа, в которой отслеживаются выполняемые запросы.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            arguments = bind_arguments(signature, args, kwargs)
+            if arguments.get("debug"):
+                return await func(*args, **kwargs)
+
+            key = make_cache_key(func.__name__, arguments)
+            return await group.do(key, lambda: func(*args, **kwargs))
+
+        wrapper.group = group
+        return wrapper
+
+    return decorator
@@ -1,6 +1,179 @@
 import re
 import html
-from typing import Any
+from typing import Any, Callable
+
+
+class NestedPath:
+    """
+    Предварительно разобранный путь формата "key1.key2.key3" для get_nested.
+
+    Строка пути разбивается на шаги один раз при создании объекта: для каждого
+    шага заранее определяется, является ли он индексом списка ("0" или "[0]").
+    Для коротких путей только по ключам словарей (самый частый случай в
+    парсерах) создаётся специализированная функция обхода без цикла.
+    Семантика обхода полностью совпадает с get_nested, включая пропуск списков
+    (a.b.c вместо a.b.0.c для {a: {b: [c]}}) и флаг required.
+    """
+
+    __slots__ = ("path", "keys", "indexes", "get")
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.keys = tuple(path.split("."))
+        self.indexes = tuple(self._compile_index(key) for key in self.keys)
+        self.get = self._specialize()
+
+    def __repr__(self) -> str:
+        return f"NestedPath({self.path!r})"
+
+    @staticmethod
+    def _compile_index(key: str) -> int | str | None:
+        """
+        Индекс списка для шага пути: "0" и "[0]" дают 0, остальные ключи - None.
+        Если индекс не приводится к int, сохраняется строка, чтобы int() бросил
+        ту же ошибку в момент обхода, что и исходный get_nested.
+        """
+
+        if key.isdigit():
+            index = key
+        elif ("[" in key) and ("]" in key):
+            index = key[key.find("[") + 1 : key.find("]")]
+        else:
+            return None
+
+        try:
+            return int(index)
+        except ValueError:
+            return index
+
+    def _specialize(self) -> Callable[..., Any]:
+        """
+        Быстрые функции обхода для путей из 1-3 ключей без индексов.
+        Всё, что выходит за рамки обхода словарей (списки, другие типы,
+        required или нестандартный default), обрабатывается общим _get.
+        """
+
+        walk = self._get
+        if any(index is not None for index in self.indexes):
+            return walk
+
+        if len(self.keys) == 1:
+            (k0,) = self.keys
+
+            def get_1(data: Any, required: bool = False, default: Any = None) -> Any:
+                if type(data) is dict:
+                    value = data.get(k0, default)
+                    if value is default and required:
+                        raise KeyError(f"Required key '{k0}' not found in the data.")
+                    return value
+                return walk(data, required, default)
+
+            return get_1
+
+        if len(self.keys) == 2:
+            k0, k1 = self.keys
+
+            def get_2(data: Any, required: bool = False, default: Any = None) -> Any:
+                if type(data) is dict and default is None and not required:
+                    value = data.get(k0)
+                    if type(value) is dict:
+                        return value.get(k1)
+                    if value is None:
+                        return None
+                return walk(data, required, default)
+
+            return get_2
+
+        if len(self.keys) == 3:
+            k0, k1, k2 = self.keys
+
+            def get_3(data: Any, required: bool = False, default: Any = None) -> Any:
+                if type(data) is dict and default is None and not required:
+                    value = data.get(k0)
+                    if type(value) is dict:
+                        value = value.get(k1)
+                        if type(value) is dict:
+                            return value.get(k2)
+                    if value is None:
+                        return None
+                return walk(data, required, default)
+
+            return get_3
+
+        return walk
+
+    def _get(self, data: Any, required: bool = False, default: Any = None) -> Any:
+        step = 0
+        for key in self.keys:
+
+            # DICT PROCESSING
+            if isinstance(data, dict):
+                data = data.get(key, default)
+                if data is default and required:
+                    raise KeyError(f"Required key '{key}' not found in the data.")
+
+            # LIST PROCESSING
+            elif isinstance(data, list):
+                index = self.indexes[step]
+
+                # INDEX PROCESSING ("0" OR "[0]")
+                if index is not None:
+                    if isinstance(index, str):
+                        index = int(index)
+                    if index < len(data):
+                        data = data[index]
+                    else:
+                        data = default
+                        if required:
+                            raise KeyError(
+                                f"Required index {index} not found in the list."
+                            )
+
+                # LIST SKIPPING PROCESSING
+                # (like a.b.c instead of a.b.0.c into {a: {b: [c]}})
+                else:
+                    temp_list = []
+                    for item in data:
+                        if isinstance(item, dict) and key in item:
+                            temp_list.append(item[key])
+                    data = temp_list if temp_list else default
+                    data = data[0] if len(data) == 1 else data
+
+            # OTHER TYPES UNSUPPORTED
+            else:
+                if required:
+                    raise KeyError(f"Required key '{key}' not found in the data.")
+                return default
+
+            step += 1
+
+        return data
+
+
+# PATHS ARE MOSTLY LITERALS FROM PARSERS, THE LIMIT ONLY GUARDS AGAINST
+# UNBOUNDED GROWTH WHEN PATHS ARE BUILT FROM REQUEST DATA
+COMPILED_PATHS_MAXSIZE = 4096
+_compiled_paths: dict[str, NestedPath] = {}
+
+
+def compile_path(keys: str) -> NestedPath:
+    """
+    Функция для получения скомпилированного пути формата "key1.key2.key3".
+    Результат кэшируется, поэтому каждая строка пути разбирается один раз.
+
+    Parameters:
+        keys (str): Ключ вложенного словаря в формате "key1.key2.key3".
+
+    Returns:
+        NestedPath: Скомпилированный путь, значение получается через .get(data).
+    """
+
+    path = _compiled_paths.get(keys)
+    if path is None:
+        if len(_compiled_paths) >= COMPILED_PATHS_MAXSIZE:
+            _compiled_paths.clear()
+        path = _compiled_paths[keys] = NestedPath(keys)
+    return path
 
 
 def get_nested(
@@ -13,66 +186,17 @@ def get_nested(
     Parameters:
         data (dict): Словарь, в котором ищется значение.
         keys (str): Ключ вложенного словаря в формате "key1.key2.key3".
-        required (bool): Флаг, указывающий на необходимость наличия значения вложенного словаря.
+        required (bool): Флаг, указывающий на необходимость наличия значения вложенного словаря.
         default (any): Значение, которое будет возвращено в случае отсутствия значения вложенного словаря.
 
     Returns:
-        any: Значение, найденное вложенным словаре.
+        any: Значение, найденное вложенным словаре.
     """
 
-    keys = keys.split(".")
-
-    for key in keys:
-
-        # DICT PROCESSING
-        if isinstance(data, dict):
-            data = data.get(key, default)
-            if data is default and required:
-                raise KeyError(f"Required key '{key}' not found in the data.")
-
-        # LIST PROCESSING
-        elif isinstance(data, list):
-
-            # CURRENT INDEX PROCESSING
-            if key.isdigit():
-                index = int(key)
-                if index < len(data):
-                    data = data[index]
-                else:
-                    data = default
-                    if required:
-                        raise KeyError(f"Required index {index} not found in the list.")
-
-            # INDEX IN BRACKETS FORMAT PROCESSING
-            elif ("[" in key) and ("]" in key):
-                i1 = key.find("[") + 1
-                i2 = key.find("]")
-                key = int(key[i1:i2])
-
-                if key < len(data):
-                    data = data[key]
-                else:
-                    data = default
-                    if required:
-                        raise KeyError(f"Required index {key} not found in the list.")
-
-            # LIST SKIPPING PROCESSING
-            # (like a.b.c instead of a.b.0.c into {a: {b: [c]}})
-            else:
-                temp_list = []
-                for item in data:
-                    if isinstance(item, dict) and key in item:
-                        temp_list.append(item[key])
-                data = temp_list if temp_list else default
-                data = data[0] if len(data) == 1 else data
-
-        # OTHER TYPES UNSUPPORTED
-        else:
-            if required:
-                raise KeyError(f"Required key '{key}' not found in the data.")
-            return default
-
-    return data
+    path = _compiled_paths.get(keys)
+    if path is None:
+        path = compile_path(keys)
+    return path.get(data, required, default)
 
 
 def remove_html_tags(text: str) -> str:
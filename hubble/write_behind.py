@@ -0,0 +1,182 @@
+import time
+import asyncio
+import logging
+import itertools
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable
+
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBehindQueue:
+    """
+    Очередь отложенной записи: put() только кладёт элемент в очередь и сразу
+    возвращается, а фоновая задача забирает элементы пачками (до batch_size)
+    и передаёт каждую пачку в persist одним вызовом.
+
+    Очередь ограничена maxsize элементами:
+        - элемент с тем же ключом (key), что и ожидающий записи, заменяет его
+          (сохраняется только последняя версия данных);
+        - если очередь заполнена, самый старый элемент отбрасывается.
+
+    Если запись пачки завершилась ошибкой, элементы пачки записываются
+    по одному, чтобы один некорректный элемент не терял остальные.
+    """
+
+    def __init__(
+        self,
+        persist: Callable[[list], Awaitable[Any]],
+        maxsize: int = 1000,
+        batch_size: int = 50,
+        flush_interval: float = 0.5,
+        key: Callable[[Any], Hashable | None] | None = None,
+    ) -> None:
+        if maxsize < 1 or batch_size < 1:
+            raise ValueError("maxsize and batch_size must be at least 1")
+        self.persist = persist
+        self.maxsize = maxsize
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.key = key
+        # PENDING ITEMS IN ENQUEUE ORDER: {key: (item, enqueue time)}
+        self._pending: OrderedDict[Hashable, tuple[Any, float]] = OrderedDict()
+        self._unkeyed = itertools.count()
+        self._inflight = 0
+        self._worker: asyncio.Task | None = None
+        self._wakeup = asyncio.Event()
+        self._lock = asyncio.Lock()
+
+        # COUNTERS
+        self.enqueued = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.persisted = 0
+        self.failed = 0
+        self.batches = 0
+        self.last_batch_lag = 0.0
+        self.max_batch_lag = 0.0
+
+    def put(self, item: Any) -> None:
+        key = self.key(item) if self.key is not None else None
+        if key is None:
+            key = (WriteBehindQueue, next(self._unkeyed))
+
+        self.enqueued += 1
+        if key in self._pending:
+            # NEWER VERSION REPLACES THE PENDING ONE, BUT KEEPS ITS PLACE AND AGE
+            self._pending[key] = (item, self._pending[key][1])
+            self.coalesced += 1
+        else:
+            if len(self._pending) >= self.maxsize:
+                self._pending.popitem(last=False)
+                self.dropped += 1
+            self._pending[key] = (item, time.monotonic())
+
+        self._ensure_worker()
+        self._wakeup.set()
+
+    async def flush(self) -> None:
+        """
+        Записывает все ожидающие элементы, не дожидаясь фоновой задачи.
+        """
+
+        while self._pending or self._lock.locked():
+            async with self._lock:
+                await self._persist_batch()
+
+    async def close(self) -> None:
+        """
+        Записывает оставшиеся элементы и останавливает фоновую задачу.
+        """
+
+        await self.flush()
+        # THE WORKER IS IDLE NOW: NO BATCH IS INTERRUPTED BY THE CANCELLATION
+        worker, self._worker = self._worker, None
+        if (
+            worker is not None
+            and not worker.done()
+            and worker.get_loop() is asyncio.get_running_loop()
+        ):
+            worker.cancel()
+            try:
+                await worker
+            except asyncio.CancelledError:
+                pass
+
+    def _ensure_worker(self) -> None:
+        loop = asyncio.get_running_loop()
+        worker = self._worker
+        if worker is not None and not worker.done() and worker.get_loop() is loop:
+            return
+        # SYNCHRONIZATION PRIMITIVES ARE BOUND TO THE LOOP OF THE NEW WORKER
+        self._wakeup = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._worker = loop.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            if len(self._pending) < self.batch_size and self.flush_interval > 0:
+                # LET THE BATCH FILL UP
+                await asyncio.sleep(self.flush_interval)
+            async with self._lock:
+                await self._persist_batch()
+            if not self._pending:
+                self._wakeup.clear()
+
+    async def _persist_batch(self) -> None:
+        size = min(self.batch_size, len(self._pending))
+        if not size:
+            return
+        batch = [self._pending.popitem(last=False)[1] for _ in range(size)]
+        items = [item for item, _ in batch]
+
+        self._inflight = size
+        try:
+            await self.persist(items)
+            self.persisted += size
+        except Exception as e:
+            logger.warning("Writing batch of %s items failed: %r", size, e)
+            if size == 1:
+                self.failed += 1
+            else:
+                for item in items:
+                    try:
+                        await self.persist([item])
+                        self.persisted += 1
+                    except Exception as e:
+                        logger.warning("Writing item failed: %r", e)
+                        self.failed += 1
+        finally:
+            self._inflight = 0
+
+        self.batches += 1
+        self.last_batch_lag = time.monotonic() - batch[0][1]
+        self.max_batch_lag = max(self.max_batch_lag, self.last_batch_lag)
+
+    def lag(self) -> float:
+        """
+        Возраст (в секундах) самого старого элемента, ожидающего записи.
+        """
+
+        if not self._pending:
+            return 0.0
+        _, enqueued_at = next(iter(self._pending.values()))
+        return time.monotonic() - enqueued_at
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._pending),
+            "maxsize": self.maxsize,
+            "inflight": self._inflight,
+            "lag": round(self.lag(), 3),
+            "enqueued": self.enqueued,
+            "coalesced": self.coalesced,
+            "dropped": self.dropped,
+            "persisted": self.persisted,
+            "failed": self.failed,
+            "batches": self.batches,
+            "last_batch_lag": round(self.last_batch_lag, 3),
+            "max_batch_lag": round(self.max_batch_lag, 3),
+        }
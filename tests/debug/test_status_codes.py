@@ -4,6 +4,7 @@ from app import app
 from unittest.mock import AsyncMock, patch
 from litestar.testing import AsyncTestClient
 from litestar.exceptions import HTTPException
+from hubble.services.kinopoisk.models import to_model
 
 
 class TestAPIDebug(unittest.TestCase):
@@ -128,6 +129,27 @@ class TestAPIDebug(unittest.TestCase):
         self.run_async(async_test())
 
     # Тесты для /similars
+    def test_info_batch_handler_success_debug(self):
+        async def async_test():
+            async def fake_get_info(content_type, id, debug=False):
+                return to_model(
+                    {"id": id, "title_russian": "Фильм", "typename": "film"}
+                )
+
+            async with AsyncTestClient(app=app) as client:
+                with patch(
+                    "hubble.services.kinopoisk.getters.get_info", new=fake_get_info
+                ):
+                    response = await client.post(
+                        "/info/batch",
+                        json={"items": [{"content_type": "film", "id": 1}]},
+                    )
+                    self.assertEqual(response.status_code, 200)
+                    self.assertIn("text/html", response.headers["content-type"])
+                    self.assertIn("Фильм", response.text)
+
+        self.run_async(async_test())
+
     def test_similars_handler_success_debug(self):
         async def async_test():
             async with AsyncTestClient(app=app) as client:
@@ -253,11 +275,33 @@ class TestAPIDebug(unittest.TestCase):
         self.run_async(async_test())
 
     # Тесты для /series_dates
+    def test_card_handler_success_debug(self):
+        async def async_test():
+            getters = "hubble.services.kinopoisk.getters"
+            film = to_model({"id": 1, "title_russian": "Фильм", "typename": "film"})
+            similar = to_model(
+                {"id": 2, "title_russian": "Похожий", "typename": "film"}
+            )
+            sections = {
+                "get_info": AsyncMock(return_value=film),
+                "get_similars": AsyncMock(return_value=[similar]),
+                "get_trivias": AsyncMock(return_value=[]),
+                "get_media_posts": AsyncMock(return_value=[]),
+            }
+            async with AsyncTestClient(app=app) as client:
+                with patch.multiple(getters, **sections):
+                    response = await client.get("/card?content_type=film&id=1")
+                    self.assertEqual(response.status_code, 200)
+                    self.assertIn("text/html", response.headers["content-type"])
+                    self.assertIn("Похожий", response.text)
+
+        self.run_async(async_test())
+
     def test_series_dates_handler_success_debug(self):
         async def async_test():
             async with AsyncTestClient(app=app) as client:
                 with patch(
-                    "hubble.services.toramp.get_series_dates", new_callable=AsyncMock
+                    "app.get_series_dates", new_callable=AsyncMock
                 ) as mock_dates:
                     with patch(
                         "app.render_viewer_debug_page", return_value="debug_template"
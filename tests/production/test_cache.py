@@ -0,0 +1,170 @@
+import asyncio
+import unittest
+from unittest.mock import patch
+
+from hubble.cache import TTLCache, cached, normalize_cache_arg, make_cache_key
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+class TestTTLCache(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = patch("hubble.cache.time", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_lru_eviction_at_maxsize(self):
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        # "a" BECOMES THE MOST RECENTLY USED, "b" IS EVICTED
+        self.assertEqual(cache.get("a"), 1)
+        cache.set("c", 3)
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(cache.get("c"), 3)
+        self.assertEqual(cache.evictions, 1)
+
+    def test_ttl_expiry(self):
+        cache = TTLCache(ttl=60)
+        cache.set("default", 1)
+        cache.set("short", 2, ttl=10)
+        self.clock.now += 10
+        self.assertNotIn("short", cache)
+        self.assertIsNone(cache.get("short"))
+        self.assertEqual(cache.get("default"), 1)
+        self.clock.now += 50
+        self.assertEqual(cache.get("default", "missing"), "missing")
+        self.assertEqual(cache.expirations, 2)
+        self.assertEqual(len(cache), 0)
+
+    def test_lookup_staleness(self):
+        cache = TTLCache(ttl=60)
+        cache.set("key", "value", ttl=10, stale_ttl=20)
+        self.assertEqual(cache.lookup("key"), ("value", False))
+        self.clock.now += 15
+        self.assertEqual(cache.lookup("key"), ("value", True))
+        # STALE ENTRIES ARE NOT RETURNED BY get()
+        self.assertIsNone(cache.get("key"))
+        self.clock.now += 15
+        self.assertEqual(cache.lookup("key"), (None, False))
+        self.assertEqual(len(cache), 0)
+
+    def test_delete(self):
+        cache = TTLCache()
+        cache.set("key", "value")
+        cache.delete("key")
+        cache.delete("missing")
+        self.assertIsNone(cache.get("key"))
+        self.assertEqual(len(cache), 0)
+
+    def test_counters(self):
+        cache = TTLCache(ttl=10)
+        cache.set("key", "value", stale_ttl=10)
+        cache.get("key")
+        cache.get("missing")
+        self.clock.now += 15
+        cache.lookup("key")
+        self.assertEqual(
+            {
+                name: value
+                for name, value in cache.stats().items()
+                if name in ("size", "hits", "stale_hits", "misses")
+            },
+            {"size": 1, "hits": 1, "stale_hits": 1, "misses": 1},
+        )
+
+
+class TestCachedStaleWhileRevalidate(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.get_event_loop()
+        self.clock = FakeClock()
+        patcher = patch("hubble.cache.time", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def run_async(self, coro):
+        return self.loop.run_until_complete(coro)
+
+    def test_stale_entry_is_served_and_refreshed_once(self):
+        async def async_test():
+            cache = TTLCache()
+            calls = []
+            release = asyncio.Event()
+
+            @cached(cache, ttl=10, stale_ttl=60)
+            async def getter(query: str, debug: bool = False):
+                calls.append(query)
+                if len(calls) > 1:
+                    await release.wait()
+                return {"version": len(calls)}
+
+            self.assertEqual(await getter("avatar"), {"version": 1})
+            self.clock.now += 15
+
+            # STALE VALUE IS RETURNED AT ONCE, ONE REFRESH RUNS FOR THE KEY
+            results = await asyncio.gather(*(getter("avatar") for _ in range(3)))
+            self.assertEqual(results, [{"version": 1}] * 3)
+            self.assertEqual(cache.stats()["refreshing"], 1)
+
+            release.set()
+            await asyncio.sleep(0.01)
+            self.assertEqual(len(calls), 2)
+            self.assertEqual(cache.refreshes, 1)
+            self.assertEqual(await getter("avatar"), {"version": 2})
+
+        self.run_async(async_test())
+
+    def test_failed_refresh_keeps_stale_value(self):
+        async def async_test():
+            cache = TTLCache()
+            calls = []
+
+            @cached(cache, ttl=10, stale_ttl=60)
+            async def getter(query: str, debug: bool = False):
+                calls.append(query)
+                if len(calls) > 1:
+                    raise OSError("upstream is down")
+                return {"version": 1}
+
+            await getter("avatar")
+            self.clock.now += 15
+            self.assertEqual(await getter("avatar"), {"version": 1})
+            await asyncio.sleep(0.01)
+
+            self.assertEqual(len(calls), 2)
+            self.assertEqual(cache.stats()["refreshing"], 0)
+            self.assertEqual(await getter("avatar"), {"version": 1})
+
+        self.run_async(async_test())
+
+
+class TestCacheKey(unittest.TestCase):
+    def test_normalize_cache_arg(self):
+        self.assertEqual(normalize_cache_arg("  Ведьмак   ЁЛКИ "), "ведьмак ёлки")
+        self.assertEqual(normalize_cache_arg("STRASSE"), normalize_cache_arg("straße"))
+        self.assertEqual(normalize_cache_arg(["A", ("B",)]), ("a", ("b",)))
+        self.assertEqual(
+            normalize_cache_arg({"b": "X", "a": 1}), (("a", 1), ("b", "x"))
+        )
+        self.assertEqual(normalize_cache_arg(42), 42)
+
+    def test_make_cache_key_excludes_debug(self):
+        key = make_cache_key("get_search", {"query": "Avatar", "debug": False})
+        self.assertEqual(key, ("get_search", (("query", "avatar"),)))
+        self.assertEqual(
+            key, make_cache_key("get_search", {"query": " avatar ", "debug": True})
+        )
+        self.assertNotEqual(key, make_cache_key("get_info", {"query": "avatar"}))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+import os
+import asyncio
+import tempfile
+import unittest
+from sqlalchemy import text
+
+from database.db import DATABASE_PROFILES, create_db_engine
+
+
+# ЗНАЧЕНИЯ, КОТОРЫЕ SQLITE ВОЗВРАЩАЕТ ДЛЯ PRAGMA ПРОФИЛЯ "tuned"
+TUNED_PRAGMAS = {
+    "journal_mode": "wal",
+    # 1 = NORMAL
+    "synchronous": 1,
+    "mmap_size": 256 * 1024 * 1024,
+    "cache_size": -64 * 1024,
+    "busy_timeout": 5000,
+    # 2 = MEMORY
+    "temp_store": 2,
+}
+
+
+class TestDatabaseProfiles(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.get_event_loop()
+        self.path = os.path.join(tempfile.mkdtemp(), "test.db")
+
+    def run_async(self, coro):
+        return self.loop.run_until_complete(coro)
+
+    async def read_pragmas(self, profile: str, connections: int = 1) -> list[dict]:
+        engine = create_db_engine(f"sqlite+aiosqlite:///{self.path}", profile)
+        try:
+            # SEVERAL CONNECTIONS ARE OPENED AT ONCE: EACH ONE IS CONFIGURED
+            conns = [await engine.connect() for _ in range(connections)]
+            results = []
+            for conn in conns:
+                results.append(
+                    {
+                        name: (await conn.execute(text(f"PRAGMA {name}"))).scalar()
+                        for name in TUNED_PRAGMAS
+                    }
+                )
+                await conn.close()
+            return results
+        finally:
+            await engine.dispose()
+
+    def test_tuned_pragmas_are_applied_on_connect(self):
+        self.assertEqual(set(DATABASE_PROFILES["tuned"]["pragmas"]), set(TUNED_PRAGMAS))
+        for pragmas in self.run_async(self.read_pragmas("tuned", connections=2)):
+            self.assertEqual(pragmas, TUNED_PRAGMAS)
+
+    def test_default_profile_keeps_sqlite_defaults(self):
+        (pragmas,) = self.run_async(self.read_pragmas("default"))
+        self.assertEqual(pragmas["journal_mode"], "delete")
+        # 2 = FULL
+        self.assertEqual(pragmas["synchronous"], 2)
+        self.assertEqual(pragmas["temp_store"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
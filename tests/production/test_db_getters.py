@@ -0,0 +1,170 @@
+import os
+import asyncio
+import tempfile
+import unittest
+from sqlalchemy import event, select
+from sqlalchemy.orm import selectinload
+
+from database.db import AsyncSessionLocal, Base, create_db_engine
+from database.models import TvSeries, Season, Episode
+from database.requests import getters
+from database.requests.setters import set_data_to_db_items
+
+
+# КОЛИЧЕСТВО ЗАПРОСОВ НА ЧТЕНИЕ ОБЪЕКТА НЕ ЗАВИСИТ ОТ РАЗМЕРА ЕГО ГРАФА
+EXPECTED_QUERIES = {
+    # FILM, GENRES, COUNTRIES, 3 x (CAST, ROLES OF THE CAST)
+    "film": 9,
+    # AS FILM + 2 x (SEQUELS / PREQUELS, THEIR GENRES, THEIR COUNTRIES)
+    "tvseries": 15,
+    # PERSON, ROLES, 2 x (MOVIES, THEIR GENRES, THEIR COUNTRIES)
+    "person": 8,
+    "trivias": 1,
+    # SEASONS, EPISODES
+    "seasons": 2,
+    "episode": 1,
+}
+
+
+def make_person(person_id: int) -> dict:
+    return {
+        "id": person_id,
+        "name": f"Имя {person_id}",
+        "roles": ["Актёр", "Режиссёр"],
+        "typename": "person",
+    }
+
+
+def make_movie(typename: str, movie_id: int, cast_size: int = 0) -> dict:
+    movie_data = {
+        "id": movie_id,
+        "title_russian": f"Название {movie_id}",
+        "genres": [
+            {"id": 1, "name": "драма", "slug": "drama", "typename": "genre"},
+            {"id": 2, "name": "комедия", "slug": "comedy", "typename": "genre"},
+        ],
+        "countries": [{"id": 1, "name": "США", "typename": "country"}],
+        "typename": typename,
+    }
+    if cast_size:
+        movie_data["actors"] = [make_person(100 + i) for i in range(cast_size)]
+        movie_data["directors"] = [make_person(1)]
+        movie_data["voice_over_actors"] = [make_person(2)]
+    return movie_data
+
+
+def make_trivia(trivia_id: int) -> dict:
+    return {
+        "id": trivia_id,
+        "is_spoiler": trivia_id == 1,
+        "text": f"Факт {trivia_id}",
+        "trivia_type": "fact",
+        "typename": "trivia",
+    }
+
+
+class TestDatabaseGetters(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.get_event_loop()
+        self.bind = AsyncSessionLocal.kw["bind"]
+        path = os.path.join(tempfile.mkdtemp(), "test.db")
+        self.engine = create_db_engine(f"sqlite+aiosqlite:///{path}", "tuned")
+        AsyncSessionLocal.configure(bind=self.engine)
+        self.queries = 0
+
+        @event.listens_for(self.engine.sync_engine, "before_cursor_execute")
+        def count_query(*args):
+            self.queries += 1
+
+        self.run_async(self.create_data())
+
+    def tearDown(self):
+        AsyncSessionLocal.configure(bind=self.bind)
+        self.run_async(self.engine.dispose())
+
+    def run_async(self, coro):
+        return self.loop.run_until_complete(coro)
+
+    async def create_data(self):
+        async with self.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        # SMALL AND LARGE GRAPHS MUST BE READ IN THE SAME NUMBER OF QUERIES
+        for movie_id, cast_size in ((1, 1), (2, 20)):
+            await set_data_to_db_items(make_movie("film", movie_id, cast_size))
+            tvseries_data = make_movie("tvseries", movie_id, cast_size)
+            tvseries_data["sequels"] = [
+                make_movie("tvseries", 10 * movie_id + i) for i in range(cast_size)
+            ]
+            tvseries_data["prequels"] = [make_movie("tvseries", 100 + movie_id)]
+            await set_data_to_db_items(tvseries_data)
+
+        await set_data_to_db_items(
+            {
+                "content_type": "film",
+                "id": 2,
+                "trivias": [make_trivia(i) for i in range(3)],
+                "typename": "movie_trivias",
+            }
+        )
+
+        # SEASONS ARE NOT WRITTEN BY THE SETTERS
+        async with AsyncSessionLocal() as session:
+            tvseries = await session.scalar(
+                select(TvSeries)
+                .where(TvSeries.kinopoisk_id == 2)
+                .options(selectinload(TvSeries.seasons))
+            )
+            tvseries.seasons = [
+                Season(
+                    season_number=season_number,
+                    episodes=[Episode(episode_number=i) for i in range(10, 0, -1)],
+                )
+                for season_number in (3, 1, 2)
+            ]
+            await session.commit()
+
+    def count_queries(self, coro):
+        self.queries = 0
+        result = self.run_async(coro)
+        return result, self.queries
+
+    def test_film_query_count(self):
+        for film_id in (1, 2):
+            film, queries = self.count_queries(getters.get_film(film_id))
+            self.assertEqual(queries, EXPECTED_QUERIES["film"])
+        self.assertEqual(len(film["actors"]), 20)
+        self.assertEqual(film["actors"][0]["roles"], ["Актёр", "Режиссёр"])
+
+    def test_tvseries_query_count(self):
+        for tvseries_id in (1, 2):
+            tvseries, queries = self.count_queries(getters.get_tvseries(tvseries_id))
+            self.assertEqual(queries, EXPECTED_QUERIES["tvseries"])
+        self.assertEqual(len(tvseries["sequels"]), 20)
+        self.assertEqual(tvseries["prequels"][0]["id"], 102)
+        self.assertEqual(len(tvseries["prequels"][0]["genres"]), 2)
+
+    def test_person_query_count(self):
+        person, queries = self.count_queries(getters.get_person(1))
+        self.assertEqual(queries, EXPECTED_QUERIES["person"])
+        self.assertEqual([film["id"] for film in person["best_films"]], [1, 2])
+        self.assertEqual([item["id"] for item in person["best_tvseries"]], [1, 2])
+
+    def test_trivias_seasons_episode_query_count(self):
+        trivias, queries = self.count_queries(getters.get_trivias("film", 2))
+        self.assertEqual(queries, EXPECTED_QUERIES["trivias"])
+        # SAME SHAPE AS parse_trivia_data
+        self.assertEqual(trivias, [make_trivia(i) for i in range(3)])
+        self.assertEqual(self.run_async(getters.get_trivias("tvseries", 2)), [])
+
+        seasons, queries = self.count_queries(getters.get_seasons(2))
+        self.assertEqual(queries, EXPECTED_QUERIES["seasons"])
+        self.assertEqual([season["season_number"] for season in seasons], [1, 2, 3])
+        self.assertEqual(seasons[0]["episodes"][0]["episode_number"], 1)
+
+        episode, queries = self.count_queries(getters.get_episode(2, 3, 5))
+        self.assertEqual(queries, EXPECTED_QUERIES["episode"])
+        self.assertEqual(episode["episode_number"], 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,191 @@
+import os
+import asyncio
+import tempfile
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+from sqlalchemy import func, select
+from sqlalchemy.orm import selectinload
+
+from database.db import AsyncSessionLocal, Base, create_db_engine
+from database.models import Film, Person, Trivia
+from database.models.relations import film_actors, genre_films, person_roles
+from database.requests.getters import get_trivias
+from database.requests.setters import set_data_to_db_batch, set_data_to_db_items
+from hubble.services.kinopoisk import getters as kinopoisk_getters
+from hubble.services.kinopoisk.service_utils import RESPONSE_CACHE
+
+
+FULL_FILM = {
+    "id": 1,
+    "title_russian": "Название",
+    "title_original": "Title",
+    "production_year": 2000,
+    "synopsis": "Описание",
+    "genres": [
+        {"id": 1, "name": "драма", "slug": "drama", "typename": "genre"},
+        {"id": 2, "name": "комедия", "slug": "comedy", "typename": "genre"},
+    ],
+    "actors": [
+        {"id": 100, "name": "Актёр", "roles": ["Актёр"], "typename": "person"},
+        {"id": 101, "name": "Актриса", "roles": ["Актёр"], "typename": "person"},
+    ],
+    "typename": "film",
+}
+
+# НЕПОЛНОЕ ПРЕДСТАВЛЕНИЕ ТОГО ЖЕ ФИЛЬМА: ДРУГИЕ СВЯЗИ И ПУСТЫЕ ПОЛЯ
+PARTIAL_FILM = {
+    "id": 1,
+    "title_russian": "Новое название",
+    "genres": [{"id": 2, "name": "комедия", "slug": "comedy", "typename": "genre"}],
+    "actors": [
+        {"id": 101, "roles": ["Режиссёр"], "typename": "person"},
+        {"id": 102, "name": "Новый актёр", "typename": "person"},
+    ],
+    "typename": "film",
+}
+
+
+def make_movie_trivias(content_type: str, movie_id: int, trivia_ids) -> dict:
+    return {
+        "content_type": content_type,
+        "id": movie_id,
+        "trivias": [
+            {
+                "id": trivia_id,
+                "is_spoiler": True,
+                "text": f"Факт {trivia_id}",
+                "trivia_type": "blooper",
+                "typename": "trivia",
+            }
+            for trivia_id in trivia_ids
+        ],
+        "typename": "movie_trivias",
+    }
+
+
+class TestDatabaseSetters(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.get_event_loop()
+        self.bind = AsyncSessionLocal.kw["bind"]
+        path = os.path.join(tempfile.mkdtemp(), "test.db")
+        self.engine = create_db_engine(f"sqlite+aiosqlite:///{path}", "tuned")
+        AsyncSessionLocal.configure(bind=self.engine)
+        self.run_async(self.create_tables())
+
+    def tearDown(self):
+        AsyncSessionLocal.configure(bind=self.bind)
+        self.run_async(self.engine.dispose())
+
+    def run_async(self, coro):
+        return self.loop.run_until_complete(coro)
+
+    async def create_tables(self):
+        async with self.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    async def read_film(self) -> Film:
+        async with AsyncSessionLocal() as session:
+            return await session.scalar(
+                select(Film)
+                .where(Film.kinopoisk_id == 1)
+                .options(
+                    selectinload(Film.genres),
+                    selectinload(Film.actors).selectinload(Person.roles),
+                )
+            )
+
+    async def count_rows(self, table) -> int:
+        async with AsyncSessionLocal() as session:
+            return await session.scalar(select(func.count()).select_from(table))
+
+    def check_upserted_film(self):
+        film = self.run_async(self.read_film())
+
+        self.assertEqual(film.title_russian, "Новое название")
+        # EMPTY VALUES DO NOT OVERWRITE THE STORED ONES
+        self.assertEqual(film.title_original, "Title")
+        self.assertEqual(film.production_year, 2000)
+        self.assertEqual(film.synopsis, "Описание")
+
+        # LINKS OF THE WRITTEN RELATIONSHIPS ARE REPLACED
+        self.assertEqual([genre.slug for genre in film.genres], ["comedy"])
+        actors = {actor.kinopoisk_id: actor for actor in film.actors}
+        self.assertEqual(set(actors), {101, 102})
+        self.assertEqual(actors[101].name, "Актриса")
+        self.assertEqual([role.name for role in actors[101].roles], ["Режиссёр"])
+        self.assertEqual(
+            {
+                table.name: self.run_async(self.count_rows(table))
+                for table in (film_actors, genre_films, person_roles)
+            },
+            # PERSON 100 IS NOT WRITTEN AGAIN AND KEEPS ITS ROLE
+            {"film_actors": 2, "genre_films": 1, "person_roles": 2},
+        )
+
+    def test_upsert_keeps_values_and_replaces_links(self):
+        self.run_async(set_data_to_db_items(FULL_FILM))
+        self.run_async(set_data_to_db_items(PARTIAL_FILM))
+        self.check_upserted_film()
+
+    def test_upsert_in_one_batch(self):
+        self.run_async(set_data_to_db_batch([FULL_FILM, PARTIAL_FILM]))
+        self.check_upserted_film()
+
+    def test_same_payload_does_not_duplicate_rows(self):
+        for _ in range(2):
+            self.run_async(set_data_to_db_items(FULL_FILM))
+        self.assertEqual(self.run_async(self.count_rows(Film.__table__)), 1)
+        self.assertEqual(self.run_async(self.count_rows(film_actors)), 2)
+        self.assertEqual(self.run_async(self.count_rows(genre_films)), 2)
+        self.assertEqual(self.run_async(self.count_rows(person_roles)), 2)
+
+    def test_trivias_are_linked_to_stored_movie(self):
+        self.run_async(set_data_to_db_items(FULL_FILM))
+        self.run_async(set_data_to_db_batch([make_movie_trivias("film", 1, (1, 2))]))
+
+        trivias = self.run_async(get_trivias("film", 1))
+        self.assertEqual([trivia["id"] for trivia in trivias], [1, 2])
+        self.assertEqual(trivias[0]["is_spoiler"], True)
+        self.assertEqual(trivias[0]["trivia_type"], "blooper")
+
+        # NEW LIST OF TRIVIAS REPLACES THE LINKED ONE
+        self.run_async(set_data_to_db_items(make_movie_trivias("film", 1, (2, 3))))
+        trivias = self.run_async(get_trivias("film", 1))
+        self.assertEqual([trivia["id"] for trivia in trivias], [2, 3])
+
+    def test_trivias_of_unknown_movie_do_not_create_it(self):
+        self.run_async(set_data_to_db_items(make_movie_trivias("tvseries", 5, (1,))))
+
+        self.assertEqual(self.run_async(self.count_rows(Trivia.__table__)), 1)
+        self.assertEqual(self.run_async(get_trivias("tvseries", 5)), [])
+        self.assertIsNone(self.run_async(self.read_film()))
+
+    def get_info(self, upstream: AsyncMock):
+        RESPONSE_CACHE.clear()
+        with patch.object(
+            kinopoisk_getters, "film_base_info_async", upstream
+        ), patch.object(kinopoisk_getters, "INFO_DB_CACHE_ENABLED", True):
+            return self.run_async(kinopoisk_getters.get_info("film", 1))
+
+    def test_partial_write_does_not_make_info_fresh(self):
+        self.addCleanup(RESPONSE_CACHE.clear)
+        upstream = AsyncMock(return_value=MagicMock(ok=False))
+
+        # SAME FILM AS AN ITEM OF /similars
+        self.run_async(set_data_to_db_batch([PARTIAL_FILM]))
+        self.assertIsNone(self.get_info(upstream))
+        self.assertEqual(upstream.await_count, 1)
+
+        # FULL /info DATA IS READ FROM THE DATABASE, A LATER PARTIAL WRITE
+        # DOES NOT RESET ITS FRESHNESS
+        self.run_async(
+            set_data_to_db_batch(
+                [{"movie": FULL_FILM, "typename": "movie_info"}, PARTIAL_FILM]
+            )
+        )
+        self.assertEqual(self.get_info(upstream).id, 1)
+        self.assertEqual(upstream.await_count, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import copy
+import unittest
+
+from hubble.services.kinopoisk.service_utils import MissingFieldError
+from hubble.services.kinopoisk.service_utils import filter_in_place, filter_recursive
+
+
+FIXTURES = [
+    {},
+    {"id": 1, "typename": "film", "title": "", "year": None, "rating": 0},
+    {
+        "id": 1,
+        "typename": "film",
+        "genres": [
+            {"id": 1, "typename": "genre", "slug": None},
+            {"name": None, "slug": ""},
+            "text",
+            0,
+        ],
+        "cover": {"image": {"url": None}, "size": {}},
+        "empty_list": [],
+        "false": False,
+    },
+    # CONTAINERS THAT BECOME EMPTY ARE REMOVED FROM THE LEAVES UP
+    {"a": {"b": {"c": {"d": None}}}, "e": [{"f": [{"g": ""}]}, {}]},
+    {"a": [[], [{}], [None]], "b": [{"c": [{}]}]},
+    {
+        "match": {"id": 2, "typename": "tvseries", "sequels": [{"actors": []}]},
+        "movies": [{"id": 3, "typename": "film", "genres": [{}, {"name": "драма"}]}],
+        "persons": [],
+    },
+    # TOP-LEVEL LIST ITEMS ARE NEVER REMOVED
+    [{"id": 1, "typename": "trivia", "text": None}, {"a": None}, {}, None, "text"],
+    [],
+]
+
+MISSING_FIELD_FIXTURES = [
+    {"id": None, "typename": "film"},
+    {"id": 1, "typename": ""},
+    {"movies": [{"id": 0, "typename": "film"}]},
+    {"match": {"cover": {"typename": None}}},
+    [{"id": 1, "typename": "film"}, {"nested": {"id": "", "typename": "person"}}],
+]
+
+
+class TestFilterInPlace(unittest.TestCase):
+    def test_matches_filter_recursive(self):
+        for data in FIXTURES:
+            with self.subTest(data=data):
+                expected = filter_recursive(copy.deepcopy(data))
+                filtered = copy.deepcopy(data)
+                self.assertEqual(filter_in_place(filtered), expected)
+                # DATA IS CHANGED IN PLACE
+                self.assertEqual(filtered, expected)
+
+    def test_fixture_that_empties_out_completely(self):
+        data = {"a": {"b": [{"c": None}, {}]}, "d": "", "e": [{}]}
+        self.assertEqual(filter_in_place(data), {})
+        self.assertIs(filter_in_place(data), data)
+
+    def test_missing_required_field(self):
+        for data in MISSING_FIELD_FIXTURES:
+            with self.subTest(data=data):
+                with self.assertRaises(MissingFieldError) as expected:
+                    filter_recursive(copy.deepcopy(data))
+                with self.assertRaises(MissingFieldError) as raised:
+                    filter_in_place(copy.deepcopy(data))
+                self.assertEqual(str(raised.exception), str(expected.exception))
+
+
+if __name__ == "__main__":
+    unittest.main()
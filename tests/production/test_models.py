@@ -0,0 +1,34 @@
+import unittest
+
+from hubble.services.kinopoisk.models import (
+    VALIDATION_FALLBACKS,
+    Film,
+    model_stats,
+    to_model,
+)
+
+
+class TestToModel(unittest.TestCase):
+    def setUp(self):
+        VALIDATION_FALLBACKS.clear()
+        self.addCleanup(VALIDATION_FALLBACKS.clear)
+
+    def test_matching_dict_is_converted(self):
+        model = to_model({"id": 1, "title_russian": "Фильм", "typename": "film"})
+
+        self.assertIsInstance(model, Film)
+        self.assertEqual(model_stats(), {"validation_fallbacks": {}})
+
+    def test_fallback_is_logged_and_counted(self):
+        data = {"id": 1, "unknown_field": 1, "typename": "film"}
+
+        for _ in range(2):
+            with self.assertLogs("hubble.services.kinopoisk.models", "WARNING"):
+                # DICT IS KEPT AS IS, SO THE JSON RESPONSE DOES NOT CHANGE
+                self.assertIs(to_model(data), data)
+
+        self.assertEqual(model_stats(), {"validation_fallbacks": {"film": 2}})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,198 @@
+import asyncio
+import threading
+import unittest
+from unittest.mock import patch
+
+from hubble.services.rutor import getters
+from hubble.services.rutor.parsers import parse_rutor_html
+from hubble.services.rutor.service_utils import SORT_CODES
+from hubble.services.rutor.service_utils import merge_results, sort_results
+from benchmarks.bench_rutor import legacy_parse_rutor_html
+from benchmarks.pages import make_rutor_row, rutor_page
+
+
+# СТРОКИ, КОТОРЫХ НЕТ В СГЕНЕРИРОВАННЫХ СТРАНИЦАХ
+EDGE_ROWS = [
+    # TWO LINKS: NO DOWNLOAD LINK, RELATIVE TORRENT URL
+    '<tr class="gai"><td>01 Янв 24</td><td><a href="magnet:?xt=urn:btih:ab">M</a>'
+    '<a href="/torrent/1/a">Название <b>1</b></a></td><td>1 GB</td>'
+    "<td>5 3</td></tr>",
+    # UPPER CASE TAGS AND ATTRIBUTES ON SEVERAL LINES
+    '<TR CLASS="tum" id="x">\n<TD>02 Янв 24</TD>\n<TD colspan="2">'
+    '<A class="downgif" HREF="/d/2">D</A><A HREF="magnet:?xt=urn:btih:cd">M</A>'
+    '<A HREF="/torrent/2/b">Title 2</A></TD>\n<TD>2&nbsp;GB</TD><TD>7</TD></TR>',
+    # NOT ENOUGH CELLS
+    '<tr class="gai"><td>03 Янв 24</td><td>Нет ссылок</td></tr>',
+    # NO LINKS AND NO PEERS
+    '<tr class="tum"><td>04 Янв 24</td><td>Название</td><td></td><td>-</td></tr>',
+    # OTHER ROW CLASS IS SKIPPED
+    '<tr class="backgr"><td>Добавлен</td><td>Название</td><td>Размер</td></tr>',
+]
+
+
+class TestParseRutorHtml(unittest.TestCase):
+    def test_matches_legacy_parser_on_generated_pages(self):
+        for rows in (0, 1, 20, 100):
+            with self.subTest(rows=rows):
+                html = rutor_page(rows)
+                results = parse_rutor_html(html)
+                self.assertEqual(len(results), rows)
+                self.assertEqual(results, legacy_parse_rutor_html(html))
+
+    def test_matches_legacy_parser_on_edge_rows(self):
+        for row in EDGE_ROWS:
+            for html in (row, f'<div id="index"><table>{row}</table></div>'):
+                with self.subTest(html=html):
+                    self.assertEqual(
+                        parse_rutor_html(html), legacy_parse_rutor_html(html)
+                    )
+
+    def test_rows_before_results_table_are_skipped(self):
+        html = make_rutor_row(1) + rutor_page(2)
+        self.assertEqual(len(parse_rutor_html(html)), 2)
+
+
+def make_result(
+    btih: str | None,
+    title: str,
+    date: str = "01 Янв 24",
+    size: str = "1 GB",
+    seeds: int = 0,
+    leechers: int = 0,
+) -> dict:
+    return {
+        "date": date,
+        "magnet": f"magnet:?xt=urn:btih:{btih}&dn=rutor.info" if btih else None,
+        "torrent": f"/torrent/{title}",
+        "title": title,
+        "size": size,
+        "seeds": seeds,
+        "leechers": leechers,
+    }
+
+
+SORT_FIXTURES = [
+    make_result("a1", "beta", "27 Окт 24", "700 MB", seeds=5, leechers=9),
+    make_result("a2", "Alpha", "01 Янв 25", "1.5 GB", seeds=12, leechers=1),
+    make_result("a3", "gamma", "03 Мар 23", "16.48 GB", seeds=0, leechers=4),
+    make_result("a4", "Delta", "15 Окт 24", "512 KB", seeds=5, leechers=0),
+]
+
+# ОЖИДАЕМЫЙ ПОРЯДОК НАЗВАНИЙ ДЛЯ КАЖДОГО СПОСОБА СОРТИРОВКИ
+SORTED_TITLES = {
+    "date_desc": ["Alpha", "beta", "Delta", "gamma"],
+    "date_asc": ["gamma", "Delta", "beta", "Alpha"],
+    # EQUAL KEYS KEEP THE INPUT ORDER
+    "seeds_desc": ["Alpha", "beta", "Delta", "gamma"],
+    "seeds_asc": ["gamma", "beta", "Delta", "Alpha"],
+    "leechers_desc": ["beta", "gamma", "Alpha", "Delta"],
+    "leechers_asc": ["Delta", "Alpha", "gamma", "beta"],
+    "title_desc": ["gamma", "Delta", "beta", "Alpha"],
+    "title_asc": ["Alpha", "beta", "Delta", "gamma"],
+    "size_desc": ["gamma", "Alpha", "beta", "Delta"],
+    "size_asc": ["Delta", "beta", "Alpha", "gamma"],
+    "relevance": ["beta", "Alpha", "gamma", "Delta"],
+}
+
+
+class TestMergeResults(unittest.TestCase):
+    def test_duplicates_across_pages_are_removed(self):
+        first_page = [make_result("ABC", "first"), make_result("def", "second")]
+        # RESULT HAS MOVED TO THE NEXT PAGE: SAME INFO-HASH IN OTHER CASE
+        second_page = [make_result("abc", "first moved"), make_result("123", "third")]
+
+        merged = merge_results([first_page, second_page], "relevance")
+
+        self.assertEqual(
+            [result["title"] for result in merged], ["first", "second", "third"]
+        )
+
+    def test_results_without_magnet_are_keyed_by_torrent(self):
+        pages = [
+            [make_result(None, "same"), make_result(None, "other")],
+            [make_result(None, "same")],
+        ]
+        self.assertEqual(len(merge_results(pages, "relevance")), 2)
+
+    def test_merged_results_are_sorted(self):
+        pages = [SORT_FIXTURES[:2], SORT_FIXTURES[2:] + SORT_FIXTURES[:1]]
+        merged = merge_results(pages, "size_asc")
+        self.assertEqual(
+            [result["title"] for result in merged], SORTED_TITLES["size_asc"]
+        )
+
+
+class TestSortResults(unittest.TestCase):
+    def test_sort_codes_order(self):
+        self.assertEqual(set(SORTED_TITLES), set(SORT_CODES))
+        for sort, code in SORT_CODES.items():
+            for value in (sort, sort.upper(), code):
+                with self.subTest(sort=value):
+                    results = sort_results(SORT_FIXTURES, value)
+                    self.assertEqual(
+                        [result["title"] for result in results], SORTED_TITLES[sort]
+                    )
+
+    def test_unknown_sort_is_date_desc(self):
+        for sort in (None, "unknown", 99):
+            with self.subTest(sort=sort):
+                results = sort_results(SORT_FIXTURES, sort)
+                self.assertEqual(
+                    [result["title"] for result in results], SORTED_TITLES["date_desc"]
+                )
+
+    def test_input_is_not_changed(self):
+        results = list(SORT_FIXTURES)
+        self.assertIsNot(sort_results(results, "relevance"), results)
+        sort_results(results, "title_asc")
+        self.assertEqual(results, SORT_FIXTURES)
+
+
+class PageResponse:
+    def __init__(self, text: str):
+        self._text = text
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    async def text(self):
+        return self._text
+
+
+class PagesSession:
+    def get(self, url, **kwargs):
+        return PageResponse(rutor_page(2))
+
+
+class TestGetRutorSearch(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.get_event_loop()
+
+    def test_pages_are_parsed_outside_event_loop(self):
+        parse_threads = []
+
+        def parse(html):
+            parse_threads.append(threading.get_ident())
+            return parse_rutor_html(html)
+
+        with patch.object(
+            getters, "get_http_session", lambda name: PagesSession()
+        ), patch.object(getters, "parse_rutor_html", parse):
+            results = self.loop.run_until_complete(
+                getters.get_rutor_search("query", pages=3)
+            )
+
+        # SAME TWO ROWS ON EVERY PAGE ARE MERGED
+        self.assertEqual(len(results), 2)
+        self.assertEqual(len(parse_threads), 3)
+        self.assertNotIn(threading.get_ident(), parse_threads)
+
+
+if __name__ == "__main__":
+    unittest.main()
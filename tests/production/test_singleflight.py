@@ -0,0 +1,97 @@
+import asyncio
+import unittest
+
+from hubble.singleflight import SingleFlight, coalesced
+
+
+class TestSingleFlight(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.get_event_loop()
+
+    def run_async(self, coro):
+        return self.loop.run_until_complete(coro)
+
+    def test_concurrent_calls_share_one_request(self):
+        async def async_test():
+            group = SingleFlight()
+            calls = []
+            release = asyncio.Event()
+
+            @coalesced(group)
+            async def getter(query: str, debug: bool = False):
+                calls.append(query)
+                await release.wait()
+                return {"query": query}
+
+            tasks = [
+                asyncio.ensure_future(getter(query))
+                for query in ("Avatar", "avatar", " AVATAR ")
+            ]
+            await asyncio.sleep(0)
+            release.set()
+            results = await asyncio.gather(*tasks)
+
+            self.assertEqual(calls, ["Avatar"])
+            self.assertEqual(results, [{"query": "Avatar"}] * 3)
+            self.assertEqual(group.stats(), {"inflight": 0, "calls": 3, "coalesced": 2})
+
+        self.run_async(async_test())
+
+    def test_cancelled_waiter_does_not_cancel_request(self):
+        async def async_test():
+            group = SingleFlight()
+            release = asyncio.Event()
+            cancelled = []
+
+            async def request():
+                try:
+                    await release.wait()
+                except asyncio.CancelledError:
+                    cancelled.append(True)
+                    raise
+                return "result"
+
+            first = asyncio.ensure_future(group.do("key", request))
+            second = asyncio.ensure_future(group.do("key", request))
+            await asyncio.sleep(0)
+
+            first.cancel()
+            await asyncio.sleep(0)
+            release.set()
+
+            self.assertEqual(await second, "result")
+            self.assertTrue(first.cancelled())
+            self.assertEqual(cancelled, [])
+
+        self.run_async(async_test())
+
+    def test_cancelling_last_waiter_cancels_request(self):
+        async def async_test():
+            group = SingleFlight()
+            cancelled = asyncio.Event()
+
+            async def request():
+                try:
+                    await asyncio.Event().wait()
+                except asyncio.CancelledError:
+                    cancelled.set()
+                    raise
+
+            waiters = [
+                asyncio.ensure_future(group.do("key", request)) for _ in range(2)
+            ]
+            await asyncio.sleep(0)
+            waiters[0].cancel()
+            await asyncio.sleep(0)
+            self.assertFalse(cancelled.is_set())
+            waiters[1].cancel()
+
+            await asyncio.wait_for(cancelled.wait(), 1)
+            await asyncio.sleep(0)
+            self.assertEqual(len(group), 0)
+
+        self.run_async(async_test())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,9 +1,11 @@
 import asyncio
 import unittest
 from app import app
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 from litestar.testing import AsyncTestClient
 from litestar.exceptions import HTTPException
+from hubble.services.rutor.service_utils import SEARCH_CACHE
+from database.requests.setters import DB_WRITE_QUEUE
 
 
 class TestAPIProduction(unittest.TestCase):
@@ -43,6 +45,37 @@ class TestAPIProduction(unittest.TestCase):
 
         self.run_async(async_test())
 
+    def test_search_handler_etag_not_modified(self):
+        async def async_test():
+            async with AsyncTestClient(app=app) as client:
+                with patch("app.get_search", new_callable=AsyncMock) as mock_search:
+                    mock_search.return_value = {"processed": "data"}
+                    url = "/search?search_query=avatar"
+                    response = await client.get(url)
+                    self.assertEqual(response.status_code, 200)
+                    etag = response.headers["etag"]
+
+                    for if_none_match in (
+                        etag,
+                        f"W/{etag}",
+                        "*",
+                        f'"other", W/{etag}',
+                    ):
+                        response = await client.get(
+                            url, headers={"If-None-Match": if_none_match}
+                        )
+                        self.assertEqual(response.status_code, 304)
+                        self.assertEqual(response.content, b"")
+                        self.assertEqual(response.headers["etag"], etag)
+
+                    response = await client.get(
+                        url, headers={"If-None-Match": '"other"'}
+                    )
+                    self.assertEqual(response.status_code, 200)
+                    self.assertEqual(response.json(), {"processed": "data"})
+
+        self.run_async(async_test())
+
     def test_search_handler_not_found(self):
         async def async_test():
             async with AsyncTestClient(app=app) as client:
@@ -55,6 +88,119 @@ class TestAPIProduction(unittest.TestCase):
 
         self.run_async(async_test())
 
+    def test_search_handler_local_fallback(self):
+        async def async_test():
+            local_result = {
+                "match": {"id": 1, "title_russian": "Сериал", "typename": "tvseries"},
+                "movies": [],
+                "persons": [{"id": 2, "name": "Имя", "typename": "person"}],
+                "typename": "search_result",
+            }
+            getters = "hubble.services.kinopoisk.getters"
+            async with AsyncTestClient(app=app) as client:
+                with patch(
+                    f"{getters}.search_local", new_callable=AsyncMock
+                ) as mock_local:
+                    with patch(
+                        f"{getters}.suggest_search_async",
+                        new_callable=AsyncMock,
+                        side_effect=OSError("upstream is down"),
+                    ):
+                        mock_local.return_value = local_result
+                        response = await client.get("/search?search_query=сер")
+                        self.assertEqual(response.status_code, 200)
+                        self.assertEqual(response.json()["match"]["id"], 1)
+
+        self.run_async(async_test())
+
+    def test_search_handler_fuzzy_fallback(self):
+        async def async_test():
+            fuzzy_result = {
+                "match": {"id": 3, "title_russian": "Ведьмак", "typename": "tvseries"},
+                "movies": [],
+                "persons": [],
+                "typename": "search_result",
+            }
+            getters = "hubble.services.kinopoisk.getters"
+            async with AsyncTestClient(app=app) as client:
+                with patch(
+                    f"{getters}.search_local", new_callable=AsyncMock
+                ) as mock_local, patch(
+                    f"{getters}.search_fuzzy", new_callable=AsyncMock
+                ) as mock_fuzzy, patch(
+                    f"{getters}.get_search_result", new_callable=AsyncMock
+                ) as mock_result, patch(
+                    f"{getters}.suggest_search_async",
+                    new_callable=AsyncMock,
+                    side_effect=OSError("upstream is down"),
+                ) as mock_upstream:
+                    mock_local.return_value = None
+                    mock_fuzzy.return_value = [
+                        {"typename": "tvseries", "id": 3, "similarity": 0.9}
+                    ]
+                    mock_result.return_value = fuzzy_result
+                    response = await client.get("/search?search_query=vedmak")
+                    self.assertEqual(response.status_code, 200)
+                    self.assertEqual(response.json()["match"]["id"], 3)
+                    mock_result.assert_awaited_once_with([("tvseries", 3)])
+                    # SIMILAR TITLE DOES NOT REPLACE THE UPSTREAM SEARCH
+                    mock_upstream.assert_awaited_once()
+
+        self.run_async(async_test())
+
+    def test_search_handler_fuzzy_sequel_uses_upstream(self):
+        async def async_test():
+            # "ЁЛКИ 2" IS ABOUT 0.71 SIMILAR TO THE STORED "ЁЛКИ"
+            fuzzy_result = {
+                "match": {"id": 1, "title_russian": "Ёлки", "typename": "film"},
+                "movies": [],
+                "persons": [],
+                "typename": "search_result",
+            }
+            upstream_json = {
+                "data": {
+                    "suggest": {
+                        "top": {
+                            "topResult": {
+                                "global": {
+                                    "__typename": "Film",
+                                    "id": 2,
+                                    "title": {"russian": "Ёлки 2"},
+                                }
+                            }
+                        }
+                    }
+                }
+            }
+            upstream_response = MagicMock(ok=True)
+            upstream_response.json = AsyncMock(return_value=upstream_json)
+            getters = "hubble.services.kinopoisk.getters"
+            async with AsyncTestClient(app=app) as client:
+                with patch(
+                    f"{getters}.search_local", new_callable=AsyncMock
+                ) as mock_local, patch(
+                    f"{getters}.search_fuzzy", new_callable=AsyncMock
+                ) as mock_fuzzy, patch(
+                    f"{getters}.get_search_result", new_callable=AsyncMock
+                ) as mock_result, patch(
+                    f"{getters}.suggest_search_async", new_callable=AsyncMock
+                ) as mock_upstream:
+                    mock_local.return_value = None
+                    mock_fuzzy.return_value = [
+                        {"typename": "film", "id": 1, "similarity": 0.71}
+                    ]
+                    mock_result.return_value = fuzzy_result
+                    mock_upstream.return_value = upstream_response
+                    response = await client.get("/search?search_query=Ёлки 2")
+                    self.assertEqual(response.status_code, 200)
+                    self.assertEqual(response.json()["match"]["id"], 2)
+                    self.assertEqual(
+                        response.json()["match"]["title_russian"], "Ёлки 2"
+                    )
+                    mock_upstream.assert_awaited_once()
+
+        self.run_async(async_test())
+
     def test_search_handler_empty_query(self):
         async def async_test():
             async with AsyncTestClient(app=app) as client:
@@ -111,6 +257,43 @@ class TestAPIProduction(unittest.TestCase):
 
         self.run_async(async_test())
 
+    # /info/batch
+    def test_info_batch_handler_partial_errors(self):
+        async def async_test():
+            async def fake_get_info(content_type, id, debug=False):
+                if id == 2:
+                    raise RuntimeError("upstream is down")
+                return {"id": id, "typename": content_type} if id == 1 else None
+
+            async with AsyncTestClient(app=app) as client:
+                with patch(
+                    "hubble.services.kinopoisk.getters.get_info", new=fake_get_info
+                ):
+                    response = await client.post(
+                        "/info/batch",
+                        json={
+                            "items": [
+                                {"content_type": "film", "id": 1},
+                                {"content_type": "film", "id": 2},
+                                {"content_type": "film", "id": 3},
+                                {"content_type": "cartoon", "id": 1},
+                            ]
+                        },
+                    )
+                    self.assertEqual(response.status_code, 200)
+                    statuses = [item["status"] for item in response.json()["items"]]
+                    self.assertEqual(statuses, [200, 502, 404, 415])
+
+        self.run_async(async_test())
+
+    def test_info_batch_handler_empty_batch(self):
+        async def async_test():
+            async with AsyncTestClient(app=app) as client:
+                response = await client.post("/info/batch", json={"items": []})
+                self.assertEqual(response.status_code, 400)
+
+        self.run_async(async_test())
+
     # /similars
     def test_similars_handler_success(self):
         async def async_test():
@@ -154,6 +337,33 @@ class TestAPIProduction(unittest.TestCase):
 
         self.run_async(async_test())
 
+    def test_person_handler_does_not_wait_for_db_write(self):
+        async def async_test():
+            persisted = []
+
+            async def slow_persist(items):
+                await asyncio.sleep(0.5)
+                persisted.extend(items)
+
+            person = {"typename": "person", "id": 3486150, "name": "name"}
+            async with AsyncTestClient(app=app) as client:
+                with patch("app.get_person", new_callable=AsyncMock) as mock_person:
+                    with patch.object(DB_WRITE_QUEUE, "persist", new=slow_persist):
+                        mock_person.return_value = person
+                        loop = asyncio.get_running_loop()
+                        started = loop.time()
+                        response = await client.get("/person?id=3486150")
+                        self.assertEqual(response.status_code, 200)
+                        self.assertLess(loop.time() - started, 0.5)
+
+                        response = await client.get("/stats/db_writes")
+                        self.assertEqual(response.json()["size"], 1)
+
+                        await DB_WRITE_QUEUE.flush()
+                        self.assertEqual(persisted, [person])
+
+        self.run_async(async_test())
+
     # /trivias
     def test_trivias_handler_success(self):
         async def async_test():
@@ -177,6 +387,96 @@ class TestAPIProduction(unittest.TestCase):
 
         self.run_async(async_test())
 
+    def test_trivias_handler_ndjson_stream(self):
+        async def async_test():
+            trivias = [
+                {"__typename": "Trivia", "id": i, "text": "text", "type": "FACT"}
+                for i in (1, 2, 3)
+            ]
+            response_data = {"data": {"film": {"trivias": {"items": trivias}}}}
+
+            async with AsyncTestClient(app=app) as client:
+                with patch(
+                    "hubble.services.kinopoisk.getters._fetch_trivias",
+                    new_callable=AsyncMock,
+                ) as mock_fetch, patch.object(DB_WRITE_QUEUE, "put") as mock_put:
+                    mock_fetch.return_value = response_data
+                    response = await client.get(
+                        "/trivias?content_type=film&id=98765",
+                        headers={"Accept": "application/x-ndjson"},
+                    )
+                    self.assertEqual(response.status_code, 200)
+                    self.assertEqual(
+                        response.headers["content-type"], "application/x-ndjson"
+                    )
+                    lines = response.text.splitlines()
+                    self.assertEqual(len(lines), 3)
+                    # TRIVIAS ARE WRITTEN WITH THEIR MOVIE AFTER THE STREAM ENDS
+                    mock_put.assert_called_once()
+                    payload = mock_put.call_args.args[0]
+                    self.assertEqual(payload["typename"], "movie_trivias")
+                    self.assertEqual(
+                        (payload["content_type"], payload["id"]), ("film", 98765)
+                    )
+                    self.assertEqual(len(payload["trivias"]), 3)
+
+        self.run_async(async_test())
+
+    def test_similars_handler_ndjson_stream_uses_cached_getter(self):
+        async def async_test():
+            movies = [
+                {
+                    "movie": {
+                        "__typename": "Film",
+                        "id": i,
+                        "title": {"russian": "Фильм"},
+                    }
+                }
+                for i in (1, 2)
+            ]
+            response_data = {
+                "data": {"film": {"userRecommendations": {"items": movies}}}
+            }
+
+            async def slow_fetch(content_type, id):
+                await asyncio.sleep(0.05)
+                return response_data
+
+            async with AsyncTestClient(app=app) as client:
+                with patch(
+                    "hubble.services.kinopoisk.getters._fetch_similars",
+                    new_callable=AsyncMock,
+                    side_effect=slow_fetch,
+                ) as mock_fetch, patch.object(DB_WRITE_QUEUE, "put") as mock_put:
+                    responses = await asyncio.gather(
+                        *(
+                            client.get(
+                                "/similars?content_type=film&id=98766",
+                                headers={"Accept": "application/x-ndjson"},
+                            )
+                            for _ in range(2)
+                        )
+                    )
+                    for response in responses:
+                        self.assertEqual(response.status_code, 200)
+                        self.assertEqual(len(response.text.splitlines()), 2)
+
+                    # CONCURRENT STREAMS SHARE ONE REQUEST, EACH ONE IS WRITTEN
+                    mock_fetch.assert_awaited_once()
+                    self.assertEqual(mock_put.call_count, 2)
+                    written = mock_put.call_args.args[0]
+                    self.assertEqual([movie.id for movie in written], [1, 2])
+
+                    # SECOND REQUEST IS SERVED FROM THE CACHE
+                    response = await client.get(
+                        "/similars?content_type=film&id=98766",
+                        headers={"Accept": "application/x-ndjson"},
+                    )
+                    self.assertEqual(len(response.text.splitlines()), 2)
+                    mock_fetch.assert_awaited_once()
+
+        self.run_async(async_test())
+
     # /media_posts
     def test_media_posts_handler_success(self):
         async def async_test():
@@ -193,12 +493,40 @@ class TestAPIProduction(unittest.TestCase):
 
         self.run_async(async_test())
 
+    # /card
+    def test_card_handler_degraded_section(self):
+        async def async_test():
+            async def slow_similars(content_type, id, debug=False):
+                await asyncio.sleep(1)
+                return [{"id": 2}]
+
+            getters = "hubble.services.kinopoisk.getters"
+            sections = {
+                "get_info": AsyncMock(return_value={"id": 1, "typename": "film"}),
+                "get_similars": slow_similars,
+                "get_trivias": AsyncMock(return_value=[]),
+                "get_media_posts": AsyncMock(return_value=[]),
+            }
+            async with AsyncTestClient(app=app) as client:
+                with patch.multiple(getters, **sections):
+                    with patch.dict(
+                        f"{getters}.TITLE_CARD_SECTION_TIMEOUT", similars=0.01
+                    ):
+                        response = await client.get("/card?content_type=film&id=1")
+                        self.assertEqual(response.status_code, 200)
+                        card = response.json()
+                        self.assertEqual(card["info"]["id"], 1)
+                        self.assertEqual(card["similars"], [])
+                        self.assertEqual(card["degraded"], ["similars"])
+
+        self.run_async(async_test())
+
     # /series_dates
     def test_series_dates_handler_success(self):
         async def async_test():
             async with AsyncTestClient(app=app) as client:
                 with patch(
-                    "hubble.services.toramp.get_series_dates", new_callable=AsyncMock
+                    "app.get_series_dates", new_callable=AsyncMock
                 ) as mock_dates:
                     mock_dates.return_value = {"dates": "2023-01-01"}
                     response = await client.get("/series_dates?title=show")
@@ -209,6 +537,81 @@ class TestAPIProduction(unittest.TestCase):
 
         self.run_async(async_test())
 
+    # /series_dates/batch
+    def test_series_dates_batch_handler_partial_errors(self):
+        async def async_test():
+            async def fake_get_series_dates(title):
+                if title == "down":
+                    raise RuntimeError("upstream is down")
+                return {"id": "1", "seasons_count": 2} if title == "show" else {}
+
+            async def fake_get_series_dates_by_id(toramp_id):
+                return {"id": str(toramp_id), "seasons_count": 1}
+
+            async with AsyncTestClient(app=app) as client:
+                with patch.multiple(
+                    "hubble.services.toramp.getters",
+                    get_series_dates=fake_get_series_dates,
+                    get_series_dates_by_id=fake_get_series_dates_by_id,
+                ):
+                    response = await client.post(
+                        "/series_dates/batch",
+                        json={"titles": ["show", "down", "missing"], "ids": [7]},
+                    )
+                    self.assertEqual(response.status_code, 200)
+                    items = response.json()["items"]
+                    statuses = [item["status"] for item in items]
+                    self.assertEqual(statuses, [200, 502, 404, 200])
+                    self.assertEqual(items[3]["id"], 7)
+
+        self.run_async(async_test())
+
+    # /torrents
+    def test_torrents_handler_filters_cached_results(self):
+        async def async_test():
+            rows = [
+                {"title": "Show S01", "size": "1.50 GB", "seeds": 5, "leechers": 1},
+                {"title": "Show S02", "size": "700.00 MB", "seeds": 50, "leechers": 2},
+                {"title": "Other", "size": "3.00 GB", "seeds": 20, "leechers": 3},
+            ]
+            for row in rows:
+                row.update(date="01 Окт 24", magnet="", torrent=row["title"])
+
+            async with AsyncTestClient(app=app) as client:
+                with patch(
+                    "hubble.services.rutor.getters.get_rutor_search",
+                    new_callable=AsyncMock,
+                ) as mock_search:
+                    with patch.dict(SEARCH_CACHE._data, clear=True):
+                        mock_search.return_value = rows
+                        response = await client.get(
+                            "/torrents?search_query=show&sort=seeds_desc"
+                        )
+                        self.assertEqual(response.status_code, 200)
+                        self.assertEqual(
+                            [row["seeds"] for row in response.json()], [50, 20, 5]
+                        )
+
+                        response = await client.get(
+                            "/torrents?search_query=show&title=SHOW&min_size=1GB"
+                        )
+                        self.assertEqual(response.status_code, 200)
+                        self.assertEqual(
+                            [row["title"] for row in response.json()], ["Show S01"]
+                        )
+
+                        # TITLE IS A PLAIN SUBSTRING, NOT A REGULAR EXPRESSION
+                        for title in ("^show", "(s+)+$", "["):
+                            response = await client.get(
+                                "/torrents",
+                                params={"search_query": "show", "title": title},
+                            )
+                            self.assertEqual(response.status_code, 200)
+                            self.assertEqual(response.json(), [])
+                        mock_search.assert_awaited_once()
+
+        self.run_async(async_test())
+
 
 if __name__ == "__main__":
     unittest.main()
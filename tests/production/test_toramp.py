@@ -0,0 +1,139 @@
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, patch
+
+import aiohttp
+from litestar.testing import AsyncTestClient
+
+from app import app
+from hubble.services.toramp import getters
+from hubble.services.toramp.service_utils import TITLE_MAPPING_CACHE
+
+
+MAPPED = {"id": "1", "url": "https://www.toramp.com/series.php?id=1"}
+FOUND = {"id": "2", "url": "https://www.toramp.com/series.php?id=2"}
+
+
+class TestGetSeriesDates(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.get_event_loop()
+        TITLE_MAPPING_CACHE.clear()
+        self.addCleanup(TITLE_MAPPING_CACHE.clear)
+
+        self.pages = AsyncMock()
+        self.search = AsyncMock(return_value=FOUND)
+        for target, value in (
+            ("_get_series_page", self.pages),
+            ("get_search", self.search),
+            ("parse_series_dates", lambda html: {"seasons": [html]}),
+            ("TITLE_MAPPING_DB_ENABLED", False),
+        ):
+            patcher = patch.object(getters, target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def run_async(self, coro):
+        return self.loop.run_until_complete(coro)
+
+    def test_mapped_page_not_found_is_searched_again(self):
+        TITLE_MAPPING_CACHE.set("title", MAPPED)
+        self.pages.side_effect = [(404, "not found"), (200, "new page")]
+
+        result = self.run_async(getters.get_series_dates("Title"))
+
+        self.assertEqual(result["id"], "2")
+        self.assertEqual(result["seasons"], ["new page"])
+        self.assertEqual(
+            [call.args[0] for call in self.pages.await_args_list],
+            [MAPPED["url"], FOUND["url"]],
+        )
+        self.assertEqual(TITLE_MAPPING_CACHE.get("title"), FOUND)
+
+    def test_mapped_page_error_is_searched_again_once(self):
+        TITLE_MAPPING_CACHE.set("title", MAPPED)
+        self.pages.side_effect = [(503, "error page"), (503, "error page")]
+
+        result = self.run_async(getters.get_series_dates("Title"))
+
+        self.assertEqual(result, {})
+        self.assertEqual(self.search.await_count, 1)
+        self.assertEqual(self.pages.await_count, 2)
+        # SERVER ERROR DOES NOT MEAN THE PAGE HAS MOVED
+        self.assertEqual(TITLE_MAPPING_CACHE.get("title"), MAPPED)
+
+    def test_mapped_page_transport_error_is_searched_again(self):
+        TITLE_MAPPING_CACHE.set("title", MAPPED)
+        self.pages.side_effect = [
+            aiohttp.ServerTimeoutError("timeout"),
+            (200, "new page"),
+        ]
+
+        result = self.run_async(getters.get_series_dates("Title"))
+
+        self.assertEqual(result["id"], "2")
+        self.assertEqual(result["seasons"], ["new page"])
+        self.assertEqual(self.search.await_count, 1)
+
+    def test_found_page_error_is_not_parsed(self):
+        for status in (403, 404, 500):
+            with self.subTest(status=status):
+                TITLE_MAPPING_CACHE.clear()
+                self.pages.side_effect = [(status, "error page")]
+
+                result = self.run_async(getters.get_series_dates("Title"))
+
+                self.assertEqual(result, {})
+                self.assertIsNone(TITLE_MAPPING_CACHE.get("title"))
+
+
+class FailingSession:
+    def post(self, *args, **kwargs):
+        raise aiohttp.ClientConnectionError("connection reset")
+
+    def get(self, *args, **kwargs):
+        raise aiohttp.ServerTimeoutError("timeout")
+
+
+class TestSeriesDatesBatch(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.get_event_loop()
+        TITLE_MAPPING_CACHE.clear()
+        self.addCleanup(TITLE_MAPPING_CACHE.clear)
+
+        for target, value in (
+            ("get_http_session", lambda name: FailingSession()),
+            ("wait_for_rate_limit", AsyncMock()),
+            ("TITLE_MAPPING_DB_ENABLED", False),
+        ):
+            patcher = patch.object(getters, target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def run_async(self, coro):
+        return self.loop.run_until_complete(coro)
+
+    def test_transport_error_is_reported_as_bad_gateway(self):
+        # SEARCH REQUEST FAILS FOR THE NEW TITLE, PAGE REQUEST FAILS FOR
+        # THE MAPPED TITLE AND FOR THE ID
+        TITLE_MAPPING_CACHE.set("mapped", MAPPED)
+
+        items = self.run_async(getters.get_series_dates_batch(["Title", "Mapped"], [7]))
+
+        self.assertEqual([item["status"] for item in items], [502, 502, 502])
+        self.assertEqual(TITLE_MAPPING_CACHE.get("mapped"), MAPPED)
+
+    def test_single_transport_error_is_reported_as_bad_gateway(self):
+        async def async_test():
+            app.debug = False
+            async with AsyncTestClient(app=app) as client:
+                # NEW TITLE: SEARCH FAILS; MAPPED TITLE: PAGE AND SEARCH FAIL
+                TITLE_MAPPING_CACHE.set("mapped", MAPPED)
+                for title in ("Title", "Mapped"):
+                    response = await client.get(f"/series_dates?title={title}")
+                    self.assertEqual(response.status_code, 502)
+
+        self.run_async(async_test())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,137 @@
+import unittest
+from itertools import product
+from typing import Any
+
+from hubble.utils import NestedPath, compile_path, get_nested
+
+
+def legacy_get_nested(
+    data: Any, keys: str, required: bool = False, default: Any = None
+) -> Any:
+    # РЕАЛИЗАЦИЯ get_nested ДО ВВЕДЕНИЯ compile_path (ЭТАЛОН ДЛЯ СРАВНЕНИЯ)
+    keys = keys.split(".")
+
+    for key in keys:
+        if isinstance(data, dict):
+            data = data.get(key, default)
+            if data is default and required:
+                raise KeyError(f"Required key '{key}' not found in the data.")
+        elif isinstance(data, list):
+            if key.isdigit():
+                index = int(key)
+                if index < len(data):
+                    data = data[index]
+                else:
+                    data = default
+                    if required:
+                        raise KeyError(f"Required index {index} not found in the list.")
+            elif ("[" in key) and ("]" in key):
+                i1 = key.find("[") + 1
+                i2 = key.find("]")
+                key = int(key[i1:i2])
+                if key < len(data):
+                    data = data[key]
+                else:
+                    data = default
+                    if required:
+                        raise KeyError(f"Required index {key} not found in the list.")
+            else:
+                temp_list = []
+                for item in data:
+                    if isinstance(item, dict) and key in item:
+                        temp_list.append(item[key])
+                data = temp_list if temp_list else default
+                data = data[0] if len(data) == 1 else data
+        else:
+            if required:
+                raise KeyError(f"Required key '{key}' not found in the data.")
+            return default
+
+    return data
+
+
+FIXTURES = [
+    {},
+    {"a": None},
+    {"a": 1},
+    {"a": {"b": {"c": 3, "d": None}}},
+    {"a": {"b": [{"c": 1}, {"c": 2}, {"x": 3}]}},
+    {"a": {"b": [{"c": {"d": 4}}]}},
+    {"a": [{"b": 1}, {"b": 2}], "b": "text"},
+    {"a": [[1, 2], [3]]},
+    {"a": {"b": "text", "c": 0, "d": False}},
+    [{"a": 1}, {"a": 2}],
+    [{"a": {"b": 1}}],
+    "text",
+    None,
+]
+
+PATHS = [
+    "a",
+    "b",
+    "missing",
+    "a.b",
+    "a.c",
+    "a.missing",
+    "a.b.c",
+    "a.b.d",
+    "a.b.x",
+    "a.b.c.d",
+    "a.0",
+    "a.1",
+    "a.5",
+    "a.[0]",
+    "a.[1].0",
+    "a.b.0.c",
+    "a.b.[2].x",
+    "0.a",
+    "[1].a",
+]
+
+DEFAULTS = [None, "default", {}]
+
+
+def call(getter, *args) -> tuple:
+    try:
+        return "value", getter(*args)
+    except Exception as e:
+        return type(e), str(e)
+
+
+class TestGetNested(unittest.TestCase):
+    def test_equivalent_to_legacy_traversal(self):
+        for data, path, required, default in product(
+            FIXTURES, PATHS, (False, True), DEFAULTS
+        ):
+            with self.subTest(data=data, path=path, required=required, default=default):
+                expected = call(legacy_get_nested, data, path, required, default)
+                self.assertEqual(
+                    call(get_nested, data, path, required, default), expected
+                )
+                self.assertEqual(
+                    call(NestedPath(path).get, data, required, default), expected
+                )
+
+    def test_specialized_accessors(self):
+        # SHORT DICT PATHS GET A DEDICATED ACCESSOR, PATHS WITH INDEXES DO NOT
+        for path in ("a", "a.b", "a.b.c"):
+            self.assertNotEqual(NestedPath(path).get.__name__, "_get")
+        for path in ("a.b.c.d", "a.0", "a.[1].b"):
+            self.assertEqual(NestedPath(path).get.__name__, "_get")
+
+    def test_compiled_paths_are_memoized(self):
+        path = compile_path("a.b.c")
+        self.assertIs(compile_path("a.b.c"), path)
+        self.assertEqual(path.keys, ("a", "b", "c"))
+        self.assertEqual(compile_path("a.[1]").indexes, (None, 1))
+
+    def test_bad_index_raises_like_legacy(self):
+        data = {"a": [1, 2]}
+        self.assertEqual(
+            call(get_nested, data, "a.[x]"), call(legacy_get_nested, data, "a.[x]")
+        )
+        self.assertEqual(call(get_nested, data, "a.[x]")[0], ValueError)
+
+
+if __name__ == "__main__":
+    unittest.main()